@@ -1,14 +1,16 @@
-from typing import Generator, Optional
-from fastapi import Depends, HTTPException, status
+from typing import AsyncGenerator, Generator, Optional
+from fastapi import Depends, HTTPException, Query, Response, status
 from fastapi.security import HTTPAuthorizationCredentials
 from jose import jwt
 from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 import logging
 
 from app.core import security
 from app.core.config import settings
-from app.db.session import SessionLocal
+from app.crud.pagination import Cursor, InvalidCursor, Page, decode_cursor
+from app.db.session import AsyncSessionLocal, SessionLocal
 from app.models.user import User
 from app.schemas.token import TokenPayload
 from app.core.security_scheme import security as api_security
@@ -24,6 +26,25 @@ def get_db() -> Generator:
     finally:
         db.close()
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def get_cursor(
+    cursor: Optional[str] = Query(None, description="`X-Next-Cursor` from the previous page; omit for the first page")
+) -> Optional[Cursor]:
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except InvalidCursor:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+def set_next_cursor(response: Response, page: Page) -> None:
+    """Expose the cursor of the next page, if there is one, as ``X-Next-Cursor``."""
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+
 def get_current_user(
     db: Session = Depends(get_db),
     credentials: HTTPAuthorizationCredentials = Depends(api_security)
@@ -2,7 +2,7 @@ from fastapi import APIRouter
 from app.core.security_scheme import security
 
 from app.api.v1.endpoints import auth, users, content, learning_paths, course, course_content, assessment, progress, youtube
-from app.api.v1.endpoints import chat
+from app.api.v1.endpoints import chat, jobs, search
 
 # Create the main API router
 api_router = APIRouter()
@@ -17,4 +17,6 @@ api_router.include_router(course_content.router, prefix="/courses", tags=["cours
 api_router.include_router(assessment.router, prefix="/assessment", tags=["assessment"])
 api_router.include_router(progress.router, prefix="/progress", tags=["progress"])
 api_router.include_router(youtube.router, prefix="/youtube", tags=["youtube"])
-api_router.include_router(chat.router, prefix="/chat", tags=["chat"])
\ No newline at end of file
+api_router.include_router(chat.router, prefix="/chat", tags=["chat"])
+api_router.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
+api_router.include_router(search.router, prefix="/search", tags=["search"])
\ No newline at end of file
@@ -1,9 +1,11 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
 from app.api import deps
 from app.crud import crud_assessment
+from app.crud.crud_assessment import crud_exam, crud_flashcard
+from app.crud.pagination import Cursor
 from app.models.user import User
 from app.schemas.assessment import (
     Quiz,
@@ -41,15 +43,17 @@ def create_quiz(
 def read_quizzes(
     *,
     db: Session = Depends(deps.get_db),
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    cursor: Optional[Cursor] = Depends(deps.get_cursor),
+    limit: int = Query(100, ge=1, le=100),
     current_user: User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
-    Get all quizzes.
+    Get all quizzes, newest first. The next page's cursor is in `X-Next-Cursor`.
     """
-    quizzes = crud_assessment.get_quizzes(db=db, skip=skip, limit=limit)
-    return quizzes
+    page = crud_assessment.get_quizzes(db=db, cursor=cursor, limit=limit)
+    deps.set_next_cursor(response, page)
+    return page.items
 
 @router.post("/quizzes/{quiz_id}/attempt", response_model=QuizAttempt)
 def attempt_quiz(
@@ -87,15 +91,17 @@ def create_flashcard(
 def read_flashcards(
     *,
     db: Session = Depends(deps.get_db),
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    cursor: Optional[Cursor] = Depends(deps.get_cursor),
+    limit: int = Query(100, ge=1, le=100),
     current_user: User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
-    Get all flashcards.
+    Get all flashcards, newest first. The next page's cursor is in `X-Next-Cursor`.
     """
-    flashcards = crud_assessment.get_flashcards(db=db, skip=skip, limit=limit)
-    return flashcards
+    page = crud_flashcard.get_flashcards(db=db, cursor=cursor, limit=limit)
+    deps.set_next_cursor(response, page)
+    return page.items
 
 @router.put("/flashcards/{flashcard_id}", response_model=Flashcard)
 def update_flashcard(
@@ -136,15 +142,17 @@ def create_exam(
 def read_exams(
     *,
     db: Session = Depends(deps.get_db),
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    cursor: Optional[Cursor] = Depends(deps.get_cursor),
+    limit: int = Query(100, ge=1, le=100),
     current_user: User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
-    Get all exams.
+    Get all exams, newest first. The next page's cursor is in `X-Next-Cursor`.
     """
-    exams = crud_assessment.get_exams(db=db, skip=skip, limit=limit)
-    return exams
+    page = crud_exam.get_exams(db=db, cursor=cursor, limit=limit)
+    deps.set_next_cursor(response, page)
+    return page.items
 
 @router.post("/exams/{exam_id}/attempt", response_model=ExamAttempt)
 def attempt_exam(
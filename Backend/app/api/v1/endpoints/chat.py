@@ -1,20 +1,25 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect, UploadFile, File
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, WebSocket, WebSocketDisconnect, UploadFile, File
 from sqlalchemy.orm import Session
 import os
 from app.api import deps
 from app.crud import chat as chat_crud
+from app.crud.pagination import Cursor, InvalidCursor
+from app.services import message_search
+from app.db.writer import db_writer
 from app.schemas.chat import (
     ChatGroupCreate,
     ChatGroup,
     MessageCreate,
     Message,
     MessageReadCreate,
-    MessageRead
+    MessageRead,
+    MessageSearchHit
 )
 from app.core.websocket import ConnectionManager
 from app.models.user import User
-import aiofiles
+from app.services.blob_store import BlobStore, BlobTooLarge
+from app.services.file_signatures import UnexpectedFileType, check_signature
 from datetime import datetime
 
 router = APIRouter()
@@ -25,8 +30,8 @@ UPLOAD_DIR = "uploads"
 ALLOWED_EXTENSIONS = {".txt", ".pdf", ".doc", ".docx", ".jpg", ".jpeg", ".png"}
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
 
-# Ensure upload directory exists
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+# Shared files are stored once per content hash under UPLOAD_DIR
+chat_files = BlobStore(UPLOAD_DIR, MAX_FILE_SIZE)
 
 @router.post("/groups", response_model=ChatGroup)
 def create_group(
@@ -117,11 +122,10 @@ def remove_member(
 @router.post("/messages", response_model=Message)
 def create_message(
     message: MessageCreate,
-    current_user: User = Depends(deps.get_current_user),
-    db: Session = Depends(deps.get_db)
+    current_user: User = Depends(deps.get_current_user)
 ):
     """Create a new message"""
-    db_message = chat_crud.create_message(db, message, current_user.email)
+    db_message = db_writer.run_sync(chat_crud.create_message, message, current_user.email)
     return {
         "id": db_message.id,
         "group_id": db_message.group_id,
@@ -134,13 +138,15 @@ def create_message(
 @router.get("/groups/{group_id}/messages", response_model=List[Message])
 def get_messages(
     group_id: int,
-    skip: int = 0,
-    limit: int = 50,
+    response: Response,
+    cursor: Optional[Cursor] = Depends(deps.get_cursor),
+    limit: int = Query(50, ge=1, le=100),
     current_user: User = Depends(deps.get_current_user),
     db: Session = Depends(deps.get_db)
 ):
-    """Get messages for a chat group"""
-    messages = chat_crud.get_group_messages(db, group_id, skip, limit)
+    """Get messages for a chat group, newest first. The next page's cursor is in `X-Next-Cursor`."""
+    page = chat_crud.get_group_messages(db, group_id, cursor, limit)
+    deps.set_next_cursor(response, page)
     return [
         {
             "id": msg.id,
@@ -150,7 +156,7 @@ def get_messages(
             "file_url": msg.file_url,
             "created_at": msg.created_at
         }
-        for msg in messages
+        for msg in page.items
     ]
 
 @router.post("/messages/{message_id}/read", response_model=MessageRead)
@@ -190,35 +196,41 @@ def get_message_reads(
         for read in reads
     ]
 
-@router.get("/groups/{group_id}/search", response_model=List[Message])
+@router.get("/groups/{group_id}/search", response_model=List[MessageSearchHit])
 def search_messages(
     group_id: int,
     query: str,
-    skip: int = 0,
-    limit: int = 50,
+    response: Response,
+    sender_id: Optional[str] = Query(None, description="Only messages from this sender (email)"),
+    since: Optional[datetime] = Query(None, description="Only messages sent at or after this time (UTC)"),
+    until: Optional[datetime] = Query(None, description="Only messages sent before this time (UTC)"),
+    cursor: Optional[str] = Query(None, description="`X-Next-Cursor` from the previous page; omit for the first page"),
+    limit: int = Query(50, ge=1, le=100),
     current_user: User = Depends(deps.get_current_user),
     db: Session = Depends(deps.get_db)
 ):
-    """Search messages in a chat group"""
-    messages = chat_crud.search_messages(db, group_id, query, skip, limit)
-    return [
-        {
-            "id": msg.id,
-            "group_id": msg.group_id,
-            "sender_id": msg.sender_id,
-            "content": msg.content,
-            "file_url": msg.file_url,
-            "created_at": msg.created_at
-        }
-        for msg in messages
-    ]
+    """Full-text search in a chat group, best matches first.
+
+    All words must match; end a word with `*` for a prefix search (`loop*` also
+    finds `loops`). Each hit has a `snippet` with the matched
+    words wrapped in `<mark>` tags; message text is not HTML-escaped. The next
+    page's cursor is in `X-Next-Cursor`.
+    """
+    try:
+        page = message_search.search(
+            db, group_id, query,
+            sender_id=sender_id, since=since, until=until, cursor=cursor, limit=limit
+        )
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    deps.set_next_cursor(response, page)
+    return [MessageSearchHit(**vars(hit)) for hit in page.items]
 
 @router.websocket("/ws/{group_id}")
 async def websocket_endpoint(
     websocket: WebSocket,
     group_id: int,
-    current_user: User = Depends(deps.get_current_user),
-    db: Session = Depends(deps.get_db)
+    current_user: User = Depends(deps.get_current_user)
 ):
     await manager.connect(websocket, group_id)
     try:
@@ -228,7 +240,7 @@ async def websocket_endpoint(
                 group_id=group_id,
                 content=data
             )
-            db_message = chat_crud.create_message(db, message, current_user.email)
+            db_message = await db_writer.run(chat_crud.create_message, message, current_user.email)
             await manager.broadcast(
                 group_id,
                 {
@@ -249,7 +261,6 @@ async def websocket_endpoint(
 async def upload_file(
     group_id: int,
     file: UploadFile = File(...),
-    db: Session = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user)
 ):
     # Validate file extension
@@ -257,34 +268,22 @@ async def upload_file(
     if file_ext not in ALLOWED_EXTENSIONS:
         raise HTTPException(status_code=400, detail="File type not allowed")
     
-    # Validate file size
-    file_size = 0
-    chunk_size = 1024 * 1024  # 1MB chunks
-    while chunk := await file.read(chunk_size):
-        file_size += len(chunk)
-        if file_size > MAX_FILE_SIZE:
-            raise HTTPException(status_code=400, detail="File too large")
-    
-    # Reset file pointer
-    await file.seek(0)
-    
-    # Generate unique filename
-    timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-    filename = f"{timestamp}_{file.filename}"
-    file_path = os.path.join(UPLOAD_DIR, filename)
-    
-    # Save file
-    async with aiofiles.open(file_path, 'wb') as out_file:
-        while chunk := await file.read(chunk_size):
-            await out_file.write(chunk)
+    # One pass over the upload: magic bytes, size limit, hash and write
+    try:
+        blob = await chat_files.put(file, check=lambda head: check_signature(file_ext, head))
+    except BlobTooLarge:
+        raise HTTPException(status_code=400, detail="File too large")
+    except UnexpectedFileType as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    relative_path = os.path.relpath(blob.path, chat_files.root).replace(os.sep, "/")
     
     # Create message with file URL
     message = MessageCreate(
         group_id=group_id,
         content=f"Shared file: {file.filename}",
-        file_url=f"/uploads/{filename}"
+        file_url=f"/uploads/{relative_path}"
     )
-    db_message = chat_crud.create_message(db, message, current_user.email)
+    db_message = await db_writer.run(chat_crud.create_message, message, current_user.email)
     return {
         "id": db_message.id,
         "group_id": db_message.group_id,
@@ -1,104 +1,38 @@
 from typing import List, Optional, Any, Dict
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Body, Form, BackgroundTasks
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Body, Form, BackgroundTasks, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.api import deps
-from app.schemas.content import Content, ContentCreate, ContentUpdate, ContentGeneratorResponse, GenerateContentRequest, ContentResponse, ContentListResponse, ContentGenerateRequest, ContentBatchResponse, ContentBatchCreate, ContentBatchUpdate, ContentContextualGenerateRequest, ChatResponse, ChatRequest
-from app.crud.crud_content import crud_content
+from app.schemas.content import Content, ContentCreate, ContentUpdate, ContentGeneratorResponse, GenerateContentRequest, ContentResponse, ContentListResponse, ContentGenerateRequest, ContentBatchResponse, ContentBatchAddResponse, ContentBatchCreate, ContentBatchUpdate, ContentContextualGenerateRequest, ChatResponse, ChatRequest
+from app.crud.crud_content import crud_content, crud_content_async
 from app.services.content_generator import ContentGenerator
-from app.services.content_service import ContentService
+from app.services.blob_store import blob_store
+from app.services.content_service import ContentService, store_file
+from app.services.course_context import course_contexts
+from app.services.text_extraction import submit_extraction
+from app.services.structured_output import structured_output
+from app.services.jobs import JobContext, job_accepted, job_handler, job_pool
+from app.schemas.job import JobResponse
 from app.models.user import User
-from app.models.enums import ContentType
 from app.models.course import Course as CourseModel
 from app.models.content import Content as ContentModel
 from uuid import uuid4
-import base64
 import json
+import os
 from datetime import datetime
 from pydantic import BaseModel
-import re
 import asyncio
+from app.core.files import immutable_file_response
+from app.core.sse import sse_response
 
 router = APIRouter()
 content_generator = ContentGenerator()
-content_service = ContentService()
+content_service = ContentService(generator=content_generator)
 
 class OutlineContentRequest(BaseModel):
     outline: str
     course_id: Optional[str] = None
-
-def is_valid_json(text: str) -> bool:
-    """Check if a string is valid JSON."""
-    try:
-        json.loads(text)
-        return True
-    except json.JSONDecodeError:
-        return False
-
-def clean_json_response(response: str) -> str:
-    """Clean and extract JSON from response."""
-    # Remove markdown code blocks
-    cleaned = response.strip()
-    if cleaned.startswith("```json"):
-        cleaned = cleaned[7:]
-    if cleaned.startswith("```"):
-        cleaned = cleaned[3:]
-    if cleaned.endswith("```"):
-        cleaned = cleaned[:-3]
-    
-    cleaned = cleaned.strip()
-    
-    # Try to extract JSON using regex
-    json_match = re.search(r'\{[\s\S]*\}', cleaned)
-    if json_match:
-        return json_match.group()
-    return cleaned
-
-async def get_valid_json_response(content_generator, prompt: str, max_retries: int = 3) -> Dict:
-    """Get valid JSON response with retries."""
-    for attempt in range(max_retries):
-        try:
-            response = await content_generator._generate_with_gemini(prompt)
-            print(f"Attempt {attempt + 1} - Raw Response:", response)
-            
-            cleaned_response = clean_json_response(response)
-            print(f"Attempt {attempt + 1} - Cleaned Response:", cleaned_response)
-            
-            if is_valid_json(cleaned_response):
-                return json.loads(cleaned_response)
-            
-            print(f"Attempt {attempt + 1} - Invalid JSON, retrying...")
-            
-            # Modify prompt to be more strict about JSON
-            prompt = f"""IMPORTANT: Your previous response was not valid JSON. Please try again.
-            You must return ONLY a valid JSON object with no additional text, markdown, or formatting.
-            The response must be parseable by json.loads().
-            
-            {prompt}
-            
-            Remember:
-            1. Return ONLY the JSON object
-            2. No markdown formatting
-            3. No additional text before or after
-            4. No code blocks
-            5. Valid JSON syntax with proper quotes and commas
-            """
-            
-            # Add delay between retries
-            if attempt < max_retries - 1:
-                await asyncio.sleep(1)
-                
-        except Exception as e:
-            print(f"Attempt {attempt + 1} - Error:", str(e))
-            if attempt == max_retries - 1:
-                raise
-    
-    raise HTTPException(
-        status_code=500,
-        detail={
-            "error": "Failed to get valid JSON after multiple attempts",
-            "max_retries": max_retries
-        }
-    )
+    provider: str = "gemini"
+    mode: str = "parallel"  # "parallel": one request per chapter, "single": whole outline in one prompt
 
 @router.post("/text", 
     response_model=ContentResponse,
@@ -146,11 +80,11 @@ async def get_valid_json_response(content_generator, prompt: str, max_retries: i
 )
 async def create_text_content(
     content: ContentCreate,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     current_user: User = Depends(deps.get_current_user)
 ):
     """Create new text content."""
-    return await content_service.create_content(content, current_user.id)
+    return await content_service.create_content(db, content, current_user.id)
 
 @router.post("/video", 
     response_model=ContentResponse,
@@ -198,7 +132,7 @@ async def create_video_content(
     title: str = Form(...),
     course_id: Optional[str] = Form(None),
     metadata: Optional[str] = Form(None),
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     current_user: User = Depends(deps.get_current_user)
 ):
     """Create new video content from a YouTube URL."""
@@ -217,7 +151,7 @@ async def create_video_content(
             meta=metadata_dict
         )
         
-        return await content_service.create_content(content, current_user.id)
+        return await content_service.create_content(db, content, current_user.id)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -249,11 +183,43 @@ async def create_video_content(
 )
 async def get_content(
     content_id: str,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     current_user: User = Depends(deps.get_current_user)
 ):
     """Get content by ID."""
-    return await content_service.get_content(content_id)
+    return await content_service.get_content(db, content_id)
+
+@router.get("/{content_id}/file",
+    summary="Download File",
+    description="""
+    Download the bytes of uploaded FILE content.
+
+    Supports `Range: bytes=first-last` (206 Partial Content, 416 past the end),
+    and the `ETag` is the file's SHA-256, so `If-None-Match` answers 304 and
+    `If-Range` resumes only the same file.
+    """
+)
+async def download_file(
+    content_id: str,
+    request: Request,
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: User = Depends(deps.get_current_user)
+):
+    """Stream an uploaded file from the blob store."""
+    content = await crud_content_async.get(db, content_id)
+    if not content or not content.blob_sha256:
+        raise HTTPException(status_code=404, detail="File not found")
+    path = blob_store.path(content.blob_sha256)
+    if not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="File not found")
+    meta = content.meta or {}
+    return immutable_file_response(
+        request,
+        path,
+        etag=content.blob_sha256,
+        media_type=meta.get("content_type"),
+        filename=meta.get("filename") or content.title
+    )
 
 @router.put("/{content_id}", 
     response_model=ContentResponse,
@@ -299,11 +265,11 @@ async def get_content(
 async def update_content(
     content_id: str,
     content: ContentUpdate,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     current_user: User = Depends(deps.get_current_user)
 ):
     """Update content."""
-    return await content_service.update_content(content_id, content)
+    return await content_service.update_content(db, content_id, content)
 
 @router.delete("/{content_id}", 
     response_model=ContentResponse,
@@ -333,16 +299,17 @@ async def update_content(
 )
 async def delete_content(
     content_id: str,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     current_user: User = Depends(deps.get_current_user)
 ):
     """Delete content."""
-    return await content_service.delete_content(content_id)
+    return await content_service.delete_content(db, content_id)
 
 @router.post("/generate", response_model=ContentResponse)
 async def generate_content(
     request: ContentGenerateRequest,
     background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(deps.get_async_db),
     current_user: User = Depends(deps.get_current_user)
 ) -> Any:
     """
@@ -458,64 +425,154 @@ async def generate_content(
     ```
     """
     try:
-        # Generate content using AI
-        generated_content = await content_generator.generate_content(
+        # Generate once and store the generated payload
+        return await content_service.generate_and_store(
+            db,
             content_type=request.content_type,
             parameters=request.parameters,
-            provider=request.provider
+            user_id=current_user.id,
+            provider=request.provider,
+            use_cache=not request.bypass_cache
         )
-        
-        # Create content object for database storage
-        content_obj = ContentCreate(
-            title=f"Generated {request.content_type.title()}",
-            content=json.dumps(generated_content),
-            content_type=request.content_type.upper(),
-            description=f"AI-generated {request.content_type} about {request.parameters.get('topic', 'general topic')}",
-            meta={
-                "generator": request.provider,
-                "parameters": request.parameters,
-                "generated_at": datetime.utcnow().isoformat()
-            }
-        )
-        
-        # Store in database
-        stored_content = await content_service.create_content(content_obj, current_user.id)
-        
-        return stored_content
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/cache/stats",
+    response_model=Dict[str, Any],
+    summary="Generation Cache Statistics",
+    description="""
+    Hit/miss counters (since process start) and stored entry counts of the
+    generated-content cache, overall and per content type, plus counters of
+    concurrent identical generation requests that were coalesced into one
+    provider call (`single_flight`), course context snapshot reuse
+    (`course_context`), and how often malformed AI JSON was repaired instead
+    of re-requested (`structured_output`).
+    """
+)
+async def get_generation_cache_stats(
+    current_user: User = Depends(deps.get_current_user)
+):
+    """Get generation cache statistics."""
+    stats = await asyncio.to_thread(content_generator.cache.stats)
+    stats["single_flight"] = content_generator.single_flight.stats()
+    stats["course_context"] = course_contexts.stats()
+    stats["structured_output"] = structured_output.stats()
+    return stats
+
+@router.get("/providers/metrics",
+    response_model=Dict[str, Any],
+    summary="AI Provider Metrics",
+    description="""
+    Health of each configured AI provider as seen by the provider router:
+    circuit state (`closed`, `open`, `half_open`), EWMA and p95 latency in
+    seconds, EWMA error rate, success/failure counters and how many requests
+    were hedged with another provider because this one was slow.
+    """
+)
+async def get_provider_metrics(
+    current_user: User = Depends(deps.get_current_user)
+):
+    """Get AI provider routing metrics."""
+    return content_generator.router.metrics()
+
 @router.post("/upload", 
     response_model=ContentResponse,
-    summary="Upload Files",
+    summary="Upload File",
     description="""
-    Upload multiple files with the following features:
-    - Files are stored as base64 strings
+    Upload a single file with the following features:
+    - The file is streamed to the blob store and referenced by SHA-256 (`blob_sha256`);
+      identical files are stored once
+    - Files over MAX_FILE_SIZE are rejected with 413
     - Supports multiple file types
-    - Files are grouped by batch_id
     - Includes file metadata
+    - Download the bytes from `GET /content/{id}/file`
+    - To upload several files together, use `POST /content/batch`
     
     Example Input:
     ```
     Form Data:
-    files: [file1.pdf, file2.docx]
+    file: file1.pdf
+    title: "Lecture notes"
+    course_id: "..." (optional)
+    metadata: "{...}" (optional JSON)
     ```
     
+    Example Output:
+    ```json
+    {
+        "id": "550e8400-e29b-41d4-a716-446655440001",
+        "title": "Lecture notes",
+        "content_type": "file",
+        "content": "file1.pdf",
+        "blob_sha256": "9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08",
+        "meta": {
+            "filename": "file1.pdf",
+            "content_type": "application/pdf",
+            "size": 1024
+        }
+    }
+    ```
+    """
+)
+async def upload_file(
+    file: UploadFile = File(...),
+    title: str = Form(...),
+    course_id: Optional[str] = Form(None),
+    metadata: Optional[str] = Form(None),
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: User = Depends(deps.get_current_user)
+):
+    """Upload a file."""
+    try:
+        metadata_dict = json.loads(metadata) if metadata else {}
+        content = await store_file(file, title=title, course_id=course_id, meta=metadata_dict)
+        # create_content expects the API name of the type
+        created = await content_service.create_content(db, content.copy(update={"content_type": "FILE"}), current_user.id)
+        await db.run_sync(submit_extraction, [created], current_user.id)
+        return created
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/batch",
+    response_model=ContentBatchResponse,
+    summary="Upload a Batch of Files",
+    description="""
+    Upload several files as one batch:
+    - Files are streamed to the blob store concurrently and referenced by SHA-256
+      (`blob_sha256`); files over MAX_FILE_SIZE are rejected with 413
+    - The batch and all its content rows are inserted in one transaction
+    - Each file's `batch_id` points at the batch; list it with `GET /content/batch/{batch_id}`
+    - Text is extracted from .txt, .pdf and .docx files in the background
+
+    Example Input:
+    ```
+    Form Data:
+    files: [file1.pdf, file2.docx]
+    name: "Week 1 readings" (optional)
+    description: "..." (optional)
+    course_id: "..." (optional)
+    ```
+
     Example Output:
     ```json
     {
         "batch_id": "550e8400-e29b-41d4-a716-446655440000",
+        "name": "Week 1 readings",
+        "description": null,
         "files": [
             {
                 "id": "550e8400-e29b-41d4-a716-446655440001",
                 "title": "file1.pdf",
-                "content_type": "FILE",
-                "content": "base64_encoded_content",
+                "content_type": "file",
+                "content": "file1.pdf",
+                "blob_sha256": "9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08",
+                "batch_id": "550e8400-e29b-41d4-a716-446655440000",
                 "meta": {
                     "filename": "file1.pdf",
                     "content_type": "application/pdf",
-                    "size": 1024,
-                    "batch_id": "550e8400-e29b-41d4-a716-446655440000"
+                    "size": 1024
                 }
             }
         ]
@@ -523,27 +580,23 @@ async def generate_content(
     ```
     """
 )
-async def upload_file(
-    file: UploadFile = File(...),
-    title: str = Form(...),
+async def create_batch(
+    files: List[UploadFile] = File(...),
+    name: Optional[str] = Form(None),
+    description: Optional[str] = Form(None),
     course_id: Optional[str] = Form(None),
-    metadata: Optional[str] = Form(None),
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     current_user: User = Depends(deps.get_current_user)
 ):
-    """Upload multiple files."""
+    """Upload files as a new batch."""
     try:
-        metadata_dict = json.loads(metadata) if metadata else {}
-        content = ContentCreate(
-            title=title,
-            content=file.filename,  # Store file path/URL
-            content_type="FILE",
-            course_id=course_id,
-            meta=metadata_dict
+        return await content_service.create_batch(
+            db, files, current_user.id, ContentBatchCreate(name=name, description=description), course_id=course_id
         )
-        return await content_service.create_content(content, current_user.id)
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/batch/{batch_id}", 
     response_model=ContentBatchResponse,
@@ -555,17 +608,20 @@ async def upload_file(
     ```json
     {
         "batch_id": "550e8400-e29b-41d4-a716-446655440000",
+        "name": "Week 1 readings",
+        "description": null,
         "files": [
             {
                 "id": "550e8400-e29b-41d4-a716-446655440001",
                 "title": "file1.pdf",
-                "content_type": "FILE",
-                "content": "base64_encoded_content",
+                "content_type": "file",
+                "content": "file1.pdf",
+                "blob_sha256": "9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08",
+                "batch_id": "550e8400-e29b-41d4-a716-446655440000",
                 "meta": {
                     "filename": "file1.pdf",
                     "content_type": "application/pdf",
-                    "size": 1024,
-                    "batch_id": "550e8400-e29b-41d4-a716-446655440000"
+                    "size": 1024
                 }
             }
         ]
@@ -575,33 +631,23 @@ async def upload_file(
 )
 async def get_batch_files(
     batch_id: str,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     current_user: User = Depends(deps.get_current_user)
 ):
     """Get all files in a batch."""
     try:
-        query = db.query(ContentModel).filter(
-            ContentModel.meta['batch_id'].astext == batch_id,
-            ContentModel.created_by == current_user.id
-        )
-        
-        files = query.all()
-        
-        if not files:
-            raise HTTPException(status_code=404, detail="Batch not found")
-            
-        return {
-            "batch_id": batch_id,
-            "files": [Content.from_orm(file) for file in files]
-        }
+        return await content_service.get_batch(db, batch_id, current_user.id)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/batch/{batch_id}/files", 
-    response_model=ContentBatchResponse,
+    response_model=ContentBatchAddResponse,
     summary="Add Files to Batch",
     description="""
-    Add new files to an existing batch.
+    Add new files to an existing batch. The files are stored concurrently and
+    inserted in one transaction.
     
     Example Input:
     ```
@@ -615,15 +661,16 @@ async def get_batch_files(
         "batch_id": "550e8400-e29b-41d4-a716-446655440000",
         "added_files": [
             {
-                "id": "550e8400-e29b-41d4-a716-446655440003",
-                "title": "file3.pdf",
-                "content_type": "FILE",
-                "content": "base64_encoded_content",
+                "id": "550e8400-e29b-41d4-a716-446655440001",
+                "title": "file1.pdf",
+                "content_type": "file",
+                "content": "file1.pdf",
+                "blob_sha256": "9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08",
+                "batch_id": "550e8400-e29b-41d4-a716-446655440000",
                 "meta": {
-                    "filename": "file3.pdf",
+                    "filename": "file1.pdf",
                     "content_type": "application/pdf",
-                    "size": 1024,
-                    "batch_id": "550e8400-e29b-41d4-a716-446655440000"
+                    "size": 1024
                 }
             }
         ]
@@ -634,44 +681,14 @@ async def get_batch_files(
 async def add_files_to_batch(
     batch_id: str,
     files: List[UploadFile] = File(...),
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     current_user: User = Depends(deps.get_current_user)
 ):
     """Add files to an existing batch."""
     try:
-        existing_files = db.query(ContentModel).filter(
-            ContentModel.meta['batch_id'].astext == batch_id,
-            ContentModel.created_by == current_user.id
-        ).first()
-        
-        if not existing_files:
-            raise HTTPException(status_code=404, detail="Batch not found")
-            
-        uploaded_contents = []
-        for file in files:
-            content = await file.read()
-            content_b64 = base64.b64encode(content).decode('utf-8')
-            
-            content_obj = ContentCreate(
-                title=file.filename,
-                content_type=ContentType.FILE,
-                content=content_b64,
-                meta={
-                    "filename": file.filename,
-                    "content_type": file.content_type,
-                    "size": len(content),
-                    "batch_id": batch_id
-                },
-                description=f"Uploaded file: {file.filename}"
-            )
-            
-            content = crud_content.create_file(db=db, obj_in=content_obj, user_id=current_user.id)
-            uploaded_contents.append(Content.from_orm(content))
-            
-        return {
-            "batch_id": batch_id,
-            "added_files": uploaded_contents
-        }
+        return await content_service.add_files_to_batch(db, batch_id, files, current_user.id)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -680,7 +697,7 @@ async def add_files_to_batch(
     summary="Generate Contextual Content",
     description="""
     Generate content using AI based on course context:
-    - Uses all course-related content (transcripts, files, text)
+    - Uses the course text, transcripts and uploaded-file text most relevant to the extra parameters (e.g. `topic`)
     - Supports multiple content types
     - Can be customized with extra parameters
     
@@ -716,30 +733,16 @@ async def add_files_to_batch(
 )
 async def generate_contextual_content(
     request: ContentContextualGenerateRequest,
-    db: Session = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user)
 ):
     """Generate content using course context."""
     if not request.course_id:
         raise HTTPException(status_code=400, detail="Must provide course_id.")
 
-    query = db.query(ContentModel)
-    if request.course_id:
-        query = query.filter(ContentModel.course_id == request.course_id)
-    contents = query.all()
-
-    context_parts = []
-    for c in contents:
-        if c.content_type == ContentType.TEXT:
-            context_parts.append(c.content)
-        elif c.content_type == ContentType.VIDEO:
-            transcript = c.meta.get("transcript") if c.meta else None
-            if transcript:
-                context_parts.append(transcript)
-        elif c.content_type == ContentType.FILE:
-            pass
-
-    context = "\n\n".join(context_parts)
+    # Retrieve the course chunks relevant to the requested topic
+    extra = request.extra_parameters or {}
+    query = " ".join(str(value) for value in extra.values() if isinstance(value, str))
+    context = await content_generator._get_course_content(request.course_id, query)
     parameters = {"context": context}
     parameters.update(request.extra_parameters or {})
 
@@ -753,54 +756,10 @@ async def generate_contextual_content(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/generate-from-outline", 
-    response_model=Dict[str, Any],
-    summary="Generate Comprehensive Content from Outline",
-    description="""
-    Generate comprehensive educational content from an outline using AI.
-    The content will be structured as a list of chapters with detailed content.
-    
-    Example Input:
-    ```json
-    {
-        "outline": "Chapter 1: Introduction to Python\n- What is Python?\n- Why learn Python?\n- Setting up Python\n\nChapter 2: Basic Syntax\n- Variables and Data Types\n- Operators\n- Control Flow",
-        "course_id": "optional-course-id",
-        "provider": "gemini"
-    }
-    ```
-    
-    Example Output:
-    ```json
-    {
-        "chapters": [
-            {
-                "title": "Introduction to Python",
-                "sections": [
-                    {
-                        "title": "What is Python?",
-                        "content": "Python is a high-level, interpreted programming language...",
-                        "key_points": ["Easy to learn", "Versatile", "Large community"],
-                        "examples": ["print('Hello, World!')", "x = 5"]
-                    },
-                    {
-                        "title": "Why learn Python?",
-                        "content": "Python has become one of the most popular programming languages...",
-                        "key_points": ["High demand", "Easy syntax", "Rich ecosystem"],
-                        "examples": ["Data science", "Web development", "AI/ML"]
-                    }
-                ]
-            }
-        ]
-    }
-    ```
-    """
-)
-async def generate_from_outline(
-    request: OutlineContentRequest,
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user)
-) -> Any:
-    """Generate comprehensive content from an outline using AI."""
+async def _generate_outline_content(request: OutlineContentRequest, progress=None) -> Dict[str, Any]:
+    if request.mode == "parallel":
+        return await content_generator.generate_from_outline(request.outline, request.provider, progress=progress)
+
     try:
         # Prepare the prompt for Gemini
         prompt = f"""Generate comprehensive educational content based on the following outline. 
@@ -839,9 +798,10 @@ async def generate_from_outline(
         10. No markdown formatting or code blocks
         """
 
-        # Get valid JSON response with retries
-        content = await get_valid_json_response(content_generator, prompt)
-        return content
+        # Repaired and validated JSON; only unusable responses are re-asked
+        return await structured_output.generate(
+            "chapters", prompt, lambda text: content_generator._complete(text, request.provider)
+        )
 
     except Exception as e:
         print(f"General Error: {str(e)}")
@@ -854,6 +814,82 @@ async def generate_from_outline(
             }
         )
 
+@job_handler("content.generate_from_outline")
+async def run_outline_content_job(payload: dict, context: JobContext) -> Dict[str, Any]:
+    async def progress(done: int, total: int) -> None:
+        await context.progress(done / total, f"{done}/{total} chapters generated")
+
+    return await _generate_outline_content(OutlineContentRequest(**payload), progress)
+
+@router.post("/generate-from-outline", 
+    response_model=Dict[str, Any],
+    responses={202: {"model": JobResponse}},
+    summary="Generate Comprehensive Content from Outline",
+    description="""
+    Generate comprehensive educational content from an outline using AI.
+    The content will be structured as a list of chapters with detailed content.
+    
+    Example Input:
+    ```json
+    {
+        "outline": "Chapter 1: Introduction to Python\n- What is Python?\n- Why learn Python?\n- Setting up Python\n\nChapter 2: Basic Syntax\n- Variables and Data Types\n- Operators\n- Control Flow",
+        "course_id": "optional-course-id",
+        "provider": "gemini",
+        "mode": "parallel"
+    }
+    ```
+    
+    In `parallel` mode (the default) the outline is split into chapters at
+    headings such as "Chapter 2: ...", "## Basics" or "3. Loops". Chapters are
+    generated concurrently, and only failed chapters are retried. A chapter that
+    still fails comes back with an `error` and is listed in `failed_chapters`.
+    `single` mode sends the whole outline as one prompt.
+    
+    With `?mode=job` the content is generated in the background: the response
+    is `202 Accepted` with a job (see `/jobs/{job_id}`), whose progress counts
+    finished chapters and whose result has the shape below.
+    
+    Example Output:
+    ```json
+    {
+        "chapters": [
+            {
+                "title": "Introduction to Python",
+                "sections": [
+                    {
+                        "title": "What is Python?",
+                        "content": "Python is a high-level, interpreted programming language...",
+                        "key_points": ["Easy to learn", "Versatile", "Large community"],
+                        "examples": ["print('Hello, World!')", "x = 5"]
+                    },
+                    {
+                        "title": "Why learn Python?",
+                        "content": "Python has become one of the most popular programming languages...",
+                        "key_points": ["High demand", "Easy syntax", "Rich ecosystem"],
+                        "examples": ["Data science", "Web development", "AI/ML"]
+                    }
+                ]
+            }
+        ],
+        "failed_chapters": []
+    }
+    ```
+    """
+)
+async def generate_from_outline(
+    request: OutlineContentRequest,
+    mode: str = Query("sync", pattern="^(sync|job)$", description="`job` generates the content in the background and returns 202 with a job id"),
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: User = Depends(deps.get_current_user)
+) -> Any:
+    """Generate comprehensive content from an outline using AI."""
+    if request.mode not in ("parallel", "single"):
+        raise HTTPException(status_code=400, detail="mode must be 'parallel' or 'single'")
+    if mode == "job":
+        job = await db.run_sync(job_pool.submit, "content.generate_from_outline", request.dict(), current_user.id)
+        return job_accepted(job)
+    return await _generate_outline_content(request)
+
 @router.post("/chat", 
     response_model=ChatResponse,
     summary="Chat with Course AI",
@@ -906,7 +942,6 @@ async def generate_from_outline(
 )
 async def chat_with_course(
     request: ChatRequest,
-    db: Session = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user)
 ):
     """Chat with an AI tutor about course content."""
@@ -918,4 +953,50 @@ async def chat_with_course(
         )
         return result
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/chat/stream",
+    summary="Stream Chat with Course AI",
+    description="""
+    Same request body as `/content/chat`, but the answer is streamed as
+    Server-Sent Events (`text/event-stream`) while the provider generates it.
+    
+    Example Output:
+    ```
+    event: token
+    data: {"delta": "Quantum computing uses "}
+    
+    event: token
+    data: {"delta": "quantum bits (qubits)..."}
+    
+    event: done
+    data: {"response": "Quantum computing uses quantum bits (qubits)...", "history": [...]}
+    ```
+    
+    Errors are sent as an `error` event with a `detail` field. Closing the
+    connection cancels the upstream provider request.
+    """
+)
+async def stream_chat_with_course(
+    request: ChatRequest,
+    provider: str = "openai",
+    current_user: User = Depends(deps.get_current_user)
+):
+    """Stream an AI tutor answer about course content."""
+    history = [msg.dict() for msg in request.history or []]
+
+    async def with_history(response: str) -> Dict[str, Any]:
+        return {
+            "history": history + [
+                {"role": "user", "content": request.prompt},
+                {"role": "assistant", "content": response}
+            ]
+        }
+
+    chunks = content_generator.stream_chat_response(
+        course_id=request.course_id,
+        prompt=request.prompt,
+        history=history,
+        provider=provider
+    )
+    return sse_response(chunks, on_complete=with_history)
\ No newline at end of file
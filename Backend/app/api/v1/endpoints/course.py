@@ -1,23 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.api import deps
 from app.schemas.course import Course, CourseCreate, CourseUpdate
-from app.crud import crud_course
+from app.crud import crud_course, crud_course_async
+from app.crud.pagination import Cursor
 from app.models.user import User
 from app.services.content_generator import ContentGenerator
+from app.services.jobs import JobContext, job_accepted, job_handler, job_pool
+from app.schemas.job import JobResponse
+from app.db.session import AsyncSessionLocal
 
 router = APIRouter()
 content_generator = ContentGenerator()
 
-@router.post("/", response_model=Course)
-async def create_course(
-    course_in: CourseCreate,
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user)
-):
+async def _create_course(db: AsyncSession, prompt: str, creator_id: str) -> Course:
     # Call AI to generate title, sub_title, description
-    prompt = course_in.prompt
     response = await content_generator.generate_course_content(prompt)
     
     import json as _json
@@ -39,9 +38,26 @@ async def create_course(
         description=description,
         prompt=prompt
     )
-    course = crud_course.create(db=db, obj_in=course_data, creator_id=current_user.id)
+    course = await crud_course_async.create(db=db, obj_in=course_data, creator_id=creator_id)
     return Course.from_orm(course)
 
+@job_handler("course.create")
+async def run_create_course_job(payload: dict, context: JobContext) -> Course:
+    async with AsyncSessionLocal() as db:
+        return await _create_course(db, payload["prompt"], context.user_id)
+
+@router.post("/", response_model=Course, responses={202: {"model": JobResponse}})
+async def create_course(
+    course_in: CourseCreate,
+    mode: str = Query("sync", pattern="^(sync|job)$", description="`job` generates the course in the background and returns 202 with a job id"),
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: User = Depends(deps.get_current_user)
+):
+    if mode == "job":
+        job = await db.run_sync(job_pool.submit, "course.create", {"prompt": course_in.prompt}, current_user.id)
+        return job_accepted(job)
+    return await _create_course(db, course_in.prompt, current_user.id)
+
 @router.get("/{course_id}", response_model=Course)
 def get_course(
     course_id: str,
@@ -55,13 +71,16 @@ def get_course(
 
 @router.get("/", response_model=List[Course])
 def list_courses(
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    cursor: Optional[Cursor] = Depends(deps.get_cursor),
+    limit: int = Query(100, ge=1, le=100),
     db: Session = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user)
 ):
-    courses = crud_course.get_multi(db=db, skip=skip, limit=limit)
-    return [Course.from_orm(course) for course in courses]
+    """List courses, newest first. The next page's cursor is in `X-Next-Cursor`."""
+    page = crud_course.get_page(db=db, cursor=cursor, limit=limit)
+    deps.set_next_cursor(response, page)
+    return [Course.from_orm(course) for course in page.items]
 
 @router.put("/{course_id}", response_model=Course)
 def update_course(
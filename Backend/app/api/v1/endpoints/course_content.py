@@ -1,22 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import List
 from app.api import deps
-from app.schemas.content import Content
+from app.schemas.content import Content, ContentListItem
 from app.schemas.learning_path import LearningPath
 from app.models.course import Course as CourseModel
 from app.models.content import Content as ContentModel
 from app.models.learning_path import LearningPath as LearningPathModel
-from app.crud import crud_course
+from app.crud import crud_content, crud_course, crud_learning_path
 from app.models.user import User
 
 router = APIRouter()
 
 @router.get("/{course_id}/contents", 
-    response_model=List[Content],
+    response_model=List[ContentListItem],
     summary="List Course Contents",
     description="""
     Retrieve all content associated with a specific course.
+
+    With `include_body=false` only the metadata is read and returned
+    (`content` is null), which keeps listings of large uploads cheap.
     
     Example Output:
     ```json
@@ -58,6 +61,7 @@ router = APIRouter()
 )
 def list_course_contents(
     course_id: str,
+    include_body: bool = Query(True, description="Set to false to leave out the content bodies"),
     db: Session = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user)
 ):
@@ -65,8 +69,11 @@ def list_course_contents(
     course = crud_course.get(db=db, id=course_id)
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
-    contents = db.query(ContentModel).filter(ContentModel.course_id == course_id).all()
-    return [Content.from_orm(c) for c in contents]
+    if include_body:
+        contents = crud_content.get_by_course(db, course_id, include_body=True)
+    else:
+        contents = crud_content.get_summaries_by_course(db, course_id)
+    return [ContentListItem.from_orm(c) for c in contents]
 
 @router.get("/{course_id}/learning-paths", 
     response_model=List[LearningPath],
@@ -112,7 +119,7 @@ def list_course_learning_paths(
     course = crud_course.get(db=db, id=course_id)
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
-    learning_paths = db.query(LearningPathModel).filter(LearningPathModel.course_id == course_id).all()
+    learning_paths = crud_learning_path.get_multi_by_course(db, course_id, with_steps=True)
     return [LearningPath.from_orm(lp) for lp in learning_paths]
 
 @router.post("/{course_id}/contents/{content_id}", 
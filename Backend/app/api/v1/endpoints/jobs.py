@@ -0,0 +1,99 @@
+from typing import Any, List
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+from app.api import deps
+from app.crud.crud_job import crud_job
+from app.models.enums import JobStatus
+from app.models.job import Job
+from app.models.user import User
+from app.schemas.job import JobProgress, JobResponse, JobResult
+
+router = APIRouter()
+
+def _get_own_job(db: Session, job_id: str, user: User) -> Job:
+    job = crud_job.get(db, job_id)
+    if not job or job.created_by != user.id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.get("/",
+    response_model=List[JobResponse],
+    summary="List Jobs",
+    description="""
+    Background jobs submitted by the current user, newest first.
+    """
+)
+def list_jobs(
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user)
+) -> Any:
+    """List the current user's jobs."""
+    return crud_job.get_by_user(db, user_id=current_user.id, skip=skip, limit=limit)
+
+@router.get("/{job_id}",
+    response_model=JobResponse,
+    summary="Get Job Status",
+    description="""
+    Status of a background job: `queued`, `running`, `succeeded` or `failed`.
+    A failed attempt that will be retried is back in `queued` with the last
+    `error` and the time of the next attempt in `run_after`.
+    """
+)
+def get_job(
+    job_id: str,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user)
+) -> Any:
+    """Get a job's status."""
+    return _get_own_job(db, job_id, current_user)
+
+@router.get("/{job_id}/progress",
+    response_model=JobProgress,
+    summary="Get Job Progress",
+    description="""
+    Lightweight progress poll: status, completed fraction (0.0 - 1.0) and a
+    short message such as the chapter that was just generated.
+    """
+)
+def get_job_progress(
+    job_id: str,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user)
+) -> Any:
+    """Get a job's progress."""
+    job = _get_own_job(db, job_id, current_user)
+    return JobProgress.from_orm(job)
+
+@router.get("/{job_id}/result",
+    response_model=JobResult,
+    summary="Get Job Result",
+    description="""
+    The result of a finished job, in the same shape the synchronous endpoint
+    returns. While the job is still queued or running the job status is
+    returned with `202 Accepted` and a `Retry-After` header; a job that
+    failed for good returns `409` with its last error.
+    """
+)
+def get_job_result(
+    job_id: str,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user)
+) -> Any:
+    """Get a finished job's result."""
+    job = _get_own_job(db, job_id, current_user)
+    if job.status == JobStatus.SUCCEEDED.value:
+        return JobResult.from_orm(job)
+    if job.status == JobStatus.FAILED.value:
+        raise HTTPException(
+            status_code=409,
+            detail={"error": job.error, "attempts": job.attempts}
+        )
+    return JSONResponse(
+        status_code=202,
+        content=jsonable_encoder(JobResponse.from_orm(job)),
+        headers={"Retry-After": "2"}
+    )
@@ -1,14 +1,13 @@
+import logging
 from typing import List
 from uuid import UUID
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
-from app.crud.crud_learning_path import (
-    crud_learning_path,
-    crud_learning_path_step
-)
+from app.db.session import AsyncSessionLocal
+from app.crud.crud_learning_path import crud_learning_path_async
 from app.schemas.learning_path import (
     LearningPathCreate,
     LearningPathInDB,
@@ -18,41 +17,45 @@ from app.schemas.progress import Progress
 from app.api import deps
 from app.models.user import User
 from app.services.content_generator import ContentGenerator
+from app.services.jobs import JobContext, job_accepted, job_handler, job_pool
+from app.schemas.job import JobResponse
 from app.models.course import Course
 from app.models.learning_path import LearningPath
 from app.models.learning_path_step import LearningPathStep
 from app.models.progress import UserProgress
 from app.models.content import ContentType
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 content_generator = ContentGenerator()
 
 @router.post("/generate-outline", response_model=dict)
 async def generate_learning_path_outline(
     course_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     current_user: User = Depends(deps.get_current_active_user)
 ):
     """Generate a new learning path outline for a course, regardless of existing paths."""
-    course = db.query(Course).filter(Course.id == course_id).first()
+    course = await db.get(Course, course_id)
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
-    outline = content_generator.generate_learning_path_outline(course.title, course.description or "")
+    outline = await content_generator.generate_learning_path_outline(course.title, course.description or "")
     return outline
 
 @router.get("/course/{course_id}/outline", response_model=dict)
 async def get_course_learning_path_outline(
     course_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     current_user: User = Depends(deps.get_current_active_user)
 ):
     """Get the learning path outline for a course. Returns existing path outline if available."""
-    course = db.query(Course).filter(Course.id == course_id).first()
+    course = await db.get(Course, course_id)
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
     
     # Check if there's an existing learning path for this course
-    existing_path = db.query(LearningPath).filter(LearningPath.course_id == course_id).first()
+    existing_path = await crud_learning_path_async.get_by_course(db, course_id, with_steps=True)
     if existing_path:
         # If there's an existing path, return its outline
         return {
@@ -72,37 +75,29 @@ async def get_course_learning_path_outline(
         }
     
     # If no existing path, generate a new outline
-    outline = content_generator.generate_learning_path_outline(course.title, course.description or "")
+    outline = await content_generator.generate_learning_path_outline(course.title, course.description or "")
     return outline
 
-@router.post("/course/{course_id}/create-from-outline", response_model=LearningPathInDB)
-async def create_learning_path_from_outline(
-    course_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_active_user)
-) -> LearningPathInDB:
-    """Create a learning path from the generated outline for a course."""
-    print(f"[DEBUG] Starting create_learning_path_from_outline for course_id: {course_id}")
-    print(f"[DEBUG] Current user ID: {current_user.id}")
-    
+async def _get_course_without_path(db: AsyncSession, course_id: str) -> Course:
     # First check if course exists
-    course = db.query(Course).filter(Course.id == course_id).first()
+    course = await db.get(Course, course_id)
     if not course:
-        print(f"[DEBUG] Course not found with ID: {course_id}")
         raise HTTPException(status_code=404, detail=f"Course not found with ID: {course_id}")
-    print(f"[DEBUG] Found course: {course.title}")
     
     # Check if there's already a learning path for this course
-    existing_path = db.query(LearningPath).filter(LearningPath.course_id == course_id).first()
+    existing_path = await crud_learning_path_async.get_by_course(db, course_id)
     if existing_path:
-        print(f"[DEBUG] Learning path already exists with ID: {existing_path.id}")
         raise HTTPException(status_code=400, detail="Learning path already exists for this course")
+    return course
+
+async def _create_learning_path_from_outline(db: AsyncSession, course_id: str, user_id: str) -> LearningPathInDB:
+    course = await _get_course_without_path(db, course_id)
     
     # Generate the outline
-    outline = content_generator.generate_learning_path_outline(course.title, course.description or "")
-    print(f"[DEBUG] Generated outline: {outline}")
+    outline = await content_generator.generate_learning_path_outline(course.title, course.description or "")
+    logger.debug(f"Generated outline for course {course_id}: {outline}")
     
-    # Create the learning path first
+    # The path and its steps are written in one transaction
     learning_path_in = LearningPathCreate(
         title=outline["materialTitle"],
         description=outline["materialDescription"],
@@ -110,66 +105,72 @@ async def create_learning_path_from_outline(
         difficulty_level="beginner",
         estimated_duration=int(sum(float(chapter["estimatedDuration"].split()[0]) * 60 for chapter in outline["chapters"])),
         tags=[concept for chapter in outline["chapters"] for concept in chapter["keyConcepts"]],
-        course_id=course_id
+        steps=[
+            LearningPathStepCreate(
+                title=chapter["title"],
+                description=chapter["description"],
+                content_type=ContentType.TEXT,
+                content=chapter["description"],
+                order=idx + 1
+            )
+            for idx, chapter in enumerate(outline["chapters"])
+        ]
     )
-    print(f"[DEBUG] Created LearningPathCreate object: {learning_path_in.dict()}")
     
     # Create the learning path in the database
     try:
-        created_path = crud_learning_path.create(db, obj_in=learning_path_in, created_by=str(current_user.id))
-        print(f"[DEBUG] Successfully created learning path with ID: {created_path.id}")
-        print(f"[DEBUG] Learning path details: {created_path.__dict__}")
-    except Exception as e:
-        print(f"[ERROR] Failed to create learning path: {str(e)}")
-        print(f"[ERROR] Error type: {type(e)}")
-        raise
-    
-    # Now create the steps
-    for idx, chapter in enumerate(outline["chapters"]):
-        step_in = LearningPathStepCreate(
-            title=chapter["title"],
-            description=chapter["description"],
-            content_type=ContentType.TEXT,
-            content=chapter["description"],
-            order=idx + 1
+        created_path = await crud_learning_path_async.create(
+            db, obj_in=learning_path_in, created_by=str(user_id), course_id=course_id
         )
-        print(f"[DEBUG] Creating step {idx + 1}: {step_in.dict()}")
-        try:
-            created_step = crud_learning_path_step.create(db, obj_in=step_in, learning_path_id=str(created_path.id))
-            print(f"[DEBUG] Successfully created step {idx + 1} with ID: {created_step.id}")
-        except Exception as e:
-            print(f"[ERROR] Failed to create step {idx + 1}: {str(e)}")
-            print(f"[ERROR] Error type: {type(e)}")
-            raise
-    
-    # Refresh the created path to include steps
-    db.refresh(created_path)
-    print(f"[DEBUG] Final learning path: {created_path.__dict__}")
-    print(f"[DEBUG] Number of steps: {len(created_path.steps)}")
+    except Exception:
+        logger.exception(f"Failed to create learning path for course {course_id}")
+        raise
+    logger.debug(f"Created learning path {created_path.id} with {len(created_path.steps)} steps")
     
     # Convert to LearningPathInDB model
     result = LearningPathInDB.from_orm(created_path)
-    print(f"[DEBUG] Returning learning path with ID: {result.id}")
     return result
 
+@job_handler("learning_path.create_from_outline")
+async def run_create_learning_path_job(payload: dict, context: JobContext) -> LearningPathInDB:
+    async with AsyncSessionLocal() as db:
+        return await _create_learning_path_from_outline(db, payload["course_id"], context.user_id)
+
+@router.post("/course/{course_id}/create-from-outline", response_model=LearningPathInDB, responses={202: {"model": JobResponse}})
+async def create_learning_path_from_outline(
+    course_id: str,
+    mode: str = Query("sync", pattern="^(sync|job)$", description="`job` generates the learning path in the background and returns 202 with a job id"),
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: User = Depends(deps.get_current_active_user)
+) -> LearningPathInDB:
+    """Create a learning path from the generated outline for a course."""
+    if mode == "job":
+        # Fail fast on a missing course or an existing path instead of in the job
+        await _get_course_without_path(db, course_id)
+        job = await db.run_sync(
+            job_pool.submit, "learning_path.create_from_outline", {"course_id": course_id}, current_user.id
+        )
+        return job_accepted(job)
+    return await _create_learning_path_from_outline(db, course_id, current_user.id)
+
 @router.get("/course/{course_id}", response_model=LearningPathInDB)
 async def get_learning_path_by_course(
     course_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     current_user: User = Depends(deps.get_current_active_user)
 ) -> LearningPathInDB:
     """Get the learning path for a specific course."""
     print(f"[DEBUG] Looking for learning path with course_id: {course_id}")
     
     # First check if course exists
-    course = db.query(Course).filter(Course.id == course_id).first()
+    course = await db.get(Course, course_id)
     if not course:
         print(f"[DEBUG] Course not found with ID: {course_id}")
         raise HTTPException(status_code=404, detail=f"Course not found with ID: {course_id}")
     print(f"[DEBUG] Found course: {course.title}")
     
     # Then look for the learning path
-    path = db.query(LearningPath).filter(LearningPath.course_id == course_id).first()
+    path = await crud_learning_path_async.get_by_course(db, course_id, with_steps=True)
     if not path:
         print(f"[DEBUG] Learning path not found for course: {course_id}")
         raise HTTPException(status_code=404, detail=f"Learning path not found for course: {course_id}")
@@ -181,16 +182,16 @@ async def get_learning_path_by_course(
 async def get_user_progress(
     path_id: str,
     current_user: User = Depends(deps.get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(deps.get_async_db)
 ) -> List[Progress]:
     """Get user progress for a specific learning path."""
     try:
         # Get all progress entries for this user and path
-        progress = db.query(UserProgress).filter(
+        result = await db.execute(select(UserProgress).filter(
             UserProgress.user_id == current_user.id,
             UserProgress.learning_path_id == path_id
-        ).all()
-        return progress
+        ))
+        return result.scalars().all()
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -200,28 +201,28 @@ async def update_step_progress(
     step_id: str,
     completed: bool,
     current_user: User = Depends(deps.get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(deps.get_async_db)
 ) -> Progress:
     """Update progress for a specific step in a learning path."""
     try:
         # Check if learning path and step exist
-        learning_path = db.query(LearningPath).filter(LearningPath.id == path_id).first()
+        learning_path = await db.get(LearningPath, path_id)
         if not learning_path:
             raise HTTPException(status_code=404, detail="Learning path not found")
         
-        step = db.query(LearningPathStep).filter(
+        step = (await db.execute(select(LearningPathStep).filter(
             LearningPathStep.id == step_id,
             LearningPathStep.learning_path_id == path_id
-        ).first()
+        ))).scalars().first()
         if not step:
             raise HTTPException(status_code=404, detail="Step not found in this learning path")
 
         # Get or create progress entry
-        progress = db.query(UserProgress).filter(
+        progress = (await db.execute(select(UserProgress).filter(
             UserProgress.user_id == current_user.id,
             UserProgress.learning_path_id == path_id,
             UserProgress.step_id == step_id
-        ).first()
+        ))).scalars().first()
 
         if progress:
             # Update existing progress
@@ -238,22 +239,22 @@ async def update_step_progress(
             )
             db.add(progress)
 
-        db.commit()
-        db.refresh(progress)
+        await db.commit()
+        await db.refresh(progress)
         return progress
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/course/{course_id}/steps", response_model=List[dict])
 async def get_learning_path_steps(
     course_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     current_user: User = Depends(deps.get_current_active_user)
 ) -> List[dict]:
     """Get all steps for a learning path by course ID."""
     # Get the learning path
-    path = db.query(LearningPath).filter(LearningPath.course_id == course_id).first()
+    path = await crud_learning_path_async.get_by_course(db, course_id, with_steps=True)
     if not path:
         raise HTTPException(status_code=404, detail="Learning path not found")
     
@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 
 from app.api import deps
 from app.crud import crud_progress
+from app.db.writer import db_writer
 from app.models.user import User
 from app.schemas.progress import (
     Progress,
@@ -18,16 +19,13 @@ router = APIRouter()
 @router.post("/record", response_model=Progress)
 def record_progress(
     *,
-    db: Session = Depends(deps.get_db),
     progress_in: ProgressCreate,
     current_user: User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Record progress for a learning path step.
     """
-    progress = crud_progress.create(
-        db=db, obj_in=progress_in, user_id=current_user.id
-    )
+    progress = db_writer.run_sync(crud_progress.create, obj_in=progress_in, user_id=current_user.id)
     return progress
 
 @router.get("/user/{user_id}", response_model=List[Progress])
@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from app.api import deps
+from app.crud.pagination import InvalidCursor
+from app.models.user import User
+from app.schemas.search import SearchHit
+from app.services import material_search
+
+router = APIRouter()
+
+@router.get("/", response_model=List[SearchHit])
+def search_material(
+    response: Response,
+    q: str = Query(..., min_length=1, description="Words to find; end a word with `*` for a prefix search"),
+    course_id: Optional[str] = Query(None, description="Only this course and its content"),
+    type: Optional[str] = Query(None, pattern="^(course|text|video|youtube)$", description="Only this kind of material"),
+    creator_id: Optional[str] = Query(None, description="Only material created by this user"),
+    cursor: Optional[str] = Query(None, description="`X-Next-Cursor` from the previous page; omit for the first page"),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(deps.get_current_user),
+    db: Session = Depends(deps.get_db)
+):
+    """Full-text search over course titles and descriptions, text content,
+    video transcripts and transcribed YouTube videos, best matches first.
+
+    All words must appear in the title or body. Each hit has a `snippet` of
+    the body with the matched words wrapped in `<mark>` tags; text is not
+    HTML-escaped. The next page's cursor is in `X-Next-Cursor`.
+    """
+    try:
+        page = material_search.search(
+            db, q, course_id=course_id, kind=type, creator_id=creator_id, cursor=cursor, limit=limit
+        )
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    deps.set_next_cursor(response, page)
+    return [SearchHit(**vars(hit)) for hit in page.items]
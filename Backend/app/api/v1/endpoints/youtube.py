@@ -1,14 +1,22 @@
 from fastapi import APIRouter, Depends, HTTPException, Form, UploadFile, File, Query
 from typing import Optional, List, Dict
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer
 from app.api import deps
+from app.crud.pagination import Cursor, keyset, page_of, total_counts
 from app.models.user import User
 from app.models.youtube_content import YouTubeContent, YouTubeChatMessage
 from app.services.youtube.video_downloader.yt_download import download_video, is_valid_youtube_url
 from app.services.youtube.transcript_downloader.yt_transcript_download import get_single_transcript
 from app.services.youtube.channel_downloader.yt_channel_download import get_channel_videos
 from app.services.youtube.thumbnail_downloader.yt_thumbnail_downloader import get_thumbnail
-from app.services.ai.chat import get_ai_response
+from app.services.ai.chat import get_ai_response, stream_ai_response
+from app.core.sse import sse_response
+from app.services.jobs import JobContext, job_accepted, job_handler, job_pool
+from app.schemas.job import JobResponse
+from app.db.session import AsyncSessionLocal
+import asyncio
 import tempfile
 import os
 from pydantic import BaseModel
@@ -67,29 +75,32 @@ class YouTubeVideoList(BaseModel):
     title: str
     thumbnail_url: Optional[str]
     video_url: str
-    transcript: str
+    transcript: Optional[str] = None
     created_at: str
 
 class YouTubeVideoListResponse(BaseModel):
     videos: List[YouTubeVideoList]
-    total: int
-    page: int
+    total: int  # May lag behind by up to PAGINATION_COUNT_TTL seconds
     page_size: int
     total_pages: int
+    next_cursor: Optional[str] = None
 
-@router.post("/download", response_model=VideoDownloadResponse)
-async def download_youtube_video(
-    request: VideoDownloadRequest,
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user)
-):
-    """Download a YouTube video with specified resolution."""
-    if not is_valid_youtube_url(request.url):
-        raise HTTPException(status_code=400, detail="Invalid YouTube URL")
-    
+TRANSCRIBED_VIDEOS = "youtube.transcribed_videos"
+
+async def _get_video(db: AsyncSession, video_id: str, with_transcript: bool = False) -> Optional[YouTubeContent]:
+    query = select(YouTubeContent).filter(YouTubeContent.video_id == video_id)
+    if with_transcript:
+        # The transcript is deferred and cannot be lazy loaded from async code
+        query = query.options(undefer(YouTubeContent.transcript))
+    result = await db.execute(query)
+    return result.scalars().first()
+
+async def _download_video(db: AsyncSession, request: VideoDownloadRequest, user_id: str) -> VideoDownloadResponse:
     try:
         with tempfile.TemporaryDirectory() as temp_dir:
-            result = download_video(
+            # yt-dlp blocks for the whole download, so keep it off the event loop
+            result = await asyncio.to_thread(
+                download_video,
                 url=request.url,
                 savedir=temp_dir,
                 resolution_dropdown=request.resolution
@@ -100,10 +111,10 @@ async def download_youtube_video(
                 video_id=result["video_id"],
                 title=result["video_title"],
                 video_url=request.url,
-                created_by=current_user.id
+                created_by=user_id
             )
             db.add(youtube_content)
-            db.commit()
+            await db.commit()
             
             return VideoDownloadResponse(
                 video_path=result["video_path"],
@@ -113,10 +124,30 @@ async def download_youtube_video(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@job_handler("youtube.download")
+async def run_download_job(payload: dict, context: JobContext) -> VideoDownloadResponse:
+    async with AsyncSessionLocal() as db:
+        return await _download_video(db, VideoDownloadRequest(**payload), context.user_id)
+
+@router.post("/download", response_model=VideoDownloadResponse, responses={202: {"model": JobResponse}})
+async def download_youtube_video(
+    request: VideoDownloadRequest,
+    mode: str = Query("sync", pattern="^(sync|job)$", description="`job` downloads in the background and returns 202 with a job id"),
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: User = Depends(deps.get_current_user)
+):
+    """Download a YouTube video with specified resolution."""
+    if not is_valid_youtube_url(request.url):
+        raise HTTPException(status_code=400, detail="Invalid YouTube URL")
+    if mode == "job":
+        job = await db.run_sync(job_pool.submit, "youtube.download", request.dict(), current_user.id)
+        return job_accepted(job)
+    return await _download_video(db, request, current_user.id)
+
 @router.post("/transcript", response_model=TranscriptResponse)
 async def get_video_transcript(
     request: TranscriptRequest,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     current_user: User = Depends(deps.get_current_user)
 ):
     """Get transcript for a YouTube video."""
@@ -127,10 +158,10 @@ async def get_video_transcript(
         transcript_data = get_single_transcript(request.url)
         
         # Store transcript in database
-        youtube_content = db.query(YouTubeContent).filter(YouTubeContent.video_id == transcript_data["video_id"]).first()
+        youtube_content = await _get_video(db, transcript_data["video_id"])
         if youtube_content:
             youtube_content.transcript = transcript_data["transcript"]
-            db.commit()
+            await db.commit()
         else:
             youtube_content = YouTubeContent(
                 video_id=transcript_data["video_id"],
@@ -140,7 +171,8 @@ async def get_video_transcript(
                 created_by=current_user.id
             )
             db.add(youtube_content)
-            db.commit()
+            await db.commit()
+        total_counts.invalidate(TRANSCRIBED_VIDEOS)
         
         return TranscriptResponse(**transcript_data)
     except Exception as e:
@@ -149,7 +181,7 @@ async def get_video_transcript(
 @router.post("/channel", response_model=ChannelVideosResponse)
 async def get_channel_videos_list(
     request: ChannelRequest,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     current_user: User = Depends(deps.get_current_user)
 ):
     """Get list of videos from a YouTube channel."""
@@ -169,7 +201,7 @@ async def get_channel_videos_list(
 @router.post("/thumbnail", response_model=ThumbnailResponse)
 async def get_video_thumbnail(
     request: ThumbnailRequest,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     current_user: User = Depends(deps.get_current_user)
 ):
     """Get thumbnail for a YouTube video."""
@@ -181,11 +213,11 @@ async def get_video_thumbnail(
             thumbnail_path, metadata = get_thumbnail(request.url, temp_dir)
             
             # Store thumbnail info in database
-            youtube_content = db.query(YouTubeContent).filter(YouTubeContent.video_id == metadata["video_id"]).first()
+            youtube_content = await _get_video(db, metadata["video_id"])
             if youtube_content:
                 youtube_content.thumbnail_url = metadata["thumbnail_url"]
                 youtube_content.video_metadata = metadata
-                db.commit()
+                await db.commit()
             else:
                 youtube_content = YouTubeContent(
                     video_id=metadata["video_id"],
@@ -196,7 +228,7 @@ async def get_video_thumbnail(
                     created_by=current_user.id
                 )
                 db.add(youtube_content)
-                db.commit()
+                await db.commit()
             
             return ThumbnailResponse(
                 thumbnail_path=thumbnail_path,
@@ -209,11 +241,11 @@ async def get_video_thumbnail(
 @router.post("/chat", response_model=ChatMessageResponse)
 async def chat_about_video(
     request: ChatMessageRequest,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     current_user: User = Depends(deps.get_current_user)
 ):
     """Chat about a YouTube video using its transcript or title."""
-    youtube_content = db.query(YouTubeContent).filter(YouTubeContent.video_id == request.video_id).first()
+    youtube_content = await _get_video(db, request.video_id, with_transcript=True)
     if not youtube_content:
         raise HTTPException(status_code=404, detail="Video not found")
     
@@ -238,10 +270,12 @@ async def chat_about_video(
     chat_message = YouTubeChatMessage(
         youtube_content_id=youtube_content.id,
         user_id=current_user.id,
-        message=request.message
+        message=request.message,
+        ai_response=ai_response
     )
     db.add(chat_message)
-    db.commit()
+    await db.commit()
+    await db.refresh(chat_message)
     
     return ChatMessageResponse(
         id=chat_message.id,
@@ -251,27 +285,77 @@ async def chat_about_video(
         user_id=chat_message.user_id
     )
 
+async def _save_chat_message(youtube_content_id: str, user_id: str, message: str, ai_response: str) -> Dict[str, str]:
+    # Streaming bodies outlive the request's session dependency, so use a fresh one
+    async with AsyncSessionLocal() as db:
+        chat_message = YouTubeChatMessage(
+            youtube_content_id=youtube_content_id,
+            user_id=user_id,
+            message=message,
+            ai_response=ai_response
+        )
+        db.add(chat_message)
+        await db.commit()
+        await db.refresh(chat_message)
+        return {"id": chat_message.id, "created_at": chat_message.created_at.isoformat()}
+
+@router.post("/chat/stream")
+async def stream_chat_about_video(
+    request: ChatMessageRequest,
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: User = Depends(deps.get_current_user)
+):
+    """Stream the answer about a YouTube video as Server-Sent Events.
+
+    Emits `token` events with `{"delta": ...}` while Gemini generates, then a
+    `done` event with the full response once the question and the answer have
+    been stored.
+    """
+    youtube_content = await _get_video(db, request.video_id, with_transcript=True)
+    if not youtube_content:
+        raise HTTPException(status_code=404, detail="Video not found")
+    
+    context = {
+        "video_title": youtube_content.title,
+        "video_url": youtube_content.video_url,
+        "user_message": request.message
+    }
+    if youtube_content.transcript:
+        context["transcript"] = youtube_content.transcript
+    
+    youtube_content_id = youtube_content.id
+    user_id = current_user.id
+
+    async def save(ai_response: str) -> Dict[str, str]:
+        return await _save_chat_message(youtube_content_id, user_id, request.message, ai_response)
+
+    return sse_response(stream_ai_response(context), on_complete=save)
+
 @router.get("/videos", response_model=YouTubeVideoListResponse)
 async def list_youtube_videos(
-    page: int = Query(1, ge=1),
+    cursor: Optional[Cursor] = Depends(deps.get_cursor),
     page_size: int = Query(10, ge=1, le=100),
-    db: Session = Depends(deps.get_db),
+    include_body: bool = Query(True, description="Set to false to leave out the transcripts"),
+    db: AsyncSession = Depends(deps.get_async_db),
     current_user: User = Depends(deps.get_current_user)
 ):
-    """List all stored YouTube videos that have transcripts."""
-    # Calculate offset
-    offset = (page - 1) * page_size
-    
-    # Get total count of videos with transcripts
-    total = db.query(YouTubeContent).filter(YouTubeContent.transcript.isnot(None)).count()
+    """List all stored YouTube videos that have transcripts, newest first.
+
+    Pass `next_cursor` back as `cursor` for the following page. With
+    `include_body=false` the transcripts are neither read nor returned."""
+    # The total is shared across pages instead of counted on every request
+    total = total_counts.get(TRANSCRIBED_VIDEOS)
+    if total is None:
+        total = await db.scalar(
+            select(func.count()).select_from(YouTubeContent).filter(YouTubeContent.transcript.isnot(None))
+        )
+        total_counts.set(TRANSCRIBED_VIDEOS, total)
     
-    # Get paginated videos with transcripts
-    videos = db.query(YouTubeContent)\
-        .filter(YouTubeContent.transcript.isnot(None))\
-        .order_by(YouTubeContent.created_at.desc())\
-        .offset(offset)\
-        .limit(page_size)\
-        .all()
+    transcribed = select(YouTubeContent).filter(YouTubeContent.transcript.isnot(None))
+    if include_body:
+        transcribed = transcribed.options(undefer(YouTubeContent.transcript))
+    rows = (await db.execute(keyset(transcribed, YouTubeContent, cursor, page_size))).scalars().all()
+    page = page_of(rows, page_size)
     
     # Calculate total pages
     total_pages = (total + page_size - 1) // page_size
@@ -284,12 +368,12 @@ async def list_youtube_videos(
                 title=video.title,
                 thumbnail_url=video.thumbnail_url,
                 video_url=video.video_url,
-                transcript=video.transcript,
+                transcript=video.transcript if include_body else None,
                 created_at=video.created_at.isoformat()
-            ) for video in videos
+            ) for video in page.items
         ],
         total=total,
-        page=page,
         page_size=page_size,
-        total_pages=total_pages
+        total_pages=total_pages,
+        next_cursor=page.next_cursor
     ) 
\ No newline at end of file
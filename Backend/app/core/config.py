@@ -23,6 +23,12 @@ class Settings(BaseModel):
     SQLITE_URL: str = os.getenv("SQLITE_URL", "sqlite:///eduassist.db")
     SQLALCHEMY_DATABASE_URI: str = SQLITE_URL
     DATABASE_URL: str = SQLITE_URL
+    SQLITE_PROFILE: str = os.getenv("SQLITE_PROFILE", "production")  # "production" applies the pragmas below on connect, "default" keeps SQLite's defaults
+    SQLITE_SYNCHRONOUS: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")  # NORMAL in WAL mode can lose the last commits on power loss, never corrupts
+    SQLITE_CACHE_SIZE_MB: int = int(os.getenv("SQLITE_CACHE_SIZE_MB", "64"))  # Page cache per connection
+    SQLITE_MMAP_SIZE_MB: int = int(os.getenv("SQLITE_MMAP_SIZE_MB", "256"))
+    SQLITE_BUSY_TIMEOUT: int = int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000"))  # Milliseconds to wait for a lock before "database is locked"
+    SQLITE_SINGLE_WRITER: bool = os.getenv("SQLITE_SINGLE_WRITER", "false").lower() == "true"  # Serialise hot writes through one writer thread
     
     # OpenAI Configuration
     OPENAI_API_KEY: Optional[str] = os.getenv("OPENAI_API_KEY", None)
@@ -31,9 +37,39 @@ class Settings(BaseModel):
     GOOGLE_API_KEY: Optional[str] = os.getenv("GOOGLE_API_KEY", None)
     GEMINI_API_KEY: Optional[str] = os.getenv("GEMINI_API_KEY", None)
     
+    # AI provider limits
+    AI_MAX_CONCURRENCY: int = int(os.getenv("AI_MAX_CONCURRENCY", "8"))  # In-flight requests per provider
+    AI_REQUEST_TIMEOUT: float = float(os.getenv("AI_REQUEST_TIMEOUT", "30"))  # Seconds
+    AI_CACHE_ENABLED: bool = os.getenv("AI_CACHE_ENABLED", "true").lower() == "true"
+    AI_CACHE_PATH: Optional[str] = os.getenv("AI_CACHE_PATH", None)  # Defaults to next to the SQLite database
+    AI_CIRCUIT_FAILURES: int = int(os.getenv("AI_CIRCUIT_FAILURES", "5"))  # Consecutive failures before a provider is skipped
+    AI_CIRCUIT_COOLDOWN: float = float(os.getenv("AI_CIRCUIT_COOLDOWN", "30"))  # Seconds before a skipped provider is probed again
+    AI_HEDGE_CHAT: bool = os.getenv("AI_HEDGE_CHAT", "true").lower() == "true"  # Race a second provider when chat is slow
+    AI_HEDGE_DELAY: float = float(os.getenv("AI_HEDGE_DELAY", "2.0"))  # Hedge delay until a provider has p95 samples
+    OUTLINE_CHAPTER_CONCURRENCY: int = int(os.getenv("OUTLINE_CHAPTER_CONCURRENCY", "4"))  # Chapters generated at once
+    OUTLINE_CHAPTER_RETRIES: int = int(os.getenv("OUTLINE_CHAPTER_RETRIES", "2"))  # Extra attempts for failed chapters
+    
+    # Course context retrieval
+    RETRIEVAL_TOP_K: int = int(os.getenv("RETRIEVAL_TOP_K", "6"))  # Chunks per prompt
+    RETRIEVAL_CHUNK_WORDS: int = int(os.getenv("RETRIEVAL_CHUNK_WORDS", "150"))
+    COURSE_CONTEXT_TTL: int = int(os.getenv("COURSE_CONTEXT_TTL", "300"))  # Seconds a course snapshot may be reused
+
+    # Pagination
+    PAGINATION_COUNT_TTL: int = int(os.getenv("PAGINATION_COUNT_TTL", "60"))  # Seconds a list total is reused across pages
+
+    # Background jobs
+    JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", "2"))  # Jobs run at once per process, 0 disables the workers
+    JOB_MAX_ATTEMPTS: int = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+    JOB_RETRY_BACKOFF: float = float(os.getenv("JOB_RETRY_BACKOFF", "5"))  # Seconds before the first retry, doubled per attempt
+    JOB_RETRY_BACKOFF_MAX: float = float(os.getenv("JOB_RETRY_BACKOFF_MAX", "300"))
+    JOB_POLL_INTERVAL: float = float(os.getenv("JOB_POLL_INTERVAL", "1.0"))  # Seconds between checks for due jobs
+    
     # Storage Configuration
     STORAGE_BUCKET: str = os.getenv("STORAGE_BUCKET", "eduassist-files")
     MAX_FILE_SIZE: int = int(os.getenv("MAX_FILE_SIZE", "10485760"))  # 10MB in bytes
+    BLOB_STORE_DIR: str = os.getenv("BLOB_STORE_DIR", "blobs")  # Uploaded files, stored by SHA-256
+    EXTRACTION_WORKERS: int = int(os.getenv("EXTRACTION_WORKERS", "0"))  # Processes extracting text from uploads, 0 uses every CPU core
+    EXTRACTION_MAX_CHARS: int = int(os.getenv("EXTRACTION_MAX_CHARS", "2000000"))  # Extracted text kept per file
     
     # CORS Configuration
     BACKEND_CORS_ORIGINS: List[str] = []
@@ -0,0 +1,96 @@
+import os
+import re
+from typing import Optional, Tuple
+import anyio
+from fastapi import HTTPException, Request
+from starlette.responses import FileResponse, Response
+from starlette.types import Receive, Scope, Send
+
+RANGE_PATTERN = re.compile(r"bytes=(\d*)-(\d*)")
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """The inclusive (first, last) byte of a single ``Range: bytes=`` header.
+
+    None means "send the whole file": no header, a malformed one or several
+    ranges, which a server may ignore. A range that starts past the end is
+    answered with 416.
+    """
+    match = RANGE_PATTERN.fullmatch((header or "").strip())
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if first == "":
+        # bytes=-N: the last N bytes
+        if int(last) == 0 or size == 0:
+            raise _not_satisfiable(size)
+        return max(size - int(last), 0), size - 1
+    first = int(first)
+    last = min(int(last), size - 1) if last else size - 1
+    if first >= size:
+        raise _not_satisfiable(size)
+    if first > last:
+        return None
+    return first, last
+
+def _not_satisfiable(size: int) -> HTTPException:
+    return HTTPException(status_code=416, detail="Range not satisfiable", headers={"Content-Range": f"bytes */{size}"})
+
+def _etag_listed(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in tags or etag in tags
+
+class PartialFileResponse(FileResponse):
+    """206 response with bytes ``first``..``last`` (inclusive) of a file."""
+
+    def __init__(self, path: str, first: int, last: int, size: int, **kwargs):
+        super().__init__(path, status_code=206, **kwargs)
+        self.first = first
+        self.length = last - first + 1
+        self.headers["content-range"] = f"bytes {first}-{last}/{size}"
+        self.headers["content-length"] = str(self.length)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope["method"].upper() == "HEAD":
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        remaining = self.length
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            await file.seek(self.first)
+            while remaining:
+                chunk = await file.read(min(self.chunk_size, remaining))
+                # A file that shrank underneath us ends the body early
+                remaining = remaining - len(chunk) if chunk else 0
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+
+def immutable_file_response(
+    request: Request,
+    path: str,
+    etag: str,
+    media_type: Optional[str] = None,
+    filename: Optional[str] = None
+) -> Response:
+    """Serve a file whose bytes never change for ``etag`` (e.g. a content hash).
+
+    Answers ``If-None-Match`` with 304 and a single ``Range`` with 206 (unless
+    ``If-Range`` names another version). Whole files go out as a plain
+    ``FileResponse``, which hands the path to servers that implement the
+    ASGI pathsend extension so they can ``sendfile`` it without copying.
+    """
+    etag = f'"{etag}"'
+    headers = {"etag": etag, "accept-ranges": "bytes", "cache-control": "private, max-age=31536000, immutable"}
+    if _etag_listed(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    stat_result = os.stat(path)
+    byte_range = None
+    if request.headers.get("if-range") in (None, etag):
+        byte_range = parse_range(request.headers.get("range"), stat_result.st_size)
+    if byte_range is not None:
+        first, last = byte_range
+        return PartialFileResponse(
+            path, first, last, stat_result.st_size, headers=headers, media_type=media_type, filename=filename
+        )
+    return FileResponse(path, headers=headers, media_type=media_type, filename=filename, stat_result=stat_result)
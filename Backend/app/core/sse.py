@@ -0,0 +1,49 @@
+import json
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+from fastapi.responses import StreamingResponse
+
+logger = logging.getLogger(__name__)
+
+def format_sse(data: Any, event: Optional[str] = None) -> str:
+    """Encode one Server-Sent Event with a JSON payload."""
+    lines = []
+    if event:
+        lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+def sse_response(
+    chunks: AsyncIterator[str],
+    on_complete: Optional[Callable[[str], Awaitable[Optional[Dict[str, Any]]]]] = None,
+) -> StreamingResponse:
+    """Stream text chunks to the client as `token` events.
+
+    Once the upstream stream is exhausted `on_complete` receives the full text
+    (e.g. to persist it) and a final `done` event carries the whole response
+    plus whatever `on_complete` returned. Failures are reported as an `error`
+    event. When the client disconnects Starlette cancels the response task,
+    which closes `chunks` and with it the upstream provider request.
+    """
+    async def events():
+        parts = []
+        try:
+            async for chunk in chunks:
+                parts.append(chunk)
+                yield format_sse({"delta": chunk}, "token")
+            text = "".join(parts)
+            done = {"response": text}
+            if on_complete is not None:
+                done.update(await on_complete(text) or {})
+            yield format_sse(done, "done")
+        except Exception as e:
+            logger.error(f"Streaming response error: {str(e)}")
+            yield format_sse({"detail": getattr(e, "detail", str(e))}, "error")
+        finally:
+            await chunks.aclose()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,8 +1,9 @@
 from app.crud.crud_user import crud_user
-from app.crud.crud_course import crud_course
-from app.crud.crud_learning_path import crud_learning_path, crud_learning_path_step, crud_progress
-from app.crud.crud_content import crud_content
+from app.crud.crud_course import crud_course, crud_course_async
+from app.crud.crud_learning_path import crud_learning_path, crud_learning_path_step, crud_progress, crud_learning_path_async
+from app.crud.crud_content import crud_content, crud_content_async
+from app.crud.crud_content_batch import crud_content_batch_async
 from app.crud.crud_assessment import crud_assessment, crud_flashcard, crud_exam
 from app.crud.crud_progress import crud_progress, crud_assessment_progress, crud_course_progress
 
-__all__ = ["crud_user", "crud_course", "crud_learning_path", "crud_learning_path_step", "crud_content", "crud_assessment", "crud_flashcard", "crud_exam", "crud_progress", "crud_assessment_progress", "crud_course_progress"] 
\ No newline at end of file
+__all__ = ["crud_user", "crud_course", "crud_course_async", "crud_learning_path", "crud_learning_path_step", "crud_learning_path_async", "crud_content", "crud_content_async", "crud_content_batch_async", "crud_assessment", "crud_flashcard", "crud_exam", "crud_progress", "crud_assessment_progress", "crud_course_progress"] 
\ No newline at end of file
@@ -1,12 +1,44 @@
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+from typing import Any, Dict, Generic, List, Mapping, Optional, Sequence, Type, TypeVar, Union
+from sqlalchemy import inspect, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
+from app.crud.pagination import Cursor, Page, keyset, page_of
 from app.db.base_class import Base
 
 ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
+# Keys per SELECT ... IN when reading written rows back; well under SQLite's bound parameter limit
+RELOAD_CHUNK = 500
+DIALECT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+def new_object(model: Type[ModelType], obj_in: Union[BaseModel, Dict[str, Any]], **fields: Any) -> ModelType:
+    """Build a model instance with its primary key already generated.
+
+    The ORM only batches INSERTs into one executemany when it knows every
+    primary key up front; a Python-side default (``default=uuid4``) is
+    otherwise run by Core per row, one INSERT each.
+    """
+    data = _values(model, obj_in)
+    data.update(fields)
+    return model(**data)
+
+def _values(model: Type[ModelType], obj_in: Union[BaseModel, Dict[str, Any]]) -> Dict[str, Any]:
+    data = dict(obj_in) if isinstance(obj_in, dict) else obj_in.dict()
+    # Remove prompt field if it exists
+    data.pop('prompt', None)
+    for column in inspect(model).primary_key:
+        if data.get(column.key) is None and column.default is not None and column.default.is_callable:
+            data[column.key] = column.default.arg(None)
+    return data
+
+def _key_chunks(keys: List[Any]):
+    for start in range(0, len(keys), RELOAD_CHUNK):
+        yield keys[start:start + RELOAD_CHUNK]
+
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     def __init__(self, model: Type[ModelType]):
         """
@@ -25,6 +57,13 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     ) -> List[ModelType]:
         return db.query(self.model).offset(skip).limit(limit).all()
 
+    def get_page(
+        self, db: Session, *, cursor: Optional[Cursor] = None, limit: int = 100
+    ) -> Page[ModelType]:
+        """Newest first, ``limit`` rows after ``cursor`` (see ``app.crud.pagination``)."""
+        rows = keyset(db.query(self.model), self.model, cursor, limit).all()
+        return page_of(rows, limit)
+
     def create(self, db: Session, *, obj_in: CreateSchemaType) -> ModelType:
         obj_in_data = obj_in.dict()
         # Remove prompt field if it exists
@@ -35,6 +74,39 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db.refresh(db_obj)
         return db_obj
 
+    def create_many(
+        self,
+        db: Session,
+        *,
+        objs_in: Sequence[Union[CreateSchemaType, Dict[str, Any]]],
+        commit: bool = True,
+        **fields: Any
+    ) -> List[ModelType]:
+        """Insert all rows with one executemany and return them in input order.
+
+        ``fields`` are set on every row (e.g. a shared parent id). With
+        ``commit=False`` the rows are only flushed, so the caller can commit
+        them together with other writes.
+        """
+        db_objs = [new_object(self.model, obj_in, **fields) for obj_in in objs_in]
+        db.add_all(db_objs)
+        if not commit:
+            db.flush()
+            return db_objs
+        db.commit()
+        # One SELECT instead of a refresh per row (SQLite has no RETURNING in SQLAlchemy 1.4)
+        return self.get_many(db, [db_obj.id for db_obj in db_objs])
+
+    def get_many(self, db: Session, ids: Sequence[Any]) -> List[ModelType]:
+        """Rows with these ids, in the order given; missing ids are skipped."""
+        ids = list(ids)
+        by_id = {}
+        for chunk in _key_chunks(ids):
+            rows = db.query(self.model).filter(self.model.id.in_(chunk))\
+                .execution_options(populate_existing=True).all()
+            by_id.update((row.id, row) for row in rows)
+        return [by_id[id] for id in ids if id in by_id]
+
     def update(
         self,
         db: Session,
@@ -53,8 +125,159 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db.refresh(db_obj)
         return db_obj
 
+    def update_many(
+        self,
+        db: Session,
+        *,
+        updates: Mapping[Any, Union[UpdateSchemaType, Dict[str, Any]]],
+        commit: bool = True
+    ) -> List[ModelType]:
+        """Apply ``{id: changes}`` in one transaction; unknown ids are skipped.
+
+        Rows are loaded with one SELECT and written through the ORM, so mapper
+        events (search indexes, course context versions) still see every change.
+        """
+        db_objs = self.get_many(db, list(updates))
+        for db_obj in db_objs:
+            obj_in = updates[db_obj.id]
+            update_data = obj_in if isinstance(obj_in, dict) else obj_in.dict(exclude_unset=True)
+            for field in update_data:
+                setattr(db_obj, field, update_data[field])
+        if not commit:
+            db.flush()
+            return db_objs
+        db.commit()
+        return self.get_many(db, [db_obj.id for db_obj in db_objs])
+
+    def upsert_many(
+        self,
+        db: Session,
+        *,
+        rows: Sequence[Union[CreateSchemaType, Dict[str, Any]]],
+        index_elements: Optional[Sequence[str]] = None,
+        update_fields: Optional[Sequence[str]] = None
+    ) -> List[ModelType]:
+        """``INSERT ... ON CONFLICT DO UPDATE`` for all rows in one statement.
+
+        ``index_elements`` name the primary key or a unique index (default: the
+        primary key); on a conflict ``update_fields`` (default: every other
+        non-key column given) are overwritten. This is a Core statement, so mapper
+        events do not fire: use it for tables without ORM-maintained indexes.
+        """
+        table = self.model.__table__
+        index_elements = list(index_elements or [column.key for column in table.primary_key])
+        # New rows get their primary key here so they can be read back by it
+        values = [_values(self.model, row) for row in rows]
+        if not values:
+            return []
+        if update_fields is None:
+            update_fields = [
+                key for key in values[0]
+                if key not in index_elements and key in table.c and not table.c[key].primary_key
+            ]
+
+        statement = DIALECT_INSERTS[db.get_bind().dialect.name](table)
+        set_ = {field: statement.excluded[field] for field in update_fields}
+        # ON CONFLICT DO UPDATE does not run onupdate defaults by itself
+        for column in table.c:
+            if column.onupdate is not None and column.key not in set_:
+                onupdate = column.onupdate
+                set_[column.key] = onupdate.arg(None) if onupdate.is_callable else onupdate.arg
+        db.execute(statement.on_conflict_do_update(index_elements=index_elements, set_=set_), values)
+        db.commit()
+
+        # Read the rows back by their conflict key; existing rows keep their own ids
+        columns = [table.c[key] for key in index_elements]
+        keys = [tuple(value[key] for key in index_elements) for value in values]
+        by_key = {}
+        for chunk in _key_chunks(keys):
+            found = db.query(self.model).filter(tuple_(*columns).in_(chunk))\
+                .execution_options(populate_existing=True).all()
+            by_key.update((tuple(getattr(row, key) for key in index_elements), row) for row in found)
+        return [by_key[key] for key in dict.fromkeys(keys) if key in by_key]
+
     def remove(self, db: Session, *, id: Any) -> ModelType:
         obj = db.query(self.model).get(id)
         db.delete(obj)
         db.commit()
-        return obj 
\ No newline at end of file
+        return obj 
+
+class AsyncCRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+    """
+    Async counterpart of CRUDBase for endpoints running on the event loop.
+    **Parameters**
+    * `model`: A SQLAlchemy model class
+    """
+    def __init__(self, model: Type[ModelType]):
+        self.model = model
+
+    async def get(self, db: AsyncSession, id: Any) -> Optional[ModelType]:
+        return await db.get(self.model, id)
+
+    async def get_multi(
+        self, db: AsyncSession, *, skip: int = 0, limit: int = 100
+    ) -> List[ModelType]:
+        result = await db.execute(select(self.model).offset(skip).limit(limit))
+        return result.scalars().all()
+
+    async def create(self, db: AsyncSession, *, obj_in: CreateSchemaType) -> ModelType:
+        obj_in_data = obj_in.dict()
+        # Remove prompt field if it exists
+        obj_in_data.pop('prompt', None)
+        db_obj = self.model(**obj_in_data)
+        db.add(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def create_many(
+        self,
+        db: AsyncSession,
+        *,
+        objs_in: Sequence[Union[CreateSchemaType, Dict[str, Any]]],
+        commit: bool = True,
+        **fields: Any
+    ) -> List[ModelType]:
+        """Async ``CRUDBase.create_many``: one executemany, one SELECT back."""
+        db_objs = [new_object(self.model, obj_in, **fields) for obj_in in objs_in]
+        db.add_all(db_objs)
+        if not commit:
+            await db.flush()
+            return db_objs
+        await db.commit()
+        return await self.get_many(db, [db_obj.id for db_obj in db_objs])
+
+    async def get_many(self, db: AsyncSession, ids: Sequence[Any]) -> List[ModelType]:
+        """Rows with these ids, in the order given; missing ids are skipped."""
+        ids = list(ids)
+        by_id = {}
+        for chunk in _key_chunks(ids):
+            result = await db.execute(
+                select(self.model).filter(self.model.id.in_(chunk)).execution_options(populate_existing=True)
+            )
+            by_id.update((row.id, row) for row in result.scalars())
+        return [by_id[id] for id in ids if id in by_id]
+
+    async def update(
+        self,
+        db: AsyncSession,
+        *,
+        db_obj: ModelType,
+        obj_in: Union[UpdateSchemaType, Dict[str, Any]]
+    ) -> ModelType:
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.dict(exclude_unset=True)
+        for field in update_data:
+            setattr(db_obj, field, update_data[field])
+        db.add(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def remove(self, db: AsyncSession, *, id: Any) -> ModelType:
+        obj = await db.get(self.model, id)
+        await db.delete(obj)
+        await db.commit()
+        return obj
@@ -1,5 +1,6 @@
 from typing import List, Optional
 from sqlalchemy.orm import Session
+from app.crud.pagination import Cursor, Page, keyset, page_of
 from app.models.chat import ChatGroup, GroupMember, Message, MessageRead
 from app.schemas.chat import ChatGroupCreate, MessageCreate, MessageReadCreate
 
@@ -60,12 +61,11 @@ def create_message(db: Session, message: MessageCreate, sender_id: str) -> Messa
 def get_group_messages(
     db: Session,
     group_id: int,
-    skip: int = 0,
+    cursor: Optional[Cursor] = None,
     limit: int = 50
-) -> List[Message]:
-    return db.query(Message).filter(
-        Message.group_id == group_id
-    ).order_by(Message.created_at.desc()).offset(skip).limit(limit).all()
+) -> Page[Message]:
+    query = db.query(Message).filter(Message.group_id == group_id)
+    return page_of(keyset(query, Message, cursor, limit).all(), limit)
 
 def create_message_read(db: Session, message_read: MessageReadCreate) -> MessageRead:
     db_message_read = MessageRead(**message_read.dict())
@@ -76,15 +76,3 @@ def create_message_read(db: Session, message_read: MessageReadCreate) -> Message
 
 def get_message_reads(db: Session, message_id: int) -> List[MessageRead]:
     return db.query(MessageRead).filter(MessageRead.message_id == message_id).all()
-
-def search_messages(
-    db: Session,
-    group_id: int,
-    query: str,
-    skip: int = 0,
-    limit: int = 50
-) -> List[Message]:
-    return db.query(Message).filter(
-        Message.group_id == group_id,
-        Message.content.ilike(f"%{query}%")
-    ).order_by(Message.created_at.desc()).offset(skip).limit(limit).all() 
\ No newline at end of file
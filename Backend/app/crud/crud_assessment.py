@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from uuid import UUID
 
 from app.crud.base import CRUDBase
+from app.crud.pagination import Cursor, Page
 from app.models.assessment import Quiz, Flashcard, Exam, QuizAttempt, ExamAttempt
 from app.schemas.assessment import (
     QuizCreate,
@@ -25,9 +26,9 @@ class CRUDAssessment(CRUDBase[Quiz, QuizCreate, QuizUpdate]):
         return db_obj
 
     def get_quizzes(
-        self, db: Session, *, skip: int = 0, limit: int = 100
-    ) -> List[Quiz]:
-        return db.query(Quiz).offset(skip).limit(limit).all()
+        self, db: Session, *, cursor: Optional[Cursor] = None, limit: int = 100
+    ) -> Page[Quiz]:
+        return self.get_page(db, cursor=cursor, limit=limit)
 
     def attempt_quiz(
         self, db: Session, *, quiz_id: str, user_id: str, answers: Dict[str, str]
@@ -55,6 +56,16 @@ class CRUDAssessment(CRUDBase[Quiz, QuizCreate, QuizUpdate]):
         db.refresh(attempt)
         return attempt
 
+    def get_quiz_attempts(
+        self, db: Session, *, quiz_id: str, user_id: str
+    ) -> List[QuizAttempt]:
+        return (
+            db.query(QuizAttempt)
+            .filter(QuizAttempt.user_id == user_id, QuizAttempt.quiz_id == quiz_id)
+            .order_by(QuizAttempt.completed_at.desc())
+            .all()
+        )
+
 class CRUDFlashcard(CRUDBase[Flashcard, FlashcardCreate, FlashcardUpdate]):
     def create_flashcard(
         self, db: Session, *, obj_in: FlashcardCreate, creator_id: str
@@ -67,9 +78,9 @@ class CRUDFlashcard(CRUDBase[Flashcard, FlashcardCreate, FlashcardUpdate]):
         return db_obj
 
     def get_flashcards(
-        self, db: Session, *, skip: int = 0, limit: int = 100
-    ) -> List[Flashcard]:
-        return db.query(Flashcard).offset(skip).limit(limit).all()
+        self, db: Session, *, cursor: Optional[Cursor] = None, limit: int = 100
+    ) -> Page[Flashcard]:
+        return self.get_page(db, cursor=cursor, limit=limit)
 
 class CRUDExam(CRUDBase[Exam, ExamCreate, ExamUpdate]):
     def create_exam(
@@ -83,9 +94,9 @@ class CRUDExam(CRUDBase[Exam, ExamCreate, ExamUpdate]):
         return db_obj
 
     def get_exams(
-        self, db: Session, *, skip: int = 0, limit: int = 100
-    ) -> List[Exam]:
-        return db.query(Exam).offset(skip).limit(limit).all()
+        self, db: Session, *, cursor: Optional[Cursor] = None, limit: int = 100
+    ) -> Page[Exam]:
+        return self.get_page(db, cursor=cursor, limit=limit)
 
     def attempt_exam(
         self, db: Session, *, exam_id: str, user_id: str, answers: Dict[str, str]
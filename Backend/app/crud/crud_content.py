@@ -1,11 +1,17 @@
 from typing import Any, Dict, Optional, List, Union
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, undefer
 from app.models.enums import ContentType
 from app.schemas.content import ContentCreate, ContentUpdate
 from app.models.content import Content as ContentModel
 from uuid import uuid4
 import datetime
-from app.crud.base import CRUDBase
+from app.crud.base import AsyncCRUDBase, CRUDBase
+
+# Every column but the (deferred) body, for listings that only show metadata
+SUMMARY_COLUMNS = [column for column in ContentModel.__table__.columns if column.key != "content"]
 
 class ContentCRUD(CRUDBase[ContentModel, ContentCreate, ContentUpdate]):
     def create_text(self, db: Session, *, obj_in: ContentCreate, user_id: str) -> ContentModel:
@@ -57,7 +63,7 @@ class ContentCRUD(CRUDBase[ContentModel, ContentCreate, ContentUpdate]):
         return db_obj
 
     def get(self, db: Session, id: str) -> Optional[ContentModel]:
-        return db.query(ContentModel).filter(ContentModel.id == id).first()
+        return db.query(ContentModel).options(undefer(ContentModel.content)).filter(ContentModel.id == id).first()
 
     def get_multi(
         self, db: Session, *, skip: int = 0, limit: int = 100
@@ -103,24 +109,104 @@ class ContentCRUD(CRUDBase[ContentModel, ContentCreate, ContentUpdate]):
             "thumbnail": "https://example.com/thumbnail.jpg"
         }
 
-    def create_quiz(self, db: Session, parameters: Dict[str, Any], user_id: Any) -> ContentModel:
+    def get_by_course(self, db: Session, course_id: str, *, include_body: bool = False) -> List[ContentModel]:
+        """Get all content associated with a course.
+
+        Bodies stay deferred (loaded on first access, one query per row)
+        unless ``include_body`` is set.
+        """
+        query = db.query(ContentModel).filter(ContentModel.course_id == course_id)
+        if include_body:
+            query = query.options(undefer(ContentModel.content))
+        return query.all()
+
+    def get_summaries_by_course(self, db: Session, course_id: str) -> List[Row]:
+        """Metadata of a course's content as plain rows, without the bodies."""
+        return db.query(*SUMMARY_COLUMNS).filter(ContentModel.course_id == course_id).all()
+
+class AsyncContentCRUD(AsyncCRUDBase[ContentModel, ContentCreate, ContentUpdate]):
+    """Async content CRUD. With ``commit=False`` the change is only added to
+    the session, so a caller can group several writes into one commit."""
+
+    async def create_typed(
+        self,
+        db: AsyncSession,
+        *,
+        obj_in: ContentCreate,
+        user_id: str,
+        content_type: Optional[str] = None,
+        commit: bool = True
+    ) -> ContentModel:
+        """Create a content row; ``content_type`` overrides the one in ``obj_in``."""
+        # Every column is set here, so there is nothing to refresh after the commit
         db_obj = ContentModel(
             id=str(uuid4()),
-            title="Generated Quiz",
-            content_type=ContentType.QUIZ,
-            content="Quiz content here",
-            meta=parameters,
+            title=obj_in.title,
+            content_type=content_type or obj_in.content_type,
+            content=obj_in.content,
+            meta=obj_in.meta or {},
+            description=obj_in.description,
+            course_id=obj_in.course_id,
+            blob_sha256=obj_in.blob_sha256,
             created_by=user_id,
             created_at=datetime.datetime.utcnow(),
             updated_at=datetime.datetime.utcnow(),
         )
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        if commit:
+            await db.commit()
         return db_obj
 
-    def get_by_course(self, db: Session, course_id: str) -> List[ContentModel]:
-        """Get all content associated with a course."""
-        return db.query(ContentModel).filter(ContentModel.course_id == course_id).all()
+    async def update(
+        self,
+        db: AsyncSession,
+        *,
+        db_obj: ContentModel,
+        obj_in: Union[ContentUpdate, Dict[str, Any]],
+        commit: bool = True
+    ) -> ContentModel:
+        data = obj_in.dict(exclude_unset=True) if not isinstance(obj_in, dict) else obj_in
+        for field in data:
+            if hasattr(db_obj, field):
+                setattr(db_obj, field, data[field])
+        db_obj.updated_at = datetime.datetime.utcnow()
+        db.add(db_obj)
+        if commit:
+            await db.commit()
+        return db_obj
+
+    async def remove(self, db: AsyncSession, *, db_obj: ContentModel, commit: bool = True) -> ContentModel:
+        await db.delete(db_obj)
+        if commit:
+            await db.commit()
+        return db_obj
+
+    async def get(self, db: AsyncSession, id: Any) -> Optional[ContentModel]:
+        # A deferred body cannot be lazy loaded outside the session's greenlet
+        result = await db.execute(
+            select(ContentModel).options(undefer(ContentModel.content)).filter(ContentModel.id == id)
+        )
+        return result.scalars().first()
+
+    async def get_by_course(
+        self, db: AsyncSession, course_id: str, *, include_body: bool = False
+    ) -> List[ContentModel]:
+        """Get all content associated with a course; bodies only with ``include_body``."""
+        query = select(ContentModel).filter(ContentModel.course_id == course_id)
+        if include_body:
+            query = query.options(undefer(ContentModel.content))
+        result = await db.execute(query)
+        return result.scalars().all()
+
+    async def get_by_batch(
+        self, db: AsyncSession, batch_id: str, *, include_body: bool = True
+    ) -> List[ContentModel]:
+        """Get the files of an upload batch, through the ``batch_id`` index."""
+        query = select(ContentModel).filter(ContentModel.batch_id == batch_id).order_by(ContentModel.created_at)
+        if include_body:
+            query = query.options(undefer(ContentModel.content))
+        result = await db.execute(query)
+        return result.scalars().all()
 
-crud_content = ContentCRUD(ContentModel) 
\ No newline at end of file
+crud_content = ContentCRUD(ContentModel)
+crud_content_async = AsyncContentCRUD(ContentModel) 
\ No newline at end of file
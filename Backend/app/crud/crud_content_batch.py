@@ -0,0 +1,31 @@
+from datetime import datetime
+from typing import Optional
+from uuid import uuid4
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.crud.base import AsyncCRUDBase
+from app.models.content_batch import ContentBatch
+from app.schemas.content import ContentBatchCreate, ContentBatchUpdate
+
+class AsyncCRUDContentBatch(AsyncCRUDBase[ContentBatch, ContentBatchCreate, ContentBatchUpdate]):
+    def add(self, db: AsyncSession, *, obj_in: ContentBatchCreate, user_id: str) -> ContentBatch:
+        """Stage a new batch in the session; it is inserted with the caller's files."""
+        now = datetime.utcnow()
+        db_obj = ContentBatch(
+            id=str(uuid4()),
+            name=obj_in.name,
+            description=obj_in.description,
+            created_by=user_id,
+            created_at=now,
+            updated_at=now,
+        )
+        db.add(db_obj)
+        return db_obj
+
+    async def get_owned(self, db: AsyncSession, batch_id: str, user_id: Optional[str]) -> Optional[ContentBatch]:
+        """The batch, if it exists and (with ``user_id``) belongs to that user."""
+        batch = await db.get(ContentBatch, batch_id)
+        if batch is None or (user_id is not None and batch.created_by != user_id):
+            return None
+        return batch
+
+crud_content_batch_async = AsyncCRUDContentBatch(ContentBatch)
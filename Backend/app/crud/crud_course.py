@@ -1,7 +1,8 @@
 from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.crud.base import CRUDBase
+from app.crud.base import AsyncCRUDBase, CRUDBase
 from app.models.course import Course
 from app.schemas.course import CourseCreate, CourseUpdate
 
@@ -29,15 +30,24 @@ class CRUDCourse(CRUDBase[Course, CourseCreate, CourseUpdate]):
             .all()
         )
 
-    def get_multi(
-        self, db: Session, *, skip: int = 0, limit: int = 100
-    ) -> List[Course]:
-        return db.query(self.model).offset(skip).limit(limit).all()
-
     def get_by_title(
         self, db: Session, *, title: str
     ) -> Optional[Course]:
         return db.query(self.model).filter(Course.title == title).first()
 
+class AsyncCRUDCourse(AsyncCRUDBase[Course, CourseCreate, CourseUpdate]):
+    async def create(
+        self, db: AsyncSession, *, obj_in: CourseCreate, creator_id: str
+    ) -> Course:
+        obj_in_data = obj_in.dict()
+        # Remove prompt field if it exists
+        obj_in_data.pop('prompt', None)
+        db_obj = Course(**obj_in_data, creator_id=creator_id)
+        db.add(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
 # Create instance
 crud_course = CRUDCourse(Course)
+crud_course_async = AsyncCRUDCourse(Course)
@@ -0,0 +1,119 @@
+from typing import Any, Dict, List, Optional
+from datetime import datetime, timedelta
+from sqlalchemy.orm import Session
+from app.crud.base import CRUDBase
+from app.models.enums import JobStatus
+from app.models.job import Job
+from pydantic import BaseModel
+
+class CRUDJob(CRUDBase[Job, BaseModel, BaseModel]):
+    def create_job(
+        self, db: Session, *, job_type: str, payload: Dict[str, Any], user_id: Optional[str], max_attempts: int,
+        commit: bool = True
+    ) -> Job:
+        db_obj = Job(
+            job_type=job_type,
+            status=JobStatus.QUEUED.value,
+            payload=payload,
+            max_attempts=max_attempts,
+            run_after=datetime.utcnow(),
+            created_by=user_id,
+        )
+        db.add(db_obj)
+        if not commit:
+            # Queued together with the caller's other writes
+            db.flush()
+            return db_obj
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+
+    def get_by_user(self, db: Session, *, user_id: str, skip: int = 0, limit: int = 100) -> List[Job]:
+        return (
+            db.query(Job)
+            .filter(Job.created_by == user_id)
+            .order_by(Job.created_at.desc())
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+
+    def claim_next(self, db: Session) -> Optional[Job]:
+        """Mark the oldest due queued job as running and return it.
+
+        The conditional UPDATE makes the claim atomic, so a job is never run
+        by two workers (or two processes) at once.
+        """
+        now = datetime.utcnow()
+        while True:
+            job_id = (
+                db.query(Job.id)
+                .filter(Job.status == JobStatus.QUEUED.value, Job.run_after <= now)
+                .order_by(Job.run_after, Job.created_at)
+                .limit(1)
+                .scalar()
+            )
+            if job_id is None:
+                return None
+            claimed = (
+                db.query(Job)
+                .filter(Job.id == job_id, Job.status == JobStatus.QUEUED.value)
+                .update(
+                    {
+                        Job.status: JobStatus.RUNNING.value,
+                        Job.attempts: Job.attempts + 1,
+                        Job.started_at: now,
+                        Job.error: None,
+                    },
+                    synchronize_session=False
+                )
+            )
+            db.commit()
+            if claimed:
+                return self.get(db, job_id)
+
+    def set_progress(self, db: Session, *, job_id: str, progress: float, message: Optional[str] = None) -> None:
+        db.query(Job).filter(Job.id == job_id).update(
+            {Job.progress: progress, Job.progress_message: message}, synchronize_session=False
+        )
+        db.commit()
+
+    def mark_succeeded(self, db: Session, *, job_id: str, result: Any) -> None:
+        db.query(Job).filter(Job.id == job_id).update(
+            {
+                Job.status: JobStatus.SUCCEEDED.value,
+                Job.result: result,
+                Job.progress: 1.0,
+                Job.finished_at: datetime.utcnow(),
+            },
+            synchronize_session=False
+        )
+        db.commit()
+
+    def mark_failed(self, db: Session, *, job_id: str, error: str, retry_in: Optional[float] = None) -> None:
+        """Record a failed attempt; with ``retry_in`` the job is queued again after that many seconds."""
+        if retry_in is None:
+            values = {Job.status: JobStatus.FAILED.value, Job.finished_at: datetime.utcnow()}
+        else:
+            values = {Job.status: JobStatus.QUEUED.value, Job.run_after: datetime.utcnow() + timedelta(seconds=retry_in)}
+        db.query(Job).filter(Job.id == job_id).update({**values, Job.error: error}, synchronize_session=False)
+        db.commit()
+
+    def requeue(self, db: Session, *, job_id: str) -> None:
+        """Put an interrupted job back in the queue without counting the attempt."""
+        db.query(Job).filter(Job.id == job_id, Job.status == JobStatus.RUNNING.value).update(
+            {Job.status: JobStatus.QUEUED.value, Job.attempts: Job.attempts - 1, Job.run_after: datetime.utcnow()},
+            synchronize_session=False
+        )
+        db.commit()
+
+    def requeue_running(self, db: Session) -> int:
+        """Re-queue jobs whose worker went away (e.g. the process restarted)."""
+        count = db.query(Job).filter(Job.status == JobStatus.RUNNING.value).update(
+            {Job.status: JobStatus.QUEUED.value, Job.attempts: Job.attempts - 1, Job.run_after: datetime.utcnow()},
+            synchronize_session=False
+        )
+        db.commit()
+        return count
+
+crud_job = CRUDJob(Job)
@@ -1,8 +1,11 @@
+import logging
 from typing import List, Optional
 from uuid import UUID
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 
-from app.crud.base import CRUDBase
+from app.crud.base import AsyncCRUDBase, CRUDBase
 from app.models.learning_path import LearningPath
 from app.models.learning_path_step import LearningPathStep
 from app.models.enums import ContentType, ProgressStatus
@@ -21,39 +24,24 @@ from app.schemas.progress import (
     Progress
 )
 
+logger = logging.getLogger(__name__)
+
 class CRUDLearningPath(CRUDBase[LearningPath, LearningPathCreate, LearningPathUpdate]):
     def create(
         self, db: Session, obj_in: LearningPathCreate, created_by: str
     ) -> LearningPath:
-        print(f"[DEBUG] CRUD create called with obj_in: {obj_in.dict()}")
-        print(f"[DEBUG] created_by parameter: {created_by}")
-        
         obj_in_data = obj_in.dict(exclude={"steps", "created_by"})
-        print(f"[DEBUG] obj_in_data after exclude steps and created_by: {obj_in_data}")
-        
-        try:
-            db_obj = LearningPath(**obj_in_data, created_by=created_by)
-            print(f"[DEBUG] Created db_obj: {db_obj.__dict__}")
-        except Exception as e:
-            print(f"[ERROR] Failed to create LearningPath object: {str(e)}")
-            print(f"[ERROR] Error type: {type(e)}")
-            raise
-            
+        db_obj = LearningPath(**obj_in_data, created_by=created_by)
         db.add(db_obj)
         db.flush()  # Get db_obj.id
-        print(f"[DEBUG] After flush - db_obj.id: {db_obj.id}")
         
-        # Create steps if provided
+        # Create steps if provided, in one executemany
         steps = obj_in.steps or []
-        for step_data in steps:
-            step_dict = step_data.dict()
-            step_dict["learning_path_id"] = db_obj.id
-            print(f"[DEBUG] Creating step with data: {step_dict}")
-            db.add(LearningPathStep(**step_dict))
+        logger.debug(f"Creating learning path {db_obj.id} with {len(steps)} steps")
+        crud_learning_path_step.create_many(db, objs_in=steps, learning_path_id=db_obj.id, commit=False)
             
         db.commit()
         db.refresh(db_obj)
-        print(f"[DEBUG] Final db_obj after commit and refresh: {db_obj.__dict__}")
         return db_obj
 
     def get_multi_by_creator(
@@ -82,9 +70,7 @@ class CRUDLearningPath(CRUDBase[LearningPath, LearningPathCreate, LearningPathUp
                 LearningPathStep.learning_path_id == db_obj.id
             ).delete()
             # Create new steps
-            for step_data in steps:
-                step = LearningPathStep(**step_data.dict(), learning_path_id=db_obj.id)
-                db.add(step)
+            crud_learning_path_step.create_many(db, objs_in=steps, learning_path_id=db_obj.id, commit=False)
 
         for field, value in obj_data.items():
             setattr(db_obj, field, value)
@@ -102,6 +88,15 @@ class CRUDLearningPath(CRUDBase[LearningPath, LearningPathCreate, LearningPathUp
         """Get all public learning paths."""
         return db.query(self.model).filter(LearningPath.is_public == True).all()
 
+    def get_multi_by_course(
+        self, db: Session, course_id: str, *, with_steps: bool = False
+    ) -> List[LearningPath]:
+        query = db.query(self.model).filter(LearningPath.course_id == course_id)
+        if with_steps:
+            # One SELECT ... IN for the steps of every path instead of one per path
+            query = query.options(selectinload(LearningPath.steps))
+        return query.all()
+
 class CRUDLearningPathStep(CRUDBase[LearningPathStep, LearningPathStepCreate, LearningPathStepUpdate]):
     def create(
         self, db: Session, *, obj_in: LearningPathStepCreate, learning_path_id: str
@@ -140,7 +135,43 @@ class CRUDProgress(CRUDBase[Progress, ProgressCreate, ProgressUpdate]):
             .first()
         )
 
+class AsyncCRUDLearningPath(AsyncCRUDBase[LearningPath, LearningPathCreate, LearningPathUpdate]):
+    async def create(
+        self, db: AsyncSession, obj_in: LearningPathCreate, created_by: str, course_id: Optional[str] = None
+    ) -> LearningPath:
+        """Create a learning path and its steps in one transaction."""
+        obj_in_data = obj_in.dict(exclude={"steps", "created_by"})
+        db_obj = LearningPath(**obj_in_data, created_by=created_by, course_id=course_id)
+        db.add(db_obj)
+        await db.flush()
+        await crud_learning_path_step_async.create_many(
+            db, objs_in=obj_in.steps or [], learning_path_id=db_obj.id, commit=False
+        )
+        await db.commit()
+        return await self.get_with_steps(db, db_obj.id)
+
+    async def get_with_steps(self, db: AsyncSession, id: str) -> Optional[LearningPath]:
+        result = await db.execute(
+            select(LearningPath)
+            .options(selectinload(LearningPath.steps))
+            .filter(LearningPath.id == id)
+            .execution_options(populate_existing=True)
+        )
+        return result.scalars().first()
+
+    async def get_by_course(
+        self, db: AsyncSession, course_id: str, *, with_steps: bool = False
+    ) -> Optional[LearningPath]:
+        query = select(LearningPath).filter(LearningPath.course_id == course_id).limit(1)
+        if with_steps:
+            # No lazy loading in async code: load the steps up front
+            query = query.options(selectinload(LearningPath.steps))
+        result = await db.execute(query)
+        return result.scalars().first()
+
 # Create instances of the CRUD classes
 crud_learning_path = CRUDLearningPath(LearningPath)
 crud_learning_path_step = CRUDLearningPathStep(LearningPathStep)
-crud_progress = CRUDProgress(Progress)
\ No newline at end of file
+crud_progress = CRUDProgress(Progress)
+crud_learning_path_async = AsyncCRUDLearningPath(LearningPath)
+crud_learning_path_step_async = AsyncCRUDBase(LearningPathStep)
\ No newline at end of file
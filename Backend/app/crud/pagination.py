@@ -0,0 +1,116 @@
+"""Keyset (cursor) pagination, newest first.
+
+Lists are ordered by ``(created_at, id)`` descending. Instead of an OFFSET,
+each page hands out an opaque cursor naming its last row and the next page
+seeks past it (``created_at < :at OR (created_at = :at AND id < :id)``). With
+an index ending in ``(created_at, id)`` the database jumps straight to the
+cursor, so a deep page costs the same as the first one.
+
+Totals are not computed per page: ``total_counts`` keeps them for
+``PAGINATION_COUNT_TTL`` seconds, or until the list is invalidated.
+"""
+import base64
+import binascii
+import json
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Generic, List, NamedTuple, Optional, Sequence, Tuple, TypeVar
+from sqlalchemy import String, and_, literal, or_
+from app.core.config import settings
+
+T = TypeVar("T")
+
+class InvalidCursor(ValueError):
+    pass
+
+class Cursor(NamedTuple):
+    created_at: datetime
+    id: Any
+
+@dataclass
+class Page(Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+def encode_token(values: List[Any]) -> str:
+    """Pack JSON-serialisable values into an opaque, URL-safe cursor string."""
+    payload = json.dumps(values, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_token(value: str, size: int) -> List[Any]:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(value + "=" * (-len(value) % 4)))
+    except (binascii.Error, ValueError) as e:
+        raise InvalidCursor("Invalid cursor") from e
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursor("Invalid cursor")
+    return values
+
+def encode_cursor(row: Any) -> str:
+    return encode_token([row.created_at.isoformat(), row.id])
+
+def decode_cursor(value: str) -> Cursor:
+    created_at, id = decode_token(value, 2)
+    try:
+        return Cursor(datetime.fromisoformat(created_at), id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("Invalid cursor") from e
+
+def _seek_value(model: Any, value: datetime) -> Any:
+    # SQLite stores CURRENT_TIMESTAMP defaults as 'YYYY-MM-DD HH:MM:SS' while
+    # SQLAlchemy binds datetimes with microseconds, which would never compare
+    # equal; bind those in the stored form so ties still fall through to id.
+    if model.__table__.c.created_at.server_default is not None and value.microsecond == 0:
+        return literal(value.strftime("%Y-%m-%d %H:%M:%S"), String)
+    return value
+
+def keyset(query: Any, model: Any, cursor: Optional[Cursor], limit: int) -> Any:
+    """Order ``query`` (a ``Query`` or ``select()``) newest first, starting after ``cursor``.
+
+    One extra row is fetched so ``page_of`` can tell whether a next page exists.
+    """
+    if cursor is not None:
+        at = _seek_value(model, cursor.created_at)
+        query = query.filter(
+            # The plain bound lets the index range-seek; the OR breaks ties on id
+            model.created_at <= at,
+            or_(model.created_at < at, and_(model.created_at == at, model.id < cursor.id))
+        )
+    return query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1)
+
+def page_of(rows: Sequence[T], limit: int) -> Page[T]:
+    rows = list(rows)
+    if len(rows) <= limit:
+        return Page(rows)
+    rows = rows[:limit]
+    return Page(rows, encode_cursor(rows[-1]))
+
+class CountCache:
+    """Recently computed list totals, keyed by list name."""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._counts: Dict[str, Tuple[int, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[int]:
+        with self._lock:
+            entry = self._counts.get(key)
+            if entry is None or time.monotonic() - entry[1] >= self.ttl_seconds:
+                return None
+            return entry[0]
+
+    def set(self, key: str, count: int) -> None:
+        with self._lock:
+            self._counts[key] = (count, time.monotonic())
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        with self._lock:
+            if key is None:
+                self._counts.clear()
+            else:
+                self._counts.pop(key, None)
+
+total_counts = CountCache(settings.PAGINATION_COUNT_TTL)
@@ -5,5 +5,14 @@ from app.models.learning_path import LearningPath
 from app.models.learning_path_step import LearningPathStep
 from app.models.progress import UserProgress, AssessmentProgress, CourseProgress
 from app.models.content import Content
+from app.models.content_batch import ContentBatch
 from app.models.assessment import Quiz, QuizAttempt, Flashcard, Exam, ExamAttempt
-from app.models.chat import ChatGroup, GroupMember, Message, MessageRead 
\ No newline at end of file
+from app.models.chat import ChatGroup, GroupMember, Message, MessageRead
+from app.models.youtube_content import YouTubeContent, YouTubeChatMessage
+from app.models.job import Job
+from app.models.extracted_text import ExtractedText
+# Register the course context index, snapshot maintenance hooks and search indexes
+import app.services.course_index
+import app.services.course_context
+import app.services.message_search
+import app.services.material_search
\ No newline at end of file
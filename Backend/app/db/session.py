@@ -1,13 +1,29 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.db.sqlite import tune
 
-engine = create_engine(settings.SQLITE_URL, connect_args={"check_same_thread": False})
+engine = tune(create_engine(settings.SQLITE_URL, connect_args={"check_same_thread": False}))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def _async_url(url: str) -> str:
+    """The same database through the aiosqlite driver."""
+    return str(make_url(url).set(drivername="sqlite+aiosqlite"))
+
+# Async endpoints use this engine so SQLite I/O and fsyncs never block the
+# event loop. Objects stay usable after commit: there is no implicit lazy IO
+# in async code, so relationships must be eager-loaded where needed.
+async_engine = create_async_engine(_async_url(settings.SQLITE_URL))
+tune(async_engine.sync_engine)
+AsyncSessionLocal = sessionmaker(
+    async_engine, class_=AsyncSession, autocommit=False, autoflush=False, expire_on_commit=False
+)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
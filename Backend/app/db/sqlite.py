@@ -0,0 +1,52 @@
+"""SQLite connection tuning.
+
+With ``SQLITE_PROFILE=production`` every new connection (sync and aiosqlite)
+gets the pragmas below: WAL so readers never block the writer, ``synchronous``
+NORMAL so commits skip the fsync (the WAL is synced at checkpoints), a larger
+page cache, memory-mapped reads, and a busy timeout so concurrent writers wait
+for the lock instead of failing with "database is locked".
+"""
+from typing import Any, Dict, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+
+def production_pragmas() -> Dict[str, Any]:
+    return {
+        "journal_mode": "WAL",
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "cache_size": -settings.SQLITE_CACHE_SIZE_MB * 1024,  # Negative values are KiB
+        "mmap_size": settings.SQLITE_MMAP_SIZE_MB * 1024 * 1024,
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT,
+        "temp_store": "MEMORY",
+    }
+
+def pragmas_for(profile: str) -> Dict[str, Any]:
+    if profile == "production":
+        return production_pragmas()
+    if profile == "default":
+        return {}
+    raise ValueError(f"Unknown SQLite profile: {profile}")
+
+def apply_pragmas(dbapi_connection: Any, pragmas: Dict[str, Any]) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+def tune(engine: Engine, pragmas: Optional[Dict[str, Any]] = None) -> Engine:
+    """Apply ``pragmas`` (default: the configured profile) on every new connection.
+
+    For an async engine pass ``async_engine.sync_engine``.
+    """
+    pragmas = pragmas_for(settings.SQLITE_PROFILE) if pragmas is None else pragmas
+    if engine.dialect.name != "sqlite" or not pragmas:
+        return engine
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        apply_pragmas(dbapi_connection, pragmas)
+
+    return engine
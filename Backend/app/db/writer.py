@@ -0,0 +1,91 @@
+"""Optional single-writer queue for SQLite.
+
+SQLite allows one writer at a time. With ``SQLITE_SINGLE_WRITER`` enabled,
+hot write paths (chat messages, progress rows, job bookkeeping) hand their
+write to ``db_writer``, which runs them one after another on a dedicated
+thread, so writers queue in-process instead of retrying on the database lock.
+Reads keep using the normal sessions and stay concurrent under WAL.
+
+Writes are callables taking a fresh ``Session`` as first argument, e.g.
+``await db_writer.run(crud_job.set_progress, job_id=job_id, progress=0.5)``.
+The session is closed afterwards, so returned objects are detached: load
+what the caller needs before returning. With the queue disabled the same
+call runs on a fresh session in the caller's thread (``run_sync``) or in a
+worker thread (``run``).
+"""
+import asyncio
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.session import SessionLocal
+
+def call_with_session(session_factory: Callable[[], Session], fn: Callable[..., Any], *args, **kwargs) -> Any:
+    db = session_factory()
+    try:
+        return fn(db, *args, **kwargs)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+class SingleWriter:
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal, enabled: Optional[bool] = None):
+        self.session_factory = session_factory
+        self.enabled = settings.SQLITE_SINGLE_WRITER if enabled is None else enabled
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_thread(self) -> None:
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._work, name="sqlite-writer", daemon=True)
+                self._thread.start()
+
+    def _work(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            fn, args, kwargs, future = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = call_with_session(self.session_factory, fn, *args, **kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        """Queue a write and return a future for its result."""
+        self._ensure_thread()
+        future: Future = Future()
+        self._queue.put((fn, args, kwargs, future))
+        return future
+
+    def run_sync(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a write from synchronous code and wait for it."""
+        if not self.enabled or threading.current_thread() is self._thread:
+            return call_with_session(self.session_factory, fn, *args, **kwargs)
+        return self.submit(fn, *args, **kwargs).result()
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a write without blocking the event loop."""
+        if not self.enabled:
+            return await asyncio.to_thread(call_with_session, self.session_factory, fn, *args, **kwargs)
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def stop(self) -> None:
+        """Finish the queued writes and stop the writer thread."""
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            self._queue.put(None)
+            thread.join()
+        self._thread = None
+
+db_writer = SingleWriter()
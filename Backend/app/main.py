@@ -1,11 +1,27 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.api.v1.api import api_router
+from app.db.writer import db_writer
+from app.services import text_extraction
+from app.services.jobs import job_pool
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Background job workers run inside the API process
+    await job_pool.start()
+    yield
+    await job_pool.stop()
+    text_extraction.shutdown()
+    # Let queued writes land before the process exits
+    await asyncio.to_thread(db_writer.stop)
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan
 )
 
 # Set all CORS enabled origins
@@ -16,6 +32,7 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor"],
     )
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
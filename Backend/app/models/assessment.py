@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Float, DateTime, ForeignKey, JSON, Integer, Boolean
+from sqlalchemy import Column, String, Float, DateTime, ForeignKey, JSON, Integer, Boolean, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import uuid
@@ -19,6 +19,8 @@ class Quiz(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (Index("ix_quizzes_created_at_id", "created_at", "id"),)
+
     attempts = relationship("QuizAttempt", back_populates="quiz")
     creator = relationship("User", back_populates="created_quizzes")
     course = relationship("Course", back_populates="quizzes")
@@ -34,6 +36,8 @@ class QuizAttempt(Base):
     started_at = Column(DateTime, default=datetime.utcnow)
     completed_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (Index("ix_quiz_attempts_user_id_quiz_id", "user_id", "quiz_id"),)
+
     quiz = relationship("Quiz", back_populates="attempts")
     user = relationship("User", back_populates="quiz_attempts")
 
@@ -50,6 +54,8 @@ class Flashcard(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (Index("ix_flashcards_created_at_id", "created_at", "id"),)
+
     creator = relationship("User", back_populates="created_flashcards")
     course = relationship("Course", back_populates="flashcards")
 
@@ -68,6 +74,8 @@ class Exam(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (Index("ix_exams_created_at_id", "created_at", "id"),)
+
     attempts = relationship("ExamAttempt", back_populates="exam")
     creator = relationship("User", back_populates="created_exams")
     course = relationship("Course", back_populates="exams")
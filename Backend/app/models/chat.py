@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, Text, Index
 from sqlalchemy.orm import relationship
 from app.db.base_class import Base
 
@@ -20,6 +20,11 @@ class GroupMember(Base):
     group_id = Column(Integer, ForeignKey("chat_groups.id"))
     user_id = Column(String(255), ForeignKey("users.email"), nullable=False)
     joined_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_group_members_user_id", "user_id"),
+        Index("ix_group_members_group_id_user_id", "group_id", "user_id"),
+    )
     
     # Relationships
     group = relationship("ChatGroup", back_populates="members")
@@ -33,6 +38,9 @@ class Message(Base):
     content = Column(Text)
     file_url = Column(String(255), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+
+    # Group history, newest first
+    __table_args__ = (Index("ix_messages_group_id_created_at", "group_id", "created_at"),)
     
     # Relationships
     group = relationship("ChatGroup", back_populates="messages")
@@ -45,6 +53,8 @@ class MessageRead(Base):
     message_id = Column(Integer, ForeignKey("messages.id"))
     user_id = Column(String(255), ForeignKey("users.email"), nullable=False)
     read_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (Index("ix_message_reads_message_id", "message_id"),)
     
     # Relationships
     message = relationship("Message", back_populates="reads")
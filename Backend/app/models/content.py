@@ -1,10 +1,10 @@
-from sqlalchemy import Column, String, DateTime, JSON, ForeignKey
+from sqlalchemy import Column, String, DateTime, JSON, ForeignKey, Index
 from app.db.base_class import Base
 from app.models.enums import ContentType
 import uuid
 from datetime import datetime
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 
 class Content(Base):
     __tablename__ = "content"
@@ -12,14 +12,24 @@ class Content(Base):
     id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
     title = Column(String, index=True)
     content_type = Column(String, default=ContentType.TEXT)
-    content = Column(String)
+    # Markdown bodies and base64 uploads: only loaded when read or undeferred
+    content = deferred(Column(String))
     meta = Column(JSON, default={})
     created_by = Column(String, ForeignKey("users.id"))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     description = Column(String, nullable=True)
     course_id = Column(String, ForeignKey("courses.id"), nullable=True)
+    # SHA-256 of the uploaded file in the blob store, for FILE content
+    blob_sha256 = Column(String(64), nullable=True, index=True)
+    # Upload batch the file arrived in; indexed so a batch is listed without a scan
+    batch_id = Column(String, ForeignKey("content_batches.id"), nullable=True, index=True)
+
+    # Course content, optionally narrowed to some content types
+    __table_args__ = (Index("ix_content_course_id_content_type", "course_id", "content_type"),)
+
     course = relationship("Course", back_populates="contents")
+    batch = relationship("ContentBatch", back_populates="contents")
 
     def __repr__(self):
         return f"<Content {self.title}>"
\ No newline at end of file
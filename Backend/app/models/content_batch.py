@@ -0,0 +1,21 @@
+from sqlalchemy import Column, String, DateTime, ForeignKey
+from app.db.base_class import Base
+import uuid
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+
+class ContentBatch(Base):
+    """Files uploaded together; their content rows point here through ``batch_id``."""
+    __tablename__ = "content_batches"
+
+    id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
+    name = Column(String, nullable=True)
+    description = Column(String, nullable=True)
+    created_by = Column(String, ForeignKey("users.id"), index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    contents = relationship("Content", back_populates="batch")
+
+    def __repr__(self):
+        return f"<ContentBatch {self.id}>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from uuid import uuid4
 from datetime import datetime
@@ -14,6 +14,9 @@ class Course(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Cursor pagination order
+    __table_args__ = (Index("ix_courses_created_at_id", "created_at", "id"),)
+
     # Relationships
     contents = relationship("Content", back_populates="course")
     learning_paths = relationship("LearningPath", back_populates="course")
@@ -10,4 +10,10 @@ class ContentType(str, Enum):
 class ProgressStatus(str, Enum):
     NOT_STARTED = "not_started"
     IN_PROGRESS = "in_progress"
-    COMPLETED = "completed" 
\ No newline at end of file
+    COMPLETED = "completed"
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, String, DateTime, Text
+from sqlalchemy.orm import deferred
+from sqlalchemy.sql import func
+from app.db.base_class import Base
+
+class ExtractedText(Base):
+    """Text pulled out of an uploaded file, once per distinct file (blob hash)."""
+    __tablename__ = "extracted_texts"
+
+    sha256 = Column(String(64), primary_key=True)
+    text = deferred(Column(Text, nullable=False, default=""))
+    # Why nothing could be extracted (unsupported or unreadable file)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<ExtractedText {self.sha256}>"
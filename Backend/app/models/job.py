@@ -0,0 +1,29 @@
+from sqlalchemy import Column, String, DateTime, JSON, ForeignKey, Integer, Float, Text
+from app.db.base_class import Base
+from app.models.enums import JobStatus
+import uuid
+from datetime import datetime
+from sqlalchemy.sql import func
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
+    job_type = Column(String, nullable=False)
+    status = Column(String, nullable=False, default=JobStatus.QUEUED.value, index=True)
+    payload = Column(JSON, default={})
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    progress = Column(Float, default=0.0)  # 0.0 - 1.0
+    progress_message = Column(String, nullable=True)
+    attempts = Column(Integer, default=0)
+    max_attempts = Column(Integer, default=1)
+    run_after = Column(DateTime, default=datetime.utcnow)  # Not picked up before this time (retry backoff)
+    created_by = Column(String, ForeignKey("users.id"), index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<Job {self.job_type} {self.status}>"
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import List, Optional
 from pydantic import BaseModel, UUID4, Field
-from sqlalchemy import Column, String, Integer, ForeignKey, Text, DateTime, Boolean, JSON
+from sqlalchemy import Column, String, Integer, ForeignKey, Text, DateTime, Boolean, JSON, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import uuid
@@ -105,7 +105,15 @@ class LearningPath(Base):
     estimated_duration = Column(Integer, nullable=False)
     tags = Column(JSON, default=lambda: [])
     course_id = Column(String, ForeignKey("courses.id"), nullable=True)
+
+    __table_args__ = (Index("ix_learning_paths_course_id", "course_id"),)
+
     course = relationship("Course", back_populates="learning_paths")
 
     # Relationships
-    steps = relationship("LearningPathStep", back_populates="learning_path", cascade="all, delete-orphan")
\ No newline at end of file
+    steps = relationship(
+        "LearningPathStep",
+        back_populates="learning_path",
+        cascade="all, delete-orphan",
+        order_by="LearningPathStep.order"
+    )
\ No newline at end of file
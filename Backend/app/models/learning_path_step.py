@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, ForeignKey, Text, DateTime, Enum
+from sqlalchemy import Column, String, Integer, ForeignKey, Text, DateTime, Enum, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import uuid
@@ -20,5 +20,8 @@ class LearningPathStep(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     content_id = Column(String, nullable=True)
 
+    # Steps of a path in order
+    __table_args__ = (Index("ix_learning_path_steps_path_id_order", "learning_path_id", "order"),)
+
     # Relationships
     learning_path = relationship("LearningPath", back_populates="steps") 
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, Boolean, DateTime, String, Float, JSON, Integer
+from sqlalchemy import Column, ForeignKey, Boolean, DateTime, String, Float, JSON, Integer, Index
 from datetime import datetime
 import uuid
 from sqlalchemy.orm import relationship
@@ -17,6 +17,9 @@ class UserProgress(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Also serves lookups by user alone and by (user, learning path)
+    __table_args__ = (Index("ix_user_progress_user_path_step", "user_id", "learning_path_id", "step_id"),)
+
 class AssessmentProgress(Base):
     __tablename__ = "assessment_progress"
 
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey, JSON, func
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, JSON, Index, column, func
+from sqlalchemy.orm import deferred, relationship
 from datetime import datetime
 import uuid
 from app.db.base_class import Base
@@ -10,7 +10,8 @@ class YouTubeContent(Base):
     id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
     video_id = Column(String, unique=True, index=True, nullable=False)
     title = Column(String, nullable=False)
-    transcript = Column(Text, nullable=True)
+    # Whole transcripts: only loaded when read or undeferred
+    transcript = deferred(Column(Text, nullable=True))
     thumbnail_url = Column(String, nullable=True)
     video_url = Column(String, nullable=False)
     video_metadata = Column(JSON, default={})
@@ -18,6 +19,17 @@ class YouTubeContent(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    # Partial index for the transcribed-videos list, in cursor pagination order
+    __table_args__ = (
+        Index(
+            "ix_youtube_content_transcribed_created_at_id",
+            "created_at",
+            "id",
+            sqlite_where=column("transcript").isnot(None),
+            postgresql_where=column("transcript").isnot(None),
+        ),
+    )
+
     # Relationships
     user = relationship("User", back_populates="youtube_contents")
     chat_messages = relationship("YouTubeChatMessage", back_populates="youtube_content", cascade="all, delete-orphan")
@@ -29,6 +41,8 @@ class YouTubeChatMessage(Base):
     youtube_content_id = Column(String, ForeignKey("youtube_content.id"), nullable=False)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
     message = Column(Text, nullable=False)
+    # The assistant's answer to ``message``
+    ai_response = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
@@ -54,6 +54,10 @@ class Message(MessageBase):
     class Config:
         from_attributes = True
 
+class MessageSearchHit(Message):
+    snippet: str  # Matched words wrapped in <mark> tags
+    score: float  # BM25, lower is a better match
+
 class MessageReadCreate(BaseModel):
     message_id: int
     user_id: str
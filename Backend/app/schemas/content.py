@@ -19,6 +19,7 @@ class ContentBase(BaseModel):
     description: Optional[str] = None
     course_id: Optional[str] = None
     meta: Optional[Dict[str, Any]] = None
+    blob_sha256: Optional[str] = None
 
     class Config:
         orm_mode = True
@@ -37,6 +38,7 @@ class ContentUpdate(BaseModel):
 
 class ContentResponse(ContentBase):
     id: str
+    batch_id: Optional[str] = None
     created_by: str
     created_at: datetime
     updated_at: datetime
@@ -47,6 +49,10 @@ class ContentResponse(ContentBase):
 # Alias for backward compatibility
 Content = ContentResponse
 
+class ContentListItem(ContentResponse):
+    """A listed content row; ``content`` is null when listed without bodies."""
+    content: Optional[str] = None
+
 class ContentListResponse(BaseModel):
     items: List[ContentResponse]
     total: int
@@ -58,6 +64,7 @@ class ContentGenerateRequest(BaseModel):
     content_type: str
     parameters: Dict[str, Any]
     provider: str = "openai"
+    bypass_cache: bool = False  # Regenerate even if an identical request is cached
 
 # Alias for backward compatibility
 GenerateContentRequest = ContentGenerateRequest
@@ -67,10 +74,16 @@ class ContentGeneratorResponse(BaseModel):
 
 class ContentBatchResponse(BaseModel):
     batch_id: str
+    name: Optional[str] = None
+    description: Optional[str] = None
     files: List[ContentResponse]
 
+class ContentBatchAddResponse(BaseModel):
+    batch_id: str
+    added_files: List[ContentResponse]
+
 class ContentBatchCreate(BaseModel):
-    name: str
+    name: Optional[str] = None
     description: Optional[str] = None
 
 class ContentBatchUpdate(BaseModel):
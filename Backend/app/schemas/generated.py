@@ -0,0 +1,51 @@
+"""Shapes of the JSON documents the AI providers are asked to produce."""
+from typing import List, Optional, Union
+from pydantic import BaseModel, Field
+
+class QuizQuestion(BaseModel):
+    question: str
+    options: List[str] = Field(..., min_items=2)
+    correct_answer: Union[int, str]
+    explanation: Optional[str] = None
+
+class GeneratedQuiz(BaseModel):
+    title: str = "Generated Quiz"
+    description: Optional[str] = None
+    difficulty: Optional[str] = None
+    questions: List[QuizQuestion]
+
+class OutlineResource(BaseModel):
+    type: str = "text"
+    title: str
+    url: str = ""
+
+class OutlineChapter(BaseModel):
+    title: str
+    description: str = ""
+    estimatedDuration: str = ""
+    keyConcepts: List[str] = Field(default_factory=list)
+    resources: List[OutlineResource] = Field(default_factory=list)
+
+class LearningPathOutline(BaseModel):
+    materialTitle: str
+    materialDescription: str = ""
+    progress: int = 0
+    chapters: List[OutlineChapter]
+
+class ChapterSection(BaseModel):
+    title: str
+    content: str
+    key_points: List[str] = Field(default_factory=list)
+    examples: List[str] = Field(default_factory=list)
+
+class GeneratedChapter(BaseModel):
+    title: Optional[str] = None
+    sections: List[ChapterSection]
+
+class GeneratedChapters(BaseModel):
+    chapters: List[GeneratedChapter]
+
+class GeneratedCourse(BaseModel):
+    title: str
+    sub_title: Optional[str] = None
+    description: Optional[str] = None
@@ -0,0 +1,30 @@
+from typing import Any, Optional
+from datetime import datetime
+from pydantic import BaseModel
+
+class JobProgress(BaseModel):
+    id: str
+    status: str
+    progress: float = 0.0
+    progress_message: Optional[str] = None
+
+    class Config:
+        orm_mode = True
+
+class JobResponse(JobProgress):
+    job_type: str
+    attempts: int = 0
+    max_attempts: int = 1
+    error: Optional[str] = None
+    run_after: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+class JobResult(BaseModel):
+    id: str
+    status: str
+    result: Any = None
+
+    class Config:
+        orm_mode = True
@@ -101,6 +101,7 @@ class LearningPathStep(LearningPathStepBase):
     updated_at: Optional[datetime] = None
 
     class Config:
+        orm_mode = True
         from_attributes = True
         schema_extra = {
             "example": {
@@ -124,6 +125,7 @@ class LearningPath(LearningPathBase):
     steps: List[LearningPathStep] = Field(default_factory=list)
 
     class Config:
+        orm_mode = True
         from_attributes = True
         schema_extra = {
             "example": {
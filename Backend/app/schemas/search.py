@@ -0,0 +1,11 @@
+from typing import Optional
+from pydantic import BaseModel
+
+class SearchHit(BaseModel):
+    type: str  # course, text, video (content transcript) or youtube
+    id: str  # Id of the course, content row or YouTube video row
+    title: Optional[str] = None
+    course_id: Optional[str] = None
+    creator_id: Optional[str] = None
+    snippet: str  # Matched words wrapped in <mark> tags
+    score: float  # BM25, lower is a better match
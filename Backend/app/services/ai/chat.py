@@ -1,4 +1,4 @@
-from typing import Dict
+from typing import AsyncIterator, Dict
 import os
 import google.generativeai as genai
 
@@ -6,26 +6,18 @@ import google.generativeai as genai
 genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
 model = genai.GenerativeModel('gemini-1.5-flash')
 
-async def get_ai_response(context: Dict[str, str]) -> str:
-    """
-    Get AI response based on video context and user message using Gemini.
-    
-    Args:
-        context: Dictionary containing:
-            - video_title: Title of the YouTube video
-            - video_url: URL of the YouTube video
-            - transcript: Full transcript of the video (optional)
-            - user_message: User's question or message
-    
-    Returns:
-        str: AI's response
-    """
-    system_prompt = """You are an AI assistant helping users understand YouTube videos. 
+SYSTEM_PROMPT = """You are an AI assistant helping users understand YouTube videos. 
     You have access to the video's title and URL, and optionally its transcript.
     Even without a transcript, you can make educated guesses about the video's content based on its title.
     Be helpful and engaging in your responses. If you're not sure about something, make an educated guess based on the title.
     Always maintain a helpful and friendly tone."""
-    
+
+GENERATION_CONFIG = {
+    "temperature": 0.7,
+    "max_output_tokens": 1000,
+}
+
+def _build_contents(context: Dict[str, str]) -> list:
     # Build the prompt based on available information
     prompt_parts = [
         f"Video Title: {context['video_title']}",
@@ -41,17 +33,44 @@ async def get_ai_response(context: Dict[str, str]) -> str:
     ])
     
     user_prompt = "\n".join(prompt_parts)
+    return [{"role": "user", "parts": [SYSTEM_PROMPT + "\n\n" + user_prompt]}]
+
+async def get_ai_response(context: Dict[str, str]) -> str:
+    """
+    Get AI response based on video context and user message using Gemini.
+    
+    Args:
+        context: Dictionary containing:
+            - video_title: Title of the YouTube video
+            - video_url: URL of the YouTube video
+            - transcript: Full transcript of the video (optional)
+            - user_message: User's question or message
     
+    Returns:
+        str: AI's response
+    """
     try:
-        response = model.generate_content(
-            contents=[
-                {"role": "user", "parts": [system_prompt + "\n\n" + user_prompt]}
-            ],
-            generation_config={
-                "temperature": 0.7,
-                "max_output_tokens": 1000,
-            }
+        response = await model.generate_content_async(
+            contents=_build_contents(context),
+            generation_config=GENERATION_CONFIG
         )
         return response.text
     except Exception as e:
-        raise Exception(f"Error getting AI response: {str(e)}") 
\ No newline at end of file
+        raise Exception(f"Error getting AI response: {str(e)}")
+
+async def stream_ai_response(context: Dict[str, str]) -> AsyncIterator[str]:
+    """
+    Stream the AI response for the same context as `get_ai_response`,
+    yielding text chunks as Gemini produces them.
+    """
+    try:
+        response = await model.generate_content_async(
+            contents=_build_contents(context),
+            generation_config=GENERATION_CONFIG,
+            stream=True
+        )
+        async for chunk in response:
+            if chunk.parts:
+                yield chunk.text
+    except Exception as e:
+        raise Exception(f"Error getting AI response: {str(e)}")
@@ -0,0 +1,86 @@
+"""Content-addressed on-disk storage for uploaded files.
+
+An upload is streamed to a temporary file in ``CHUNK_SIZE`` pieces while its
+SHA-256 is computed, so neither the whole file nor a base64 copy of it is
+ever held in memory. The finished file is then moved to
+``<root>/<aa>/<bb>/<sha256>``; if that file already exists the upload was a
+duplicate and the temporary copy is dropped. ``Content.blob_sha256`` refers
+to the stored file, which never changes once written.
+"""
+import hashlib
+import os
+import re
+import uuid
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+import aiofiles
+import aiofiles.os
+from app.core.config import settings
+
+CHUNK_SIZE = 1024 * 1024
+SHA256_PATTERN = re.compile(r"[0-9a-f]{64}")
+
+class BlobTooLarge(ValueError):
+    """The upload is bigger than the store accepts."""
+
+@dataclass
+class StoredBlob:
+    sha256: str
+    size: int
+    path: str
+    # False when identical bytes were already stored
+    created: bool
+
+class BlobStore:
+    def __init__(self, root: str, max_size: int):
+        self.root = root
+        self.max_size = max_size
+
+    def path(self, sha256: str) -> str:
+        """Where the blob with this hash lives (ValueError for anything but a hash)."""
+        if not SHA256_PATTERN.fullmatch(sha256 or ""):
+            raise ValueError(f"Not a SHA-256 hex digest: {sha256!r}")
+        return os.path.join(self.root, sha256[:2], sha256[2:4], sha256)
+
+    def exists(self, sha256: str) -> bool:
+        return os.path.isfile(self.path(sha256))
+
+    async def put(self, source: Any, check: Optional[Callable[[bytes], None]] = None) -> StoredBlob:
+        """Store everything ``source.read(n)`` returns (e.g. an ``UploadFile``).
+
+        Raises ``BlobTooLarge`` as soon as more than ``max_size`` bytes have
+        been read. ``check`` sees the first chunk before anything is written
+        and may raise to reject the upload. Nothing is kept after an error.
+        """
+        tmp_dir = os.path.join(self.root, "tmp")
+        await aiofiles.os.makedirs(tmp_dir, exist_ok=True)
+        tmp_path = os.path.join(tmp_dir, uuid.uuid4().hex)
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            async with aiofiles.open(tmp_path, "wb") as out:
+                chunk = await source.read(CHUNK_SIZE)
+                if check is not None:
+                    check(chunk)
+                while chunk:
+                    size += len(chunk)
+                    if size > self.max_size:
+                        raise BlobTooLarge(f"File exceeds the {self.max_size} byte limit")
+                    digest.update(chunk)
+                    await out.write(chunk)
+                    chunk = await source.read(CHUNK_SIZE)
+            sha256 = digest.hexdigest()
+            path = self.path(sha256)
+            if await aiofiles.os.path.isfile(path):
+                await aiofiles.os.remove(tmp_path)
+                return StoredBlob(sha256, size, path, created=False)
+            await aiofiles.os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Atomic: a concurrent identical upload just replaces equal bytes
+            await aiofiles.os.replace(tmp_path, path)
+            return StoredBlob(sha256, size, path, created=True)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+blob_store = BlobStore(settings.BLOB_STORE_DIR, settings.MAX_FILE_SIZE)
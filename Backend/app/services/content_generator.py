@@ -1,239 +1,285 @@
+import asyncio
 import json
 import os
-from typing import Dict, Any, Optional, List
-from openai import OpenAI
+import re
+import weakref
+from functools import lru_cache
+from typing import Dict, Any, Optional, List, AsyncIterator, Awaitable, Callable
+from openai import AsyncOpenAI
 import yt_dlp
 from app.core.config import settings
-import openai
 from google.generativeai import GenerativeModel
 import google.generativeai as genai
 from fastapi import HTTPException
 import logging
-from app.crud.crud_content import crud_content
 from app.db.session import SessionLocal
-from app.models.enums import ContentType
+from app.services import course_index
+from app.services.course_context import course_contexts
+from app.services.generation_cache import GenerationCache, get_generation_cache
+from app.services.provider_router import ProviderRouter
+from app.services.single_flight import SingleFlight, flight_key, get_single_flight
+from app.services.structured_output import StructuredOutputError, structured_output
 
 logger = logging.getLogger(__name__)
 
-class ContentGenerator:
-    def __init__(self):
-        # Initialize OpenAI
-        self.client = None
-        self.openai_client = None
-        self.gemini_model = None
-        
-        # Load templates
-        template_path = os.path.join(os.path.dirname(__file__), '..', 'core', 'content_templates.json')
-        with open(os.path.abspath(template_path), 'r') as f:
-            self.templates = json.load(f)
-            
-        # Initialize API clients if keys are available
-        if settings.OPENAI_API_KEY:
-            try:
-                self.openai_client = OpenAI(
-                    api_key=settings.OPENAI_API_KEY,
-                    timeout=30.0,  # 30 second timeout
-                    max_retries=3  # Retry failed requests up to 3 times
-                )
-            except Exception as e:
-                logger.error(f"Failed to initialize OpenAI client: {str(e)}")
-                self.openai_client = None
-            
-        if settings.GEMINI_API_KEY:
-            try:
-                genai.configure(api_key=settings.GEMINI_API_KEY)
-                self.gemini_model = GenerativeModel('gemini-1.5-flash')
-            except Exception as e:
-                logger.error(f"Failed to initialize Gemini client: {str(e)}")
-                self.gemini_model = None
+CHAPTER_HEADING = re.compile(r"^(#{1,3}\s+|(chapter|module|unit|part|week|lesson)\b|\d+[.)]\s+)", re.IGNORECASE)
+
+class AIProvider:
+    """Base class for the async LLM backends used by ContentGenerator.
+
+    Calls are awaited on the event loop instead of blocking it, and each
+    provider caps the number of in-flight upstream requests with a semaphore
+    so a burst of generations cannot exhaust the provider's rate limit.
+    """
+    name = "base"
+
+    def __init__(self, max_concurrency: Optional[int] = None):
+        self.max_concurrency = max_concurrency or settings.AI_MAX_CONCURRENCY
+        # One semaphore per event loop: the test client and uvicorn reloads
+        # run separate loops and asyncio primitives cannot be shared between them.
+        self._semaphores = weakref.WeakKeyDictionary()
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphores[loop] = semaphore
+        return semaphore
+
+    async def generate(self, prompt: str, **options) -> str:
+        """Complete a single user prompt."""
+        return await self.chat([{"role": "user", "content": prompt}], **options)
+
+    async def chat(self, messages: List[Dict[str, str]], **options) -> str:
+        """Complete a chat conversation given as OpenAI-style messages."""
+        async with self._semaphore():
+            return await self._chat(messages, **options)
+
+    async def stream_chat(self, messages: List[Dict[str, str]], **options) -> AsyncIterator[str]:
+        """Yield completion text chunks as the provider produces them."""
+        async with self._semaphore():
+            async for chunk in self._stream_chat(messages, **options):
+                yield chunk
+
+    async def _chat(self, messages: List[Dict[str, str]], **options) -> str:
+        raise NotImplementedError
+
+    async def _stream_chat(self, messages: List[Dict[str, str]], **options) -> AsyncIterator[str]:
+        # Backends without native streaming deliver the whole answer as one chunk
+        yield await self._chat(messages, **options)
+
+class OpenAIProvider(AIProvider):
+    name = "openai"
+
+    def __init__(self, api_key: str, model: str = "gpt-3.5-turbo", max_concurrency: Optional[int] = None):
+        super().__init__(max_concurrency)
+        self.model = model
+        self.client = AsyncOpenAI(
+            api_key=api_key,
+            timeout=settings.AI_REQUEST_TIMEOUT,
+            max_retries=3  # Retry failed requests up to 3 times
+        )
 
-    async def generate_content(self, content_type: str, parameters: Dict[str, Any], provider: str = "openai") -> Dict[str, Any]:
-        """Generate content using AI."""
+    async def _chat(self, messages: List[Dict[str, str]], **options) -> str:
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            **options
+        )
+        return response.choices[0].message.content
+
+    async def _stream_chat(self, messages: List[Dict[str, str]], **options) -> AsyncIterator[str]:
+        stream = await self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            stream=True,
+            **options
+        )
         try:
-            # Try Gemini first if configured
-            if provider == "gemini" and self.gemini_model:
-                try:
-                    response = await self._generate_with_gemini(self._get_prompt(content_type, parameters))
-                    return self._parse_response(response, content_type)
-                except Exception as e:
-                    logger.warning(f"Gemini generation failed, falling back to OpenAI: {str(e)}")
-            
-            # Fall back to OpenAI if Gemini fails or isn't configured
-            if self.openai_client:
-                response = await self._generate_with_openai(self._get_prompt(content_type, parameters))
-                return self._parse_response(response, content_type)
-            
-            raise HTTPException(
-                status_code=500,
-                detail="No AI provider configured"
-            )
-        except Exception as e:
-            logger.error(f"Content generation error: {str(e)}")
-            raise HTTPException(
-                status_code=500,
-                detail=f"Error generating content: {str(e)}"
+            async for event in stream:
+                if event.choices and event.choices[0].delta.content:
+                    yield event.choices[0].delta.content
+        finally:
+            # Closing the HTTP response stops the upstream generation when the
+            # consumer goes away before the completion is finished
+            await stream.close()
+
+class GeminiProvider(AIProvider):
+    name = "gemini"
+
+    def __init__(self, api_key: str, model: str = "gemini-1.5-flash", max_concurrency: Optional[int] = None):
+        super().__init__(max_concurrency)
+        genai.configure(api_key=api_key)
+        self.model = GenerativeModel(model)
+
+    async def generate(self, prompt: str, **options) -> str:
+        async with self._semaphore():
+            response = await self.model.generate_content_async(
+                prompt,
+                generation_config=self._generation_config(options)
             )
+            return response.text
 
-    async def _generate_with_openai(self, prompt: str) -> str:
-        """Generate content using OpenAI."""
-        if not self.openai_client:
-            raise HTTPException(
-                status_code=500,
-                detail="OpenAI client not initialized. Please check your API key."
-            )
-            
+    async def _chat(self, messages: List[Dict[str, str]], **options) -> str:
+        history, prompt = self._to_gemini_history(messages)
+        chat = self.model.start_chat(history=history)
+        response = await chat.send_message_async(
+            prompt,
+            generation_config=self._generation_config(options)
+        )
+        return response.text
+
+    async def _stream_chat(self, messages: List[Dict[str, str]], **options) -> AsyncIterator[str]:
+        history, prompt = self._to_gemini_history(messages)
+        chat = self.model.start_chat(history=history)
+        response = await chat.send_message_async(
+            prompt,
+            stream=True,
+            generation_config=self._generation_config(options)
+        )
+        async for chunk in response:
+            if chunk.parts:
+                yield chunk.text
+
+    @staticmethod
+    def _generation_config(options: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        config = {}
+        if "temperature" in options:
+            config["temperature"] = options["temperature"]
+        if "max_tokens" in options:
+            config["max_output_tokens"] = options["max_tokens"]
+        return config or None
+
+    @staticmethod
+    def _to_gemini_history(messages: List[Dict[str, str]]):
+        """Convert OpenAI-style messages into Gemini chat history plus the final prompt.
+
+        Gemini has no system role, so system messages are folded into the next
+        user turn, and consecutive turns of the same role are merged.
+        """
+        history: List[Dict[str, Any]] = []
+        pending_system: List[str] = []
+        for msg in messages[:-1]:
+            if msg["role"] == "system":
+                pending_system.append(msg["content"])
+                continue
+            role = "model" if msg["role"] == "assistant" else "user"
+            text = msg["content"]
+            if role == "user" and pending_system:
+                text = "\n\n".join(pending_system + [text])
+                pending_system = []
+            if history and history[-1]["role"] == role:
+                history[-1]["parts"].append(text)
+            else:
+                history.append({"role": role, "parts": [text]})
+        prompt = messages[-1]["content"]
+        if pending_system:
+            prompt = "\n\n".join(pending_system + [prompt])
+        return history, prompt
+
+@lru_cache()
+def get_default_providers() -> Dict[str, AIProvider]:
+    """Providers configured from settings, shared by every ContentGenerator.
+
+    Sharing them means the concurrency limit applies per process rather than
+    per ContentGenerator instance.
+    """
+    providers: Dict[str, AIProvider] = {}
+    if settings.OPENAI_API_KEY:
         try:
-            response = self.openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.7,
-                max_tokens=1000
-            )
-            return response.choices[0].message.content
+            providers["openai"] = OpenAIProvider(settings.OPENAI_API_KEY)
         except Exception as e:
-            logger.error(f"OpenAI generation error: {str(e)}")
-            raise HTTPException(
-                status_code=500,
-                detail=f"Error generating content with OpenAI: {str(e)}"
-            )
-
-    async def _generate_with_gemini(self, prompt: str) -> str:
-        """Generate content using Gemini."""
+            logger.error(f"Failed to initialize OpenAI client: {str(e)}")
+    if settings.GEMINI_API_KEY:
         try:
-            response = self.gemini_model.generate_content(prompt)
-            return response.text
+            providers["gemini"] = GeminiProvider(settings.GEMINI_API_KEY)
         except Exception as e:
-            logger.error(f"Gemini generation error: {str(e)}")
-            raise HTTPException(
-                status_code=500,
-                detail=f"Error generating content with Gemini: {str(e)}"
-            )
+            logger.error(f"Failed to initialize Gemini client: {str(e)}")
+    return providers
 
-    async def _generate_quiz_openai(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
-        if not self.openai_client:
-            return {"content": "OpenAI API key not configured"}
-        
-        prompt = f"Generate a {parameters.get('difficulty', 'beginner')} level quiz about {parameters.get('topic')} with {parameters.get('num_questions', 3)} questions. Format as JSON with questions array containing question, options, and correct_answer."
-        
-        try:
-            response = await self.openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": prompt}]
-            )
-            return {"content": response.choices[0].message.content}
-        except Exception as e:
-            return {"content": f"Error generating quiz: {str(e)}"}
+@lru_cache()
+def get_default_router() -> ProviderRouter:
+    """Router over the default providers, so health tracking is process-wide."""
+    return ProviderRouter(get_default_providers())
 
-    async def _generate_quiz_gemini(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
-        if not self.gemini_model:
-            return {"content": "Gemini API key not configured"}
-        
-        prompt = f"Generate a {parameters.get('difficulty', 'beginner')} level quiz about {parameters.get('topic')} with {parameters.get('num_questions', 3)} questions. Format as JSON with questions array containing question, options, and correct_answer."
+class ContentGenerator:
+    def __init__(
+        self,
+        providers: Optional[Dict[str, AIProvider]] = None,
+        cache: Optional[GenerationCache] = None,
+        single_flight: Optional[SingleFlight] = None,
+        router: Optional[ProviderRouter] = None,
+    ):
+        self.providers = providers if providers is not None else get_default_providers()
+        if router is None:
+            router = get_default_router() if providers is None else ProviderRouter(self.providers)
+        self.router = router
+        self.cache = cache if cache is not None else get_generation_cache()
+        self.single_flight = single_flight if single_flight is not None else get_single_flight()
         
-        try:
-            response = await self.gemini_model.generate_content(prompt)
-            return {"content": response.text}
-        except Exception as e:
-            return {"content": f"Error generating quiz: {str(e)}"}
+        # Load templates
+        template_path = os.path.join(os.path.dirname(__file__), '..', 'core', 'content_templates.json')
+        with open(os.path.abspath(template_path), 'r') as f:
+            self.templates = json.load(f)
 
-    async def _generate_summary_openai(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
-        if not self.openai_client:
-            return {"content": "OpenAI API key not configured"}
-        
-        prompt = f"Summarize the following text concisely:\n\n{parameters.get('text')}"
-        
-        try:
-            response = await self.openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": prompt}]
-            )
-            return {"content": response.choices[0].message.content}
-        except Exception as e:
-            return {"content": f"Error generating summary: {str(e)}"}
+    async def _complete(self, prompt: str, preferred: Optional[str] = None, hedge: bool = False, **options) -> str:
+        """Run a prompt on the preferred provider, routing around failing ones."""
+        return await self.router.call(lambda provider: provider.generate(prompt, **options), preferred, hedge=hedge)
 
-    async def _generate_summary_gemini(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
-        if not self.gemini_model:
-            return {"content": "Gemini API key not configured"}
-        
-        prompt = f"Summarize the following text concisely:\n\n{parameters.get('text')}"
-        
-        try:
-            response = await self.gemini_model.generate_content(prompt)
-            return {"content": response.text}
-        except Exception as e:
-            return {"content": f"Error generating summary: {str(e)}"}
+    async def generate_content(self, content_type: str, parameters: Dict[str, Any], provider: str = "openai", use_cache: bool = True) -> Dict[str, Any]:
+        """Generate content using AI.
 
-    async def _generate_flashcards_openai(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
-        if not self.openai_client:
-            return {"content": "OpenAI API key not configured"}
-        
-        prompt = f"Generate {parameters.get('num_cards', 5)} flashcards about {parameters.get('topic')}. Format as JSON array with front and back fields."
-        
+        Results are cached by prompt hash. ``use_cache=False`` skips the lookup
+        and refreshes the cached entry with the new result. Concurrent identical
+        requests share a single provider call.
+        """
         try:
-            response = await self.openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": prompt}]
+            prompt = self._get_prompt(content_type, parameters)
+            cache_key = self.cache.make_key(content_type, prompt, provider)
+            key = f"content:{cache_key}" if use_cache else f"content-refresh:{cache_key}"
+            expected_items = parameters.get("num_questions", 3) if content_type == "quiz" else None
+            return await self.single_flight.do(
+                key,
+                lambda: self._generate_content(content_type, prompt, provider, cache_key, use_cache, expected_items),
             )
-            return {"content": response.choices[0].message.content}
         except Exception as e:
-            return {"content": f"Error generating flashcards: {str(e)}"}
+            logger.error(f"Content generation error: {str(e)}")
+            raise HTTPException(
+                status_code=500,
+                detail=f"Error generating content: {str(e)}"
+            )
 
-    async def _generate_flashcards_gemini(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
-        if not self.gemini_model:
-            return {"content": "Gemini API key not configured"}
-        
-        prompt = f"Generate {parameters.get('num_cards', 5)} flashcards about {parameters.get('topic')}. Format as JSON array with front and back fields."
-        
-        try:
-            response = await self.gemini_model.generate_content(prompt)
-            return {"content": response.text}
-        except Exception as e:
-            return {"content": f"Error generating flashcards: {str(e)}"}
+    async def _generate_content(self, content_type: str, prompt: str, provider: str, cache_key: str, use_cache: bool, expected_items: Optional[int] = None) -> Dict[str, Any]:
+        if use_cache:
+            cached = await asyncio.to_thread(self.cache.get, cache_key, content_type)
+            if cached is not None:
+                return cached
 
-    async def _generate_youtube_suggestions_openai(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
-        if not self.openai_client:
-            return {"content": "OpenAI API key not configured"}
-        
-        prompt = f"Suggest {parameters.get('num_suggestions', 5)} YouTube videos about {parameters.get('topic')}. Format as JSON array with title and url fields."
-        
-        try:
-            response = await self.openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": prompt}]
-            )
-            return {"content": response.choices[0].message.content}
-        except Exception as e:
-            return {"content": f"Error generating YouTube suggestions: {str(e)}"}
+        async def complete(text: str) -> str:
+            return await self._complete(text, provider, temperature=0.7, max_tokens=1000)
 
-    async def _generate_youtube_suggestions_gemini(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
-        if not self.gemini_model:
-            return {"content": "Gemini API key not configured"}
-        
-        prompt = f"Suggest {parameters.get('num_suggestions', 5)} YouTube videos about {parameters.get('topic')}. Format as JSON array with title and url fields."
-        
-        try:
-            response = await self.gemini_model.generate_content(prompt)
-            return {"content": response.text}
-        except Exception as e:
-            return {"content": f"Error generating YouTube suggestions: {str(e)}"}
+        if content_type == "quiz":
+            # Missing or broken questions are requested on their own instead of a new quiz
+            response = await structured_output.generate("quiz", prompt, complete, expected_items=expected_items)
+        else:
+            response = await complete(prompt)
+        result = self._parse_response(response, content_type)
+        await asyncio.to_thread(self.cache.set, cache_key, content_type, result, provider)
+        return result
 
     async def extract_youtube_transcript(self, video_url: str) -> Dict[str, str]:
         """Extract transcript and metadata from a YouTube video."""
         try:
-            ydl_opts = {
-                'quiet': True,
-                'no_warnings': True,
-                'extract_flat': True
+            # yt-dlp does blocking network I/O, so keep it off the event loop
+            info = await asyncio.to_thread(self._extract_youtube_info, video_url)
+            return {
+                "transcript": "",  # You'll need to implement actual transcript extraction
+                "title": info.get('title', ''),
+                "description": info.get('description', ''),
+                "duration": str(info.get('duration', 0)),
+                "thumbnail": info.get('thumbnail', '')
             }
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(video_url, download=False)
-                return {
-                    "transcript": "",  # You'll need to implement actual transcript extraction
-                    "title": info.get('title', ''),
-                    "description": info.get('description', ''),
-                    "duration": str(info.get('duration', 0)),
-                    "thumbnail": info.get('thumbnail', '')
-                }
         except Exception as e:
             return {
                 "error": str(e),
@@ -243,6 +289,16 @@ class ContentGenerator:
                 "thumbnail": ""
             }
 
+    @staticmethod
+    def _extract_youtube_info(video_url: str) -> Dict[str, Any]:
+        ydl_opts = {
+            'quiet': True,
+            'no_warnings': True,
+            'extract_flat': True
+        }
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            return ydl.extract_info(video_url, download=False)
+
     async def generate_course_content(self, prompt: str) -> Dict[str, Any]:
         """Generate course content using AI."""
         ai_prompt = f"""Given the following course idea or topic, generate a comprehensive course structure. 
@@ -256,28 +312,10 @@ class ContentGenerator:
         Prompt: {prompt}"""
         
         try:
-            # Try Gemini first
-            if self.gemini_model:
-                response = await self.gemini_model.generate_content(ai_prompt)
-                content = response.text
-                if content.startswith("```json"):
-                    content = content[7:]
-                if content.endswith("```"):
-                    content = content[:-3]
-                content = content.strip()
-                start = content.find("{")
-                end = content.rfind("}") + 1
-                if start >= 0 and end > start:
-                    content = content[start:end]
-                return {"content": content}
-            
-            # Fall back to OpenAI
-            elif self.openai_client:
-                response = await self.openai_client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[{"role": "user", "content": ai_prompt}]
-                )
-                return {"content": response.choices[0].message.content}
+            # Try Gemini first, then fall back to OpenAI
+            if self.providers:
+                content = await self._complete(ai_prompt, "gemini")
+                return {"content": json.dumps(structured_output.parse(content, "course").data)}
             
             # Default response if no AI provider is configured
             return {"content": json.dumps({
@@ -294,6 +332,13 @@ class ContentGenerator:
 
     def _get_prompt(self, content_type: str, params: Dict[str, Any]) -> str:
         """Construct the prompt for generating content."""
+        prompt = self._get_task_prompt(content_type, params)
+        context = params.get("context")
+        if context and not (content_type == "summary" and not params.get("text")):
+            prompt = f"Base your answer on the following course material:\n\n{context}\n\n{prompt}"
+        return prompt
+
+    def _get_task_prompt(self, content_type: str, params: Dict[str, Any]) -> str:
         if content_type == "quiz":
             return f"""Generate a {params.get('difficulty', 'beginner')} level quiz about {params.get('topic')} with {params.get('num_questions', 3)} questions.
             Include a mix of {', '.join(params.get('question_types', ['multiple_choice']))} questions.
@@ -312,7 +357,7 @@ class ContentGenerator:
             }}
             Ensure the response is valid JSON and follows this exact structure."""
         elif content_type == "summary":
-            return f"Summarize the following text concisely:\n\n{params.get('text')}"
+            return f"Summarize the following text concisely:\n\n{params.get('text') or params.get('context')}"
         elif content_type == "flashcard":
             return f"Generate {params.get('num_cards', 5)} flashcards about {params.get('topic')}. Format as JSON array with front and back fields."
         elif content_type == "youtube_suggestions":
@@ -320,12 +365,12 @@ class ContentGenerator:
         else:
             raise ValueError(f"Unsupported content type: {content_type}")
 
-    def _parse_response(self, response: str, content_type: str) -> Dict[str, Any]:
+    def _parse_response(self, response: Any, content_type: str) -> Dict[str, Any]:
         """Parse the response from the AI and return the content."""
         try:
             if content_type == "quiz":
-                # Parse the JSON response
-                quiz_data = json.loads(response)
+                # Quizzes usually arrive already validated by structured_output
+                quiz_data = response if isinstance(response, dict) else structured_output.parse(response, "quiz").data
                 return {
                     "title": quiz_data.get("title", "Generated Quiz"),
                     "content": json.dumps(quiz_data),  # Store the full quiz data as JSON string
@@ -334,7 +379,7 @@ class ContentGenerator:
                     "meta": {
                         "questions": quiz_data.get("questions", []),
                         "num_questions": len(quiz_data.get("questions", [])),
-                        "difficulty": quiz_data.get("difficulty", "beginner")
+                        "difficulty": quiz_data.get("difficulty") or "beginner"
                     }
                 }
             elif content_type == "summary":
@@ -345,14 +390,14 @@ class ContentGenerator:
                 return {"content": response}
             else:
                 raise ValueError(f"Unsupported content type: {content_type}")
-        except json.JSONDecodeError as e:
+        except StructuredOutputError as e:
             logger.error(f"Failed to parse AI response as JSON: {str(e)}")
             raise HTTPException(
                 status_code=500,
                 detail=f"Invalid response format from AI: {str(e)}"
             )
 
-    def generate_learning_path_outline(self, course_title: str, course_description: str) -> dict:
+    async def generate_learning_path_outline(self, course_title: str, course_description: str) -> dict:
         """
         Generate a learning path outline with detailed structure for each chapter.
         Returns a dict containing materialTitle, materialDescription, progress, and chapters array.
@@ -369,28 +414,12 @@ class ContentGenerator:
         )
 
         try:
-            # Try Gemini first
-            if self.gemini_model:
-                response = self.gemini_model.generate_content(prompt)
-                content = response.text
-                if content.startswith("```json"):
-                    content = content[7:]
-                if content.endswith("```"):
-                    content = content[:-3]
-                content = content.strip()
-                start = content.find("{")
-                end = content.rfind("}") + 1
-                if start >= 0 and end > start:
-                    content = content[start:end]
-                return json.loads(content)
-            
-            # Fall back to OpenAI if Gemini fails or isn't available
-            if self.openai_client:
-                response = self.openai_client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[{"role": "user", "content": prompt}]
+            # Try Gemini first, then fall back to OpenAI
+            if self.providers:
+                return await self.single_flight.do(
+                    f"outline:{flight_key(course_title, course_description)}",
+                    lambda: self._generate_outline(prompt),
                 )
-                return json.loads(response.choices[0].message.content)
             
             # Default response if no AI provider is configured
             return {
@@ -420,122 +449,215 @@ class ContentGenerator:
                 detail=f"Error generating learning path outline: {str(e)}"
             )
 
+    async def _generate_outline(self, prompt: str) -> dict:
+        return await structured_output.generate("outline", prompt, lambda text: self._complete(text, "gemini"))
+
+    @staticmethod
+    def split_outline(outline: str) -> List[Dict[str, str]]:
+        """Split an outline into chapters.
+
+        A chapter starts at an unindented heading such as "Chapter 2: ...",
+        "## Basics" or "3. Loops"; bullets and indented lines belong to the
+        chapter above them. Text before the first heading is ignored, and an
+        outline without headings is a single chapter.
+        """
+        chapters: List[Dict[str, str]] = []
+        for line in outline.splitlines():
+            stripped = line.strip()
+            if not stripped:
+                continue
+            if line == line.lstrip() and CHAPTER_HEADING.match(stripped):
+                chapters.append({"title": stripped.lstrip("#").strip(), "body": ""})
+            elif chapters:
+                chapters[-1]["body"] += stripped + "\n"
+        if not chapters and outline.strip():
+            return [{"title": "Course Content", "body": outline.strip()}]
+        return chapters
+
+    def _chapter_prompt(self, chapter: Dict[str, str], titles: List[str]) -> str:
+        return f"""Generate comprehensive educational content for one chapter of a course.
+        The course chapters are: {"; ".join(titles)}.
+        Write only the chapter below, with detailed explanations, examples, and key points.
+        IMPORTANT: Your response must be a valid JSON object with no extra text before or after.
+        Format the response as a JSON object with the following structure:
+        {{
+            "title": "Chapter Title",
+            "sections": [
+                {{
+                    "title": "Section Title",
+                    "content": "Detailed content with explanations and examples",
+                    "key_points": ["Key point 1", "Key point 2", ...],
+                    "examples": ["Example 1", "Example 2", ...]
+                }}
+            ]
+        }}
+
+        Chapter: {chapter["title"]}
+        {chapter["body"]}"""
+
+    async def _generate_chapter(self, chapter: Dict[str, str], titles: List[str], provider: str) -> Dict[str, Any]:
+        # generate_from_outline retries failed chapters itself
+        data = await structured_output.generate(
+            "chapter",
+            self._chapter_prompt(chapter, titles),
+            lambda text: self._complete(text, provider),
+            max_retries=0,
+        )
+        data["title"] = data["title"] or chapter["title"]
+        return data
+
+    async def generate_from_outline(
+        self,
+        outline: str,
+        provider: str = "gemini",
+        progress: Optional[Callable[[int, int], Awaitable[None]]] = None,
+    ) -> Dict[str, Any]:
+        """Generate course content chapter by chapter.
+
+        Chapters are generated concurrently (at most OUTLINE_CHAPTER_CONCURRENCY
+        at a time), and only the chapters that failed are retried. Chapters
+        that still fail are returned with an ``error`` and listed in
+        ``failed_chapters`` instead of failing the whole request.
+        ``progress(done, total)`` is awaited after each generated chapter.
+        """
+        chapters = self.split_outline(outline)
+        if not chapters:
+            raise HTTPException(status_code=400, detail="Outline is empty")
+        titles = [chapter["title"] for chapter in chapters]
+        semaphore = asyncio.Semaphore(settings.OUTLINE_CHAPTER_CONCURRENCY)
+        done = 0
+
+        async def generate(chapter: Dict[str, str]) -> Dict[str, Any]:
+            nonlocal done
+            async with semaphore:
+                result = await self._generate_chapter(chapter, titles, provider)
+            done += 1
+            if progress is not None:
+                await progress(done, len(chapters))
+            return result
+
+        results: List[Any] = [None] * len(chapters)
+        pending = list(range(len(chapters)))
+        for attempt in range(1 + settings.OUTLINE_CHAPTER_RETRIES):
+            outcomes = await asyncio.gather(
+                *(generate(chapters[i]) for i in pending), return_exceptions=True
+            )
+            failed = []
+            for i, outcome in zip(pending, outcomes):
+                results[i] = outcome
+                if isinstance(outcome, Exception):
+                    logger.warning(f"Chapter '{titles[i]}' failed on attempt {attempt + 1}: {str(outcome)}")
+                    failed.append(i)
+            pending = failed
+            if not pending:
+                break
+
+        if len(pending) == len(chapters):
+            raise HTTPException(status_code=500, detail=f"Error generating content: {str(results[0])}")
+        return {
+            "chapters": [
+                {"title": titles[i], "sections": [], "error": str(result)} if isinstance(result, Exception) else result
+                for i, result in enumerate(results)
+            ],
+            "failed_chapters": [titles[i] for i in pending]
+        }
+
     async def generate_chat_response(self, course_id: str, prompt: str, history: Optional[List[Dict[str, str]]] = None, provider: str = "openai") -> Dict[str, Any]:
         """Generate a chat response based on course content and chat history."""
-        try:
-            # Get course content for context
-            course_content = await self._get_course_content(course_id)
-            if not course_content:
-                raise HTTPException(status_code=404, detail="Course content not found")
+        history = [msg if isinstance(msg, dict) else msg.dict() for msg in history or []]
+        return await self.single_flight.do(
+            f"chat:{flight_key(course_id, prompt, history, provider)}",
+            lambda: self._generate_chat_response(course_id, prompt, history, provider),
+        )
 
-            # Prepare messages for chat
-            messages = []
-            
-            # Add system message with course context
-            system_message = {
-                "role": "system",
-                "content": f"You are an AI tutor for this course. Use the following course content as context for your responses:\n\n{course_content}"
-            }
-            messages.append(system_message)
+    async def _build_chat_messages(self, course_id: str, prompt: str, history: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        # Get the course content relevant to the question
+        course_content = await self._get_course_content(course_id, prompt)
+        if not course_content:
+            raise HTTPException(status_code=404, detail="Course content not found")
 
-            # Add chat history if provided
-            if history:
-                messages.extend(history)
+        # Add system message with course context
+        messages = [{
+            "role": "system",
+            "content": f"You are an AI tutor for this course. Use the following course content as context for your responses:\n\n{course_content}"
+        }]
 
-            # Add user's current prompt
-            messages.append({"role": "user", "content": prompt})
+        # Add chat history if provided
+        messages.extend(history)
 
-            # Generate response using selected provider
-            if provider == "gemini" and self.gemini_model:
-                try:
-                    response = await self._generate_chat_with_gemini(messages)
-                    return {"response": response, "history": messages + [{"role": "assistant", "content": response}]}
-                except Exception as e:
-                    logger.warning(f"Gemini chat generation failed, falling back to OpenAI: {str(e)}")
+        # Add user's current prompt
+        messages.append({"role": "user", "content": prompt})
+        return messages
 
-            # Fall back to OpenAI
-            if self.openai_client:
-                response = await self._generate_chat_with_openai(messages)
-                return {"response": response, "history": messages + [{"role": "assistant", "content": response}]}
+    async def _generate_chat_response(self, course_id: str, prompt: str, history: List[Dict[str, str]], provider: str) -> Dict[str, Any]:
+        try:
+            messages = await self._build_chat_messages(course_id, prompt, history)
 
-            raise HTTPException(status_code=500, detail="No AI provider configured")
+            # Interactive: hedge with the next provider when the first is slow
+            response = await self.router.call(
+                lambda ai_provider: ai_provider.chat(messages, temperature=0.7, max_tokens=1000),
+                provider,
+                hedge=settings.AI_HEDGE_CHAT
+            )
+            return {"response": response, "history": messages + [{"role": "assistant", "content": response}]}
 
         except Exception as e:
             logger.error(f"Chat generation error: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Error generating chat response: {str(e)}")
 
-    async def _get_course_content(self, course_id: str) -> str:
-        """Get all content associated with a course."""
+    async def stream_chat_response(self, course_id: str, prompt: str, history: Optional[List[Dict[str, str]]] = None, provider: str = "openai") -> AsyncIterator[str]:
+        """Stream a course chat response chunk by chunk.
+
+        Falls back to the next provider only while nothing has been sent yet;
+        a failure mid-stream is raised to the caller.
+        """
+        history = [msg if isinstance(msg, dict) else msg.dict() for msg in history or []]
+        messages = await self._build_chat_messages(course_id, prompt, history)
+
+        if not self.providers:
+            raise HTTPException(status_code=500, detail="No AI provider configured")
+        last_error: Optional[Exception] = None
+        for name in self.router.order(provider):
+            started = False
+            self.router.begin(name)
+            try:
+                async for chunk in self.providers[name].stream_chat(messages, temperature=0.7, max_tokens=1000):
+                    started = True
+                    yield chunk
+            except Exception as e:
+                self.router.record_failure(name)
+                if started:
+                    raise
+                logger.warning(f"{name} chat streaming failed: {str(e)}")
+                last_error = e
+                continue
+            except BaseException:
+                # Client went away: neither a success nor a provider failure
+                self.router.release(name)
+                raise
+            self.router.record_success(name)
+            return
+
+        if last_error is not None:
+            raise last_error
+        raise HTTPException(status_code=503, detail="All AI providers are temporarily unavailable")
+
+    async def _get_course_content(self, course_id: str, query: Optional[str] = None) -> str:
+        """Get course context, limited to the chunks most relevant to ``query``."""
+        return await asyncio.to_thread(self._load_course_content, course_id, query)
+
+    def _load_course_content(self, course_id: str, query: Optional[str]) -> str:
         db = SessionLocal()
         try:
-            # Get all content for the course
-            contents = crud_content.get_by_course(db=db, course_id=course_id)
-            
-            if not contents:
-                # If no content found, try to get course metadata
-                from app.crud.crud_course import crud_course
-                course = crud_course.get(db=db, id=course_id)
-                if course:
-                    return f"Course Title: {course.title}\nSub Title: {course.sub_title}\nDescription: {course.description}"
-                return "No course content or metadata found."
-            
-            # Combine all content into a single string
-            content_parts = []
-            for content in contents:
-                if content.content_type == ContentType.TEXT:
-                    content_parts.append(f"Title: {content.title}\nContent: {content.content}")
-                elif content.content_type == ContentType.VIDEO:
-                    transcript = content.meta.get("transcript") if content.meta else None
-                    if transcript:
-                        content_parts.append(f"Title: {content.title}\nTranscript: {transcript}")
-                elif content.content_type == ContentType.FILE:
-                    # Skip files as they might not be text-based
-                    continue
-
-            return "\n\n".join(content_parts)
+            # Small courses fit in the prompt as a whole: reuse the cached snapshot
+            snapshot = course_contexts.get(db, course_id)
+            if snapshot.words <= settings.RETRIEVAL_TOP_K * settings.RETRIEVAL_CHUNK_WORDS:
+                return snapshot.text
+
+            chunks = course_index.search(db, course_id, query or "")
+            if chunks:
+                return course_index.format_chunks(chunks)
+            # Course content that predates the chunk index
+            return snapshot.text
         finally:
             db.close()
-
-    async def _generate_chat_with_openai(self, messages: List[Dict[str, str]]) -> str:
-        """Generate chat response using OpenAI."""
-        if not self.openai_client:
-            raise HTTPException(
-                status_code=500,
-                detail="OpenAI client not initialized"
-            )
-
-        try:
-            response = self.openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=messages,
-                temperature=0.7,
-                max_tokens=1000
-            )
-            return response.choices[0].message.content
-        except Exception as e:
-            logger.error(f"OpenAI chat generation error: {str(e)}")
-            raise HTTPException(
-                status_code=500,
-                detail=f"Error generating chat response with OpenAI: {str(e)}"
-            )
-
-    async def _generate_chat_with_gemini(self, messages: List[Dict[str, str]]) -> str:
-        """Generate chat response using Gemini."""
-        try:
-            # Convert messages to Gemini format
-            chat = self.gemini_model.start_chat(history=[])
-            for msg in messages:
-                if msg["role"] == "user":
-                    chat.send_message(msg["content"])
-                elif msg["role"] == "assistant":
-                    # Add assistant's response to history
-                    pass
-
-            response = chat.send_message(messages[-1]["content"])
-            return response.text
-        except Exception as e:
-            logger.error(f"Gemini chat generation error: {str(e)}")
-            raise HTTPException(
-                status_code=500,
-                detail=f"Error generating chat response with Gemini: {str(e)}"
-            )
\ No newline at end of file
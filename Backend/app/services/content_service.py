@@ -1,176 +1,292 @@
+import asyncio
 from typing import Optional, Dict, Any, List
-from sqlalchemy.orm import Session
-from app.crud.crud_content import crud_content
-from app.schemas.content import ContentCreate, ContentUpdate, ContentResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.crud.crud_content import crud_content_async
+from app.crud.crud_content_batch import crud_content_batch_async
+from app.schemas.content import ContentBatchCreate, ContentCreate, ContentUpdate, ContentResponse
 from app.models.content import Content as ContentModel
+from app.models.content_batch import ContentBatch
 from app.models.enums import ContentType
+from app.services.blob_store import BlobTooLarge, blob_store
+from app.services.text_extraction import submit_extraction
 from fastapi import HTTPException
 import json
-import base64
 from datetime import datetime
 
+GENERATED_CONTENT_TYPES = {
+    "QUIZ", "SUMMARY", "FLASHCARD", "YOUTUBE_SUGGESTIONS",
+    "COURSE", "EXERCISES", "CODE_EXAMPLES", "LEARNING_PATH",
+}
+
+# Uploads of one batch request streamed to the blob store at the same time
+UPLOAD_CONCURRENCY = 8
+
+STORED_CONTENT_TYPES = {
+    "TEXT": ContentType.TEXT,
+    "VIDEO": ContentType.VIDEO,
+    "FILE": ContentType.FILE,
+}
+
+async def store_file(
+    file: Any,
+    *,
+    title: Optional[str] = None,
+    description: Optional[str] = None,
+    course_id: Optional[str] = None,
+    meta: Optional[Dict[str, Any]] = None,
+) -> ContentCreate:
+    """Stream an upload into the blob store and describe it as FILE content.
+
+    ``content`` only holds the filename; the bytes are referenced by
+    ``blob_sha256`` and served by the download endpoint.
+    """
+    try:
+        blob = await blob_store.put(file)
+    except BlobTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    return ContentCreate(
+        title=title or file.filename,
+        content_type=ContentType.FILE,
+        content=file.filename,
+        description=description,
+        course_id=course_id,
+        blob_sha256=blob.sha256,
+        meta={
+            **(meta or {}),
+            "filename": file.filename,
+            "content_type": file.content_type,
+            "size": blob.size,
+        },
+    )
+
+async def store_files(files: List[Any], **fields: Any) -> List[ContentCreate]:
+    """``store_file`` for several uploads at once, in input order.
+
+    Up to ``UPLOAD_CONCURRENCY`` files are hashed and written concurrently.
+    """
+    limit = asyncio.Semaphore(UPLOAD_CONCURRENCY)
+
+    async def store(file: Any) -> ContentCreate:
+        async with limit:
+            return await store_file(file, description=f"Uploaded file: {file.filename}", **fields)
+
+    return list(await asyncio.gather(*(store(file) for file in files)))
+
 class ContentService:
-    async def create_content(self, content: ContentCreate, user_id: str) -> ContentResponse:
+    """Content operations on the request's session.
+
+    Each public method is one unit of work: it reads and writes through the
+    ``db`` it is given and commits at most once.
+    """
+    def __init__(self, generator=None):
+        self._generator = generator
+
+    @property
+    def generator(self):
+        if self._generator is None:
+            from app.services.content_generator import ContentGenerator
+            self._generator = ContentGenerator()
+        return self._generator
+
+    async def generate_and_store(
+        self,
+        db: AsyncSession,
+        content_type: str,
+        parameters: Dict[str, Any],
+        user_id: str,
+        provider: str = "openai",
+        use_cache: bool = True,
+        title: Optional[str] = None,
+        description: Optional[str] = None,
+        course_id: Optional[str] = None,
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> ContentResponse:
+        """Generate AI content with a single provider call and persist it."""
+        generated_data = await self.generator.generate_content(
+            content_type=content_type.lower(),
+            parameters=parameters,
+            provider=provider,
+            use_cache=use_cache
+        )
+        return await self.store_generated_content(
+            db,
+            content_type=content_type,
+            generated_data=generated_data,
+            user_id=user_id,
+            title=title,
+            description=description,
+            course_id=course_id,
+            meta={
+                **(meta or {}),
+                "generator": provider,
+                "parameters": parameters,
+                "generated_at": datetime.utcnow().isoformat()
+            }
+        )
+
+    async def store_generated_content(
+        self,
+        db: AsyncSession,
+        content_type: str,
+        generated_data: Dict[str, Any],
+        user_id: str,
+        title: Optional[str] = None,
+        description: Optional[str] = None,
+        course_id: Optional[str] = None,
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> ContentResponse:
+        """Persist an already generated payload in one transaction."""
+        content_type = content_type.upper()
+        meta = meta or {}
+        topic = meta.get("parameters", {}).get("topic", "general topic")
+        if content_type == "QUIZ":
+            generated_meta = generated_data.get("meta", {})
+            obj_in = ContentCreate(
+                title=title or generated_data.get("title", "Generated Quiz"),
+                content_type=ContentType.QUIZ,
+                content=generated_data.get("content", "{}"),
+                description=description or generated_data.get("description", f"AI-generated quiz about {topic}"),
+                course_id=course_id,
+                meta={
+                    **meta,
+                    "questions": generated_meta.get("questions", []),
+                    "num_questions": generated_meta.get("num_questions", 0),
+                    "difficulty": generated_meta.get("difficulty", "beginner")
+                }
+            )
+        else:
+            # For other AI-generated content, store as TEXT
+            obj_in = ContentCreate(
+                title=title or f"Generated {content_type.title()}",
+                content_type=ContentType.TEXT,
+                content=generated_data.get("content", ""),
+                description=description or f"AI-generated {content_type.lower()} about {topic}",
+                course_id=course_id,
+                meta={
+                    **meta,
+                    "generated_type": content_type,
+                    "generated_data": generated_data
+                }
+            )
+        db_content = await crud_content_async.create_typed(db, obj_in=obj_in, user_id=user_id)
+        return ContentResponse.from_orm(db_content)
+
+    async def create_content(self, db: AsyncSession, content: ContentCreate, user_id: str) -> ContentResponse:
         """Create new content."""
         try:
-            from app.services.content_generator import ContentGenerator
-            generator = ContentGenerator()
-            
             # Handle AI-generated content types
-            if content.content_type in ["QUIZ", "SUMMARY", "FLASHCARD", "YOUTUBE_SUGGESTIONS", 
-                                      "COURSE", "EXERCISES", "CODE_EXAMPLES", "LEARNING_PATH"]:
-                # Generate content using AI
-                generated_data = await generator.generate_content(
-                    content_type=content.content_type.lower(),
-                    parameters=content.meta.get("parameters", {}),
-                    provider=content.meta.get("generator", "openai")
+            if content.content_type in GENERATED_CONTENT_TYPES:
+                meta = content.meta or {}
+                return await self.generate_and_store(
+                    db,
+                    content_type=content.content_type,
+                    parameters=meta.get("parameters", {}),
+                    user_id=user_id,
+                    provider=meta.get("generator", "openai"),
+                    title=content.title,
+                    description=content.description,
+                    course_id=content.course_id,
+                    meta=meta
                 )
-                
-                # Create content in database based on type
-                if content.content_type == "QUIZ":
-                    parameters = {
-                        **(content.meta or {}),
-                        "title": generated_data.get("title", "Generated Quiz"),
-                        "content": generated_data.get("content", "{}"),
-                        "description": generated_data.get("description", "AI-generated quiz"),
-                        "questions": generated_data.get("meta", {}).get("questions", []),
-                        "num_questions": generated_data.get("meta", {}).get("num_questions", 0),
-                        "difficulty": generated_data.get("meta", {}).get("difficulty", "beginner")
-                    }
-                    db_content = crud_content.create_quiz(
-                        db=self.get_db(),
-                        parameters=parameters,
-                        user_id=user_id
-                    )
-                else:
-                    # For other AI-generated content, store as TEXT
-                    db_content = crud_content.create_text(
-                        db=self.get_db(),
-                        obj_in=ContentCreate(
-                            title=content.title or f"Generated {content.content_type.title()}",
-                            content_type="TEXT",
-                            content=generated_data.get("content", ""),
-                            description=content.description or f"AI-generated {content.content_type.lower()}",
-                            meta={
-                                **(content.meta or {}),
-                                "generated_type": content.content_type,
-                                "generated_data": generated_data
-                            }
-                        ),
-                        user_id=user_id
-                    )
             else:
-                # Use the appropriate create method based on content type
-                if content.content_type == "TEXT":
-                    db_content = crud_content.create_text(
-                        db=self.get_db(),
-                        obj_in=content,
-                        user_id=user_id
-                    )
-                elif content.content_type == "VIDEO":
-                    db_content = crud_content.create_video(
-                        db=self.get_db(),
-                        obj_in=content,
-                        user_id=user_id
-                    )
-                elif content.content_type == "FILE":
-                    db_content = crud_content.create_file(
-                        db=self.get_db(),
-                        obj_in=content,
-                        user_id=user_id
-                    )
-                else:
+                # Store with the type matching the content
+                if content.content_type not in STORED_CONTENT_TYPES:
                     raise HTTPException(
                         status_code=400,
                         detail=f"Unsupported content type: {content.content_type}"
                     )
+                db_content = await crud_content_async.create_typed(
+                    db,
+                    obj_in=content,
+                    user_id=user_id,
+                    content_type=STORED_CONTENT_TYPES[content.content_type]
+                )
             
             return ContentResponse.from_orm(db_content)
         except Exception as e:
             raise HTTPException(status_code=400, detail=str(e))
 
-    async def get_content(self, content_id: str) -> ContentResponse:
+    async def get_content(self, db: AsyncSession, content_id: str) -> ContentResponse:
         """Get content by ID."""
-        content = crud_content.get(db=self.get_db(), id=content_id)
+        content = await crud_content_async.get(db, content_id)
         if not content:
             raise HTTPException(status_code=404, detail="Content not found")
         return ContentResponse.from_orm(content)
 
-    async def update_content(self, content_id: str, content: ContentUpdate) -> ContentResponse:
+    async def update_content(self, db: AsyncSession, content_id: str, content: ContentUpdate) -> ContentResponse:
         """Update existing content."""
-        db_content = crud_content.get(db=self.get_db(), id=content_id)
+        db_content = await crud_content_async.get(db, content_id)
         if not db_content:
             raise HTTPException(status_code=404, detail="Content not found")
         
-        updated_content = crud_content.update(
-            db=self.get_db(),
-            db_obj=db_content,
-            obj_in=content
-        )
+        updated_content = await crud_content_async.update(db, db_obj=db_content, obj_in=content)
         return ContentResponse.from_orm(updated_content)
 
-    async def delete_content(self, content_id: str) -> bool:
+    async def delete_content(self, db: AsyncSession, content_id: str) -> bool:
         """Delete content."""
-        content = crud_content.get(db=self.get_db(), id=content_id)
+        content = await crud_content_async.get(db, content_id)
         if not content:
             raise HTTPException(status_code=404, detail="Content not found")
         
-        crud_content.remove(db=self.get_db(), id=content_id)
+        await crud_content_async.remove(db, db_obj=content)
         return True
 
-    async def get_batch(self, batch_id: str) -> Dict[str, Any]:
+    async def create_batch(
+        self,
+        db: AsyncSession,
+        files: List[Any],
+        user_id: str,
+        batch: Optional[ContentBatchCreate] = None,
+        course_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Store several uploads as a new batch, all rows in one commit."""
+        contents = await store_files(files, course_id=course_id)
+        db_batch = crud_content_batch_async.add(db, obj_in=batch or ContentBatchCreate(), user_id=user_id)
+        added = await self._add_to_batch(db, db_batch, contents)
+        return {
+            "batch_id": db_batch.id,
+            "name": db_batch.name,
+            "description": db_batch.description,
+            "files": [ContentResponse.from_orm(content) for content in added]
+        }
+
+    async def get_batch(self, db: AsyncSession, batch_id: str, user_id: Optional[str] = None) -> Dict[str, Any]:
         """Get files in a batch."""
-        files = crud_content.get_by_batch(db=self.get_db(), batch_id=batch_id)
-        if not files:
+        batch = await crud_content_batch_async.get_owned(db, batch_id, user_id)
+        if not batch:
             raise HTTPException(status_code=404, detail="Batch not found")
-        
+        files = await crud_content_async.get_by_batch(db, batch_id)
+
         return {
             "batch_id": batch_id,
+            "name": batch.name,
+            "description": batch.description,
             "files": [ContentResponse.from_orm(file) for file in files]
         }
 
-    async def add_files_to_batch(self, batch_id: str, files: List[Any]) -> Dict[str, Any]:
+    async def add_files_to_batch(
+        self, db: AsyncSession, batch_id: str, files: List[Any], user_id: Optional[str] = None
+    ) -> Dict[str, Any]:
         """Add files to an existing batch."""
-        # Verify batch exists
-        existing_files = crud_content.get_by_batch(db=self.get_db(), batch_id=batch_id)
-        if not existing_files:
+        batch = await crud_content_batch_async.get_owned(db, batch_id, user_id)
+        if not batch:
             raise HTTPException(status_code=404, detail="Batch not found")
-        
-        uploaded_contents = []
-        for file in files:
-            content = await file.read()
-            content_b64 = base64.b64encode(content).decode('utf-8')
-            
-            content_obj = ContentCreate(
-                title=file.filename,
-                content_type=ContentType.FILE,
-                content=content_b64,
-                meta={
-                    "filename": file.filename,
-                    "content_type": file.content_type,
-                    "size": len(content),
-                    "batch_id": batch_id
-                },
-                description=f"Uploaded file: {file.filename}"
-            )
-            
-            content = crud_content.create_file(
-                db=self.get_db(),
-                obj_in=content_obj,
-                user_id=existing_files[0].created_by
-            )
-            uploaded_contents.append(ContentResponse.from_orm(content))
-        
+
+        contents = await store_files(files)
+        batch.updated_at = datetime.utcnow()
+        added = await self._add_to_batch(db, batch, contents)
         return {
             "batch_id": batch_id,
-            "added_files": uploaded_contents
+            "added_files": [ContentResponse.from_orm(content) for content in added]
         }
 
-    def get_db(self) -> Session:
-        """Get database session."""
-        from app.db.session import SessionLocal
-        db = SessionLocal()
-        try:
-            return db
-        finally:
-            db.close() 
\ No newline at end of file
+    async def _add_to_batch(self, db: AsyncSession, batch: ContentBatch, contents: List[ContentCreate]) -> List[ContentModel]:
+        # One executemany for the rows; rows, batch and extraction job land in one commit
+        now = datetime.utcnow()
+        added = await crud_content_async.create_many(
+            db, objs_in=contents, commit=False,
+            batch_id=batch.id, created_by=batch.created_by, created_at=now, updated_at=now
+        )
+        await db.run_sync(submit_extraction, added, batch.created_by, False)
+        await db.commit()
+        return added
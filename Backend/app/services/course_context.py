@@ -0,0 +1,180 @@
+"""Cached, versioned course-context snapshots.
+
+Each course has a version number that is bumped after any commit touching
+its content rows or the course itself. Snapshots remember the version they
+were built from, so a chat turn reuses the precomputed context string until
+the course changes (or the TTL expires) instead of querying every content
+row and rebuilding the string.
+
+Invalidation hangs off ORM events rather than individual CRUD functions, so
+``crud_content`` create/update/remove, the course content add/remove
+endpoints and any other session write are all covered. Versions are only
+bumped once the transaction has committed; a snapshot built concurrently
+from the old data is discarded instead of cached.
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Set
+from sqlalchemy import case, event, inspect
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.content import Content
+from app.models.course import Course
+from app.models.enums import ContentType
+from app.models.extracted_text import ExtractedText
+
+CONTEXT_CONTENT_TYPES = (ContentType.TEXT.value, ContentType.VIDEO.value, ContentType.FILE.value)
+
+@dataclass(frozen=True)
+class CourseSnapshot:
+    course_id: str
+    version: int
+    text: str
+    words: int
+    built_at: float
+
+def build_course_context(db: Session, course_id: str) -> str:
+    """Concatenate the course's text bodies, video transcripts and file texts."""
+    # Files contribute their extracted text; their own body (a filename, or
+    # base64 for legacy uploads) is never loaded
+    body = case(
+        (Content.content_type == ContentType.FILE.value, ExtractedText.text),
+        else_=Content.content
+    )
+    rows = db.query(Content.title, Content.content_type, body, Content.meta)\
+        .outerjoin(ExtractedText, ExtractedText.sha256 == Content.blob_sha256)\
+        .filter(Content.course_id == course_id, Content.content_type.in_(CONTEXT_CONTENT_TYPES))\
+        .order_by(Content.created_at)\
+        .all()
+
+    content_parts = []
+    for title, content_type, content, meta in rows:
+        if content_type == ContentType.TEXT:
+            content_parts.append(f"Title: {title}\nContent: {content}")
+        elif content_type == ContentType.FILE:
+            if content:
+                content_parts.append(f"Title: {title}\nContent: {content}")
+        else:
+            transcript = meta.get("transcript") if meta else None
+            if transcript:
+                content_parts.append(f"Title: {title}\nTranscript: {transcript}")
+    if content_parts:
+        return "\n\n".join(content_parts)
+
+    # If no content found, fall back to the course metadata
+    course = db.query(Course.title, Course.sub_title, Course.description).filter(Course.id == course_id).first()
+    if course:
+        return f"Course Title: {course.title}\nSub Title: {course.sub_title}\nDescription: {course.description}"
+    return "No course content or metadata found."
+
+class CourseContextCache:
+    def __init__(self, ttl_seconds: Optional[int] = None, max_courses: int = 256, max_chars: int = 64 * 1024 * 1024):
+        self.ttl_seconds = settings.COURSE_CONTEXT_TTL if ttl_seconds is None else ttl_seconds
+        self.max_courses = max_courses
+        self.max_chars = max_chars
+        self._chars = 0
+        self._lock = threading.Lock()
+        self._versions: Dict[str, int] = {}
+        self._snapshots: "OrderedDict[str, CourseSnapshot]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def version(self, course_id: str) -> int:
+        return self._versions.get(course_id, 0)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "courses": len(self._snapshots),
+                "chars": self._chars,
+            }
+
+    def invalidate(self, course_id: str) -> None:
+        with self._lock:
+            self._versions[course_id] = self._versions.get(course_id, 0) + 1
+            self._discard(course_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            for course_id in list(self._snapshots):
+                self._versions[course_id] = self._versions.get(course_id, 0) + 1
+            self._snapshots.clear()
+            self._chars = 0
+
+    def _discard(self, course_id: str) -> None:
+        snapshot = self._snapshots.pop(course_id, None)
+        if snapshot is not None:
+            self._chars -= len(snapshot.text)
+
+    def get(self, db: Session, course_id: str) -> CourseSnapshot:
+        """Return the current snapshot for a course, building it if needed."""
+        with self._lock:
+            version = self._versions.get(course_id, 0)
+            snapshot = self._snapshots.get(course_id)
+            if (
+                snapshot is not None
+                and snapshot.version == version
+                and time.time() - snapshot.built_at < self.ttl_seconds
+            ):
+                self._snapshots.move_to_end(course_id)
+                self.hits += 1
+                return snapshot
+            self.misses += 1
+
+        text = build_course_context(db, course_id)
+        snapshot = CourseSnapshot(course_id, version, text, len(text.split()), time.time())
+        with self._lock:
+            # Only cache it if the course did not change while it was being built
+            if self._versions.get(course_id, 0) == version:
+                self._discard(course_id)
+                self._snapshots[course_id] = snapshot
+                self._chars += len(text)
+                while len(self._snapshots) > self.max_courses or (
+                    self._chars > self.max_chars and len(self._snapshots) > 1
+                ):
+                    self._discard(next(iter(self._snapshots)))
+        return snapshot
+
+course_contexts = CourseContextCache()
+
+def _pending(session: Session) -> Set[str]:
+    return session.info.setdefault("changed_course_ids", set())
+
+def _mark_content(mapper, connection, target):
+    session = Session.object_session(target)
+    if session is None:
+        return
+    pending = _pending(session)
+    history = inspect(target).attrs.course_id.history
+    for course_id in [target.course_id, *history.deleted]:
+        if course_id:
+            pending.add(course_id)
+
+def _mark_course(mapper, connection, target):
+    session = Session.object_session(target)
+    if session is not None:
+        _pending(session).add(target.id)
+
+for _event in ("after_insert", "after_update", "after_delete"):
+    event.listen(Content, _event, _mark_content)
+
+@event.listens_for(Content.course_id, "set", active_history=True)
+def _load_previous_course(target, value, oldvalue, initiator):
+    # active_history loads the old course_id even when the attribute was
+    # expired by a commit, so moving content also invalidates its old course
+    return value
+for _event in ("after_insert", "after_update", "after_delete"):
+    event.listen(Course, _event, _mark_course)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session):
+    for course_id in session.info.pop("changed_course_ids", ()):
+        course_contexts.invalidate(course_id)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session):
+    session.info.pop("changed_course_ids", None)
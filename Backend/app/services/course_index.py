@@ -0,0 +1,192 @@
+"""Per-course retrieval index over content chunks.
+
+Course TEXT bodies, VIDEO transcripts and the text extracted from uploaded
+files (see ``text_extraction``) are split into overlapping word
+windows and stored in an SQLite FTS5 table, ranked with BM25 at query time.
+The index is maintained by mapper events on ``Content``, so every create,
+update, delete or course (re)assignment re-chunks only the row that changed,
+inside the same transaction.
+
+Existing databases can be backfilled with ``python -m app.services.course_index``.
+"""
+import logging
+import re
+from dataclasses import dataclass
+from typing import Any, List, Optional
+from sqlalchemy import event, inspect, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session, undefer
+from app.core.config import settings
+from app.models.content import Content
+from app.models.enums import ContentType
+from app.services.fts import LazyTable, phrase
+
+logger = logging.getLogger(__name__)
+
+CREATE_CHUNKS_TABLE = """
+CREATE VIRTUAL TABLE IF NOT EXISTS content_chunks USING fts5(
+    body,
+    title UNINDEXED,
+    course_id,
+    content_id,
+    tokenize = 'porter unicode61'
+)
+"""
+
+content_chunks = LazyTable("content_chunks", [CREATE_CHUNKS_TABLE])
+
+# Only the chunk body contributes to the score; course_id and content_id are
+# indexed purely so lookups by them use the full-text index instead of a scan.
+RANK = "bm25(content_chunks, 1.0, 0.0, 0.0, 0.0)"
+MAX_QUERY_TERMS = 32
+INDEXED_FIELDS = ("title", "content", "content_type", "meta", "course_id", "blob_sha256")
+
+@dataclass
+class Chunk:
+    content_id: str
+    title: str
+    text: str
+    score: float
+
+def chunk_text(body: str, size: Optional[int] = None, overlap: Optional[int] = None) -> List[str]:
+    """Split text into windows of ``size`` words that overlap by ``overlap`` words."""
+    words = body.split()
+    if not words:
+        return []
+    size = size or settings.RETRIEVAL_CHUNK_WORDS
+    overlap = size // 5 if overlap is None else overlap
+    step = max(size - overlap, 1)
+    return [" ".join(words[i:i + size]) for i in range(0, max(len(words) - overlap, 1), step)]
+
+def indexable_text(content: Any) -> str:
+    """The text of a content row that is used as course context."""
+    content_type = getattr(content.content_type, "value", content.content_type) or ""
+    if content_type.lower() == ContentType.TEXT.value:
+        return content.content or ""
+    if content_type.lower() == ContentType.VIDEO.value:
+        return (content.meta or {}).get("transcript") or ""
+    # File text lives in extracted_texts (see file_text); quizzes are not course material
+    return ""
+
+def file_text(connection: Connection, content: Any) -> str:
+    """The extracted text of an uploaded file, or "" until extraction has run."""
+    content_type = getattr(content.content_type, "value", content.content_type) or ""
+    if content_type.lower() != ContentType.FILE.value or not content.blob_sha256:
+        return ""
+    body = connection.execute(
+        text("SELECT text FROM extracted_texts WHERE sha256 = :sha256"),
+        {"sha256": content.blob_sha256}
+    ).scalar()
+    return body or ""
+
+def _match_terms(query: str) -> Optional[str]:
+    terms = []
+    for term in re.findall(r"\w+", query.lower()):
+        if len(term) > 1 and term not in terms:
+            terms.append(term)
+    if not terms:
+        return None
+    return " OR ".join(phrase(term) for term in terms[:MAX_QUERY_TERMS])
+
+def _delete_chunks(connection: Connection, content_id: str) -> None:
+    connection.execute(
+        text(
+            "DELETE FROM content_chunks WHERE rowid IN "
+            "(SELECT rowid FROM content_chunks WHERE content_chunks MATCH :match)"
+        ),
+        {"match": f"content_id : {phrase(content_id)}"}
+    )
+
+def index_content(connection: Connection, content: Any) -> None:
+    """Replace the chunks of one content row."""
+    content_chunks.ensure_in_transaction(connection)
+    _delete_chunks(connection, content.id)
+    if not content.course_id:
+        return
+    rows = [
+        {
+            "body": chunk,
+            "title": content.title or "",
+            "course_id": content.course_id,
+            "content_id": content.id,
+        }
+        for chunk in chunk_text(indexable_text(content) or file_text(connection, content))
+    ]
+    if rows:
+        connection.execute(
+            text(
+                "INSERT INTO content_chunks (body, title, course_id, content_id) "
+                "VALUES (:body, :title, :course_id, :content_id)"
+            ),
+            rows
+        )
+
+@event.listens_for(Content, "after_insert")
+def _index_inserted(mapper, connection, target):
+    index_content(connection, target)
+
+@event.listens_for(Content, "after_update")
+def _index_updated(mapper, connection, target):
+    state = inspect(target)
+    if any(state.attrs[field].history.has_changes() for field in INDEXED_FIELDS):
+        index_content(connection, target)
+
+@event.listens_for(Content, "after_delete")
+def _unindex_deleted(mapper, connection, target):
+    content_chunks.ensure_in_transaction(connection)
+    _delete_chunks(connection, target.id)
+
+def search(db: Session, course_id: str, query: str, k: Optional[int] = None) -> List[Chunk]:
+    """Top-k chunks of a course for a query, best first.
+
+    When nothing matches the query the first chunks of the course are returned,
+    so a vague question still gets some grounding. An empty list means the
+    course has no indexed content.
+    """
+    k = k or settings.RETRIEVAL_TOP_K
+    course_filter = f"course_id : {phrase(course_id)}"
+    rows = []
+    terms = _match_terms(query)
+    if terms:
+        rows = db.execute(
+            text(
+                f"SELECT content_id, title, body, {RANK} AS score FROM content_chunks "
+                "WHERE content_chunks MATCH :match ORDER BY score LIMIT :k"
+            ),
+            {"match": f"{course_filter} AND body : ({terms})", "k": k}
+        ).fetchall()
+    if not rows:
+        rows = db.execute(
+            text(
+                "SELECT content_id, title, body, 0.0 FROM content_chunks "
+                "WHERE content_chunks MATCH :match ORDER BY rowid LIMIT :k"
+            ),
+            {"match": course_filter, "k": k}
+        ).fetchall()
+    return [Chunk(*row) for row in rows]
+
+def format_chunks(chunks: List[Chunk]) -> str:
+    """Render retrieved chunks as prompt context."""
+    return "\n\n".join(f"Title: {chunk.title}\nExcerpt: {chunk.text}" for chunk in chunks)
+
+def rebuild(db: Session) -> int:
+    """Re-chunk every course content row. Returns the number of rows indexed."""
+    connection = db.connection()
+    content_chunks.ensure(connection)
+    connection.execute(text("DELETE FROM content_chunks"))
+    count = 0
+    rows = db.query(Content).options(undefer(Content.content)).filter(Content.course_id.isnot(None))
+    for content in rows.yield_per(200):
+        index_content(connection, content)
+        count += 1
+    db.commit()
+    return count
+
+if __name__ == "__main__":
+    from app.db.session import SessionLocal
+
+    session = SessionLocal()
+    try:
+        print(f"Indexed {rebuild(session)} content rows")
+    finally:
+        session.close()
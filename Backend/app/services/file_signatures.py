@@ -0,0 +1,26 @@
+"""Check that an upload's first bytes match the type its extension claims."""
+from typing import Dict, Tuple
+
+# Extension -> accepted leading bytes; b"" accepts any start (plain text)
+SIGNATURES: Dict[str, Tuple[bytes, ...]] = {
+    ".txt": (b"",),
+    ".pdf": (b"%PDF-",),
+    ".doc": (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1",),  # OLE2 compound file
+    ".docx": (b"PK\x03\x04",),  # ZIP container
+    ".jpg": (b"\xff\xd8\xff",),
+    ".jpeg": (b"\xff\xd8\xff",),
+    ".png": (b"\x89PNG\r\n\x1a\n",),
+}
+
+class UnexpectedFileType(ValueError):
+    """The file's content does not match its extension."""
+
+def check_signature(extension: str, head: bytes) -> None:
+    """Raise ``UnexpectedFileType`` unless ``head`` (the first chunk) fits ``extension``."""
+    prefixes = SIGNATURES.get(extension.lower())
+    if prefixes is None:
+        raise UnexpectedFileType(f"No known signature for {extension!r} files")
+    if not head.startswith(prefixes):
+        raise UnexpectedFileType(f"File content does not look like a {extension} file")
+    if extension.lower() == ".txt" and b"\x00" in head:
+        raise UnexpectedFileType("Text files cannot contain NUL bytes")
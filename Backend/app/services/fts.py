@@ -0,0 +1,95 @@
+"""Shared plumbing for the SQLite FTS5 indexes (course chunks, material and
+message search).
+
+A ``LazyTable`` registers its DDL with ``Base.metadata``, so ``create_all``
+makes the table on new databases. Databases created before an index existed
+get its table (and a fill from the source rows) the first time it is used.
+"""
+import re
+import weakref
+from typing import Callable, Optional, Sequence
+from sqlalchemy import DDL, event, text
+from sqlalchemy.engine import Connection
+from app.db.base_class import Base
+
+HIGHLIGHT = ("<mark>", "</mark>")
+MAX_QUERY_TERMS = 16
+
+def phrase(value: str) -> str:
+    """Quote ``value`` as an FTS5 string, so its characters are never read as syntax."""
+    return '"' + str(value).replace('"', '""') + '"'
+
+def match_expression(query: str) -> Optional[str]:
+    """Every word of ``query`` must match; a trailing ``*`` makes a word a prefix."""
+    terms = []
+    for word, star in re.findall(r"(\w+)(\*?)", query.lower()):
+        term = phrase(word) + ("*" if star else "")
+        if term not in terms:
+            terms.append(term)
+    if not terms:
+        return None
+    return " ".join(terms[:MAX_QUERY_TERMS])
+
+class LazyTable:
+    """An FTS table that is created, and filled, on first use.
+
+    For readers, the create and the fill run in a transaction of their own
+    and commit there, so they stick even when the caller's transaction is a
+    read that is rolled back. Only then is the engine remembered as ready.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        create_statements: Sequence[str],
+        fill: Optional[Callable[[Connection], None]] = None
+    ):
+        self.name = name
+        self.create_statements = list(create_statements)
+        self.fill = fill
+        self._ready_engines = weakref.WeakSet()
+        # Connections whose open transaction created the table
+        self._created_on = weakref.WeakSet()
+        for statement in self.create_statements:
+            event.listen(Base.metadata, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+        event.listen(Base.metadata, "after_drop", DDL(f"DROP TABLE IF EXISTS {name}").execute_if(dialect="sqlite"))
+
+    def exists(self, connection: Connection) -> bool:
+        return connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": self.name}
+        ).first() is not None
+
+    def _create(self, connection: Connection) -> None:
+        for statement in self.create_statements:
+            connection.execute(text(statement))
+        if self.fill is not None:
+            self.fill(connection)
+
+    def ensure(self, connection: Connection) -> None:
+        engine = connection.engine
+        if engine in self._ready_engines or connection in self._created_on:
+            return
+        if not self.exists(connection):
+            with engine.begin() as own:
+                # Another connection may have created it in the meantime
+                if not self.exists(own):
+                    self._create(own)
+        self._ready_engines.add(engine)
+
+    def ensure_in_transaction(self, connection: Connection) -> None:
+        """``ensure`` for a caller that is already writing on ``connection``.
+
+        No other connection can write until that transaction ends, so the
+        table is created and filled in it, and is committed or rolled back
+        with the caller's rows. The engine is remembered as ready by a later
+        transaction that finds the table.
+        """
+        engine = connection.engine
+        if engine in self._ready_engines or connection in self._created_on:
+            return
+        if self.exists(connection):
+            self._ready_engines.add(engine)
+            return
+        self._create(connection)
+        self._created_on.add(connection)
@@ -0,0 +1,200 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class CachePolicy:
+    ttl_seconds: int
+    max_entries: int
+
+DAY = 24 * 60 * 60
+
+# Generated quizzes and flashcards are reused for days, summaries are tied to
+# their input text so they can live longer, suggestions go stale quickly.
+CACHE_POLICIES: Dict[str, CachePolicy] = {
+    "quiz": CachePolicy(ttl_seconds=7 * DAY, max_entries=5000),
+    "flashcard": CachePolicy(ttl_seconds=7 * DAY, max_entries=5000),
+    "summary": CachePolicy(ttl_seconds=30 * DAY, max_entries=5000),
+    "youtube_suggestions": CachePolicy(ttl_seconds=1 * DAY, max_entries=1000),
+}
+DEFAULT_POLICY = CachePolicy(ttl_seconds=1 * DAY, max_entries=1000)
+
+def default_cache_path() -> str:
+    """Place the cache database next to the main SQLite database."""
+    if settings.AI_CACHE_PATH:
+        return settings.AI_CACHE_PATH
+    db_path = settings.SQLITE_URL.split("///", 1)[-1]
+    if not db_path or db_path == ":memory:":
+        return ":memory:"
+    return os.path.join(os.path.dirname(db_path), "generation_cache.db")
+
+class GenerationCache:
+    """Content-addressed SQLite cache for generated AI content.
+
+    Entries are keyed by a hash of the final prompt, so identical requests hit
+    the same row regardless of how their parameters were ordered. Each content
+    type has its own TTL and LRU size limit.
+    """
+
+    def __init__(self, path: str, policies: Optional[Dict[str, CachePolicy]] = None, enabled: bool = True):
+        self.path = path
+        self.policies = policies if policies is not None else CACHE_POLICIES
+        self.enabled = enabled
+        self.hits: Dict[str, int] = defaultdict(int)
+        self.misses: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @staticmethod
+    def make_key(content_type: str, prompt: str, provider: str) -> str:
+        payload = json.dumps(
+            {"content_type": content_type, "prompt": prompt, "provider": provider},
+            sort_keys=True,
+            separators=(",", ":")
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def policy_for(self, content_type: str) -> CachePolicy:
+        return self.policies.get(content_type, DEFAULT_POLICY)
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            if self.path != ":memory:":
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS generation_cache (
+                    key TEXT PRIMARY KEY,
+                    content_type TEXT NOT NULL,
+                    provider TEXT,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_accessed_at REAL NOT NULL,
+                    hit_count INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_generation_cache_lru
+                ON generation_cache (content_type, last_accessed_at)
+            """)
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str, content_type: str) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connection()
+                row = conn.execute(
+                    "SELECT value FROM generation_cache WHERE key = ? AND expires_at > ?",
+                    (key, now)
+                ).fetchone()
+                if row is not None:
+                    conn.execute(
+                        "UPDATE generation_cache SET last_accessed_at = ?, hit_count = hit_count + 1 WHERE key = ?",
+                        (now, key)
+                    )
+                    conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Generation cache lookup failed: {str(e)}")
+            return None
+
+        if row is None:
+            self.misses[content_type] += 1
+            return None
+        self.hits[content_type] += 1
+        return json.loads(row[0])
+
+    def set(self, key: str, content_type: str, value: Dict[str, Any], provider: Optional[str] = None) -> None:
+        if not self.enabled:
+            return
+        policy = self.policy_for(content_type)
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO generation_cache
+                        (key, content_type, provider, value, created_at, expires_at, last_accessed_at, hit_count)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, 0)
+                    """,
+                    (key, content_type, provider, json.dumps(value), now, now + policy.ttl_seconds, now)
+                )
+                self._evict(conn, content_type, policy, now)
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Generation cache write failed: {str(e)}")
+
+    def _evict(self, conn: sqlite3.Connection, content_type: str, policy: CachePolicy, now: float) -> None:
+        conn.execute(
+            "DELETE FROM generation_cache WHERE content_type = ? AND expires_at <= ?",
+            (content_type, now)
+        )
+        conn.execute(
+            """
+            DELETE FROM generation_cache WHERE key IN (
+                SELECT key FROM generation_cache
+                WHERE content_type = ?
+                ORDER BY last_accessed_at DESC, rowid DESC
+                LIMIT -1 OFFSET ?
+            )
+            """,
+            (content_type, policy.max_entries)
+        )
+
+    def clear(self) -> None:
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM generation_cache")
+            conn.commit()
+        self.hits.clear()
+        self.misses.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process plus the stored entry counts."""
+        entries: Dict[str, int] = {}
+        if self.enabled:
+            with self._lock:
+                rows = self._connection().execute(
+                    "SELECT content_type, COUNT(*) FROM generation_cache GROUP BY content_type"
+                ).fetchall()
+            entries = {content_type: count for content_type, count in rows}
+        content_types = sorted(set(self.hits) | set(self.misses) | set(entries))
+        hits = sum(self.hits.values())
+        misses = sum(self.misses.values())
+        return {
+            "enabled": self.enabled,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "by_content_type": {
+                content_type: {
+                    "hits": self.hits.get(content_type, 0),
+                    "misses": self.misses.get(content_type, 0),
+                    "entries": entries.get(content_type, 0),
+                }
+                for content_type in content_types
+            },
+        }
+
+@lru_cache()
+def get_generation_cache() -> GenerationCache:
+    return GenerationCache(default_cache_path(), enabled=settings.AI_CACHE_ENABLED)
@@ -0,0 +1,180 @@
+"""Durable background jobs for long-running AI and media work.
+
+Jobs are rows in the ``jobs`` table, so they survive restarts: a request
+submits a job and gets its id back immediately, and a pool of asyncio
+workers running inside the API process picks queued jobs up, runs the
+registered handler and stores the result (or the error) on the row.
+
+* Failed attempts are retried with exponential backoff (``JOB_RETRY_BACKOFF``
+  doubled per attempt, capped at ``JOB_RETRY_BACKOFF_MAX``) up to the job's
+  ``max_attempts``. Client errors (``HTTPException`` with a 4xx status) and
+  ``PermanentJobError`` are not retried.
+* Jobs left ``running`` by a process that stopped are queued again when the
+  pool starts. This assumes one worker pool per database; extra API
+  processes sharing the database should run with ``JOB_WORKERS=0``.
+
+Handlers are registered with ``@job_handler("type")`` next to the endpoint
+code they share, and receive the job payload and a ``JobContext`` for
+reporting progress.
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.crud.crud_job import crud_job
+from app.db.writer import db_writer
+from app.models.job import Job
+from app.schemas.job import JobResponse
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[Dict[str, Any], "JobContext"], Awaitable[Any]]
+
+_handlers: Dict[str, JobHandler] = {}
+
+class PermanentJobError(Exception):
+    """A job failure that retrying cannot fix."""
+
+def job_handler(job_type: str) -> Callable[[JobHandler], JobHandler]:
+    """Register the coroutine that runs jobs of ``job_type``."""
+    def register(handler: JobHandler) -> JobHandler:
+        _handlers[job_type] = handler
+        return handler
+    return register
+
+class JobContext:
+    def __init__(self, job: Job):
+        self.job_id = job.id
+        self.user_id = job.created_by
+        self.attempt = job.attempts
+        # Writes happen off the loop; the lock keeps them in reporting order
+        self._lock = asyncio.Lock()
+
+    async def progress(self, fraction: float, message: Optional[str] = None) -> None:
+        """Report progress between 0.0 and 1.0."""
+        fraction = min(max(fraction, 0.0), 1.0)
+        async with self._lock:
+            await db_writer.run(crud_job.set_progress, job_id=self.job_id, progress=fraction, message=message)
+
+def _describe(error: Exception) -> str:
+    if isinstance(error, HTTPException):
+        return str(error.detail)
+    return str(error) or type(error).__name__
+
+def _is_permanent(error: Exception) -> bool:
+    if isinstance(error, PermanentJobError):
+        return True
+    return isinstance(error, HTTPException) and 400 <= error.status_code < 500
+
+class JobWorkerPool:
+    def __init__(self, workers: Optional[int] = None, poll_interval: Optional[float] = None):
+        self.workers = settings.JOB_WORKERS if workers is None else workers
+        self.poll_interval = settings.JOB_POLL_INTERVAL if poll_interval is None else poll_interval
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def submit(
+        self,
+        db: Session,
+        job_type: str,
+        payload: Dict[str, Any],
+        user_id: Optional[str] = None,
+        max_attempts: Optional[int] = None,
+        commit: bool = True,
+    ) -> Job:
+        """Queue a job and wake an idle worker.
+
+        With ``commit=False`` the job is only flushed and becomes visible to
+        workers when the caller commits (the next poll picks it up).
+        """
+        if job_type not in _handlers:
+            raise ValueError(f"Unknown job type: {job_type}")
+        job = crud_job.create_job(
+            db,
+            job_type=job_type,
+            payload=jsonable_encoder(payload),
+            user_id=user_id,
+            max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+            commit=commit,
+        )
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        return job
+
+    async def start(self) -> None:
+        if self.running or self.workers <= 0:
+            return
+        requeued = await db_writer.run(crud_job.requeue_running)
+        if requeued:
+            logger.info(f"Re-queued {requeued} interrupted jobs")
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._loop = None
+
+    def backoff(self, attempts: int) -> float:
+        return min(settings.JOB_RETRY_BACKOFF * 2 ** max(attempts - 1, 0), settings.JOB_RETRY_BACKOFF_MAX)
+
+    async def _work(self) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                job = await db_writer.run(crud_job.claim_next)
+            except Exception as e:
+                logger.error(f"Failed to claim a job: {str(e)}")
+                job = None
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self.run(job)
+
+    async def run(self, job: Job) -> None:
+        """Run one claimed job and record its outcome."""
+        handler = _handlers.get(job.job_type)
+        try:
+            if handler is None:
+                raise PermanentJobError(f"Unknown job type: {job.job_type}")
+            result = await handler(job.payload or {}, JobContext(job))
+        except asyncio.CancelledError:
+            # Shutting down: the job runs again on the next start
+            await db_writer.run(crud_job.requeue, job_id=job.id)
+            raise
+        except Exception as e:
+            retry_in = None
+            if not _is_permanent(e) and job.attempts < job.max_attempts:
+                retry_in = self.backoff(job.attempts)
+            logger.warning(
+                f"Job {job.id} ({job.job_type}) failed on attempt {job.attempts}/{job.max_attempts}: {_describe(e)}"
+                + (f", retrying in {retry_in:.0f}s" if retry_in is not None else "")
+            )
+            await db_writer.run(crud_job.mark_failed, job_id=job.id, error=_describe(e), retry_in=retry_in)
+            return
+        await db_writer.run(crud_job.mark_succeeded, job_id=job.id, result=jsonable_encoder(result))
+
+def job_accepted(job: Job) -> JSONResponse:
+    """202 response pointing the client at the job's status endpoint."""
+    return JSONResponse(
+        status_code=202,
+        content=jsonable_encoder(JobResponse.from_orm(job)),
+        headers={"Location": f"{settings.API_V1_STR}/jobs/{job.id}"}
+    )
+
+job_pool = JobWorkerPool()
@@ -0,0 +1,244 @@
+"""Full-text search over course material.
+
+One FTS5 table, ``material_fts``, holds a document per course (title, sub
+title and description), per TEXT content body, per VIDEO content transcript
+and per transcribed YouTube video. ``kind``, ``course_id`` and ``creator_id``
+are indexed as token columns so the filters are answered by the index; only
+``title`` and ``body`` are matched against the query and weighted by BM25,
+with title hits counting more.
+
+The index is maintained by mapper events on ``Course``, ``Content`` and
+``YouTubeContent``, so every CRUD write path (sync or async) re-indexes just
+the row that changed, inside the same transaction. Databases created before
+the index existed are filled on first use, by migration 010, or with
+``python -m app.services.material_search``.
+"""
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+from sqlalchemy import event, inspect, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from app.crud.pagination import Page, decode_token, encode_token
+from app.models.content import Content
+from app.models.course import Course
+from app.models.youtube_content import YouTubeContent
+from app.services.course_index import indexable_text
+from app.services.fts import HIGHLIGHT, LazyTable, match_expression, phrase
+
+logger = logging.getLogger(__name__)
+
+CREATE_TABLE = """
+CREATE VIRTUAL TABLE IF NOT EXISTS material_fts USING fts5(
+    title,
+    body,
+    kind,
+    source_id,
+    course_id,
+    creator_id,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+)
+"""
+
+# Same documents as the mapper events below build, for a whole table at once
+FILL_STATEMENTS = [
+    """
+    INSERT INTO material_fts (title, body, kind, source_id, course_id, creator_id)
+    SELECT title, trim(coalesce(sub_title, '') || char(10) || coalesce(description, ''), char(10)),
+           'course', id, id, creator_id
+    FROM courses
+    """,
+    """
+    INSERT INTO material_fts (title, body, kind, source_id, course_id, creator_id)
+    SELECT title, body, kind, id, course_id, created_by FROM (
+        SELECT title, lower(content_type) AS kind, id, course_id, created_by,
+               CASE lower(content_type) WHEN 'text' THEN content ELSE json_extract(meta, '$.transcript') END AS body
+        FROM content WHERE lower(content_type) IN ('text', 'video')
+    ) WHERE body != ''
+    """,
+    """
+    INSERT INTO material_fts (title, body, kind, source_id, course_id, creator_id)
+    SELECT title, transcript, 'youtube', id, NULL, created_by
+    FROM youtube_content WHERE transcript != ''
+    """,
+]
+
+KINDS = ("course", "text", "video", "youtube")
+# title, body, then the filter columns, which never add to the score
+RANK = "bm25(material_fts, 4.0, 1.0, 0.0, 0.0, 0.0, 0.0)"
+SNIPPET_TOKENS = 16
+
+@dataclass
+class MaterialHit:
+    type: str
+    id: str
+    title: Optional[str]
+    course_id: Optional[str]
+    creator_id: Optional[str]
+    snippet: str
+    score: float
+
+def course_document(course: Course) -> Dict[str, Any]:
+    return {
+        "title": course.title,
+        "body": "\n".join(part for part in (course.sub_title, course.description) if part),
+        "kind": "course",
+        "course_id": course.id,
+        "creator_id": course.creator_id,
+    }
+
+def content_document(content: Content) -> Optional[Dict[str, Any]]:
+    body = indexable_text(content)
+    if not body:
+        return None
+    return {
+        "title": content.title,
+        "body": body,
+        "kind": getattr(content.content_type, "value", content.content_type).lower(),
+        "course_id": content.course_id,
+        "creator_id": content.created_by,
+    }
+
+def video_document(video: YouTubeContent) -> Optional[Dict[str, Any]]:
+    if not video.transcript:
+        return None
+    return {
+        "title": video.title,
+        "body": video.transcript,
+        "kind": "youtube",
+        "course_id": None,
+        "creator_id": video.created_by,
+    }
+
+# Model -> (document builder, columns that change its document)
+DOCUMENTS = {
+    Course: (course_document, ("title", "sub_title", "description", "creator_id")),
+    Content: (content_document, ("title", "content", "content_type", "meta", "course_id", "created_by")),
+    YouTubeContent: (video_document, ("title", "transcript", "created_by")),
+}
+
+def rebuild(connection: Connection) -> None:
+    """Re-read every course, content row and video into the index."""
+    logger.info("Rebuilding the course material search index")
+    connection.execute(text("DELETE FROM material_fts"))
+    for statement in FILL_STATEMENTS:
+        connection.execute(text(statement))
+
+material_fts = LazyTable("material_fts", [CREATE_TABLE], fill=rebuild)
+
+def _delete_document(connection: Connection, source_id: str) -> None:
+    connection.execute(
+        text(
+            "DELETE FROM material_fts WHERE rowid IN "
+            "(SELECT rowid FROM material_fts WHERE material_fts MATCH :match)"
+        ),
+        {"match": f"source_id : {phrase(source_id)}"}
+    )
+
+def index_row(connection: Connection, target: Any) -> None:
+    """Replace the document of one course, content row or video."""
+    material_fts.ensure_in_transaction(connection)
+    _delete_document(connection, target.id)
+    build, _ = DOCUMENTS[type(target)]
+    document = build(target)
+    if document:
+        connection.execute(
+            text(
+                "INSERT INTO material_fts (title, body, kind, source_id, course_id, creator_id) "
+                "VALUES (:title, :body, :kind, :source_id, :course_id, :creator_id)"
+            ),
+            {**document, "source_id": target.id}
+        )
+
+def _index_inserted(mapper, connection, target):
+    index_row(connection, target)
+
+def _index_updated(mapper, connection, target):
+    _, fields = DOCUMENTS[type(target)]
+    state = inspect(target)
+    if any(state.attrs[field].history.has_changes() for field in fields):
+        index_row(connection, target)
+
+def _unindex_deleted(mapper, connection, target):
+    material_fts.ensure_in_transaction(connection)
+    _delete_document(connection, target.id)
+
+for _model in DOCUMENTS:
+    event.listen(_model, "after_insert", _index_inserted)
+    event.listen(_model, "after_update", _index_updated)
+    event.listen(_model, "after_delete", _unindex_deleted)
+
+def search(
+    db: Session,
+    query: str,
+    *,
+    course_id: Optional[str] = None,
+    kind: Optional[str] = None,
+    creator_id: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = 20
+) -> Page[MaterialHit]:
+    """Best matches first across courses, content and videos, with snippets.
+
+    Every word must appear in the title or body; a trailing ``*`` makes a
+    word a prefix. ``kind`` is one of ``KINDS``. Pages continue from the
+    opaque ``next_cursor`` of the previous page (``InvalidCursor`` if it was
+    tampered with).
+    """
+    terms = match_expression(query)
+    if terms is None:
+        return Page([])
+    connection = db.connection()
+    material_fts.ensure(connection)
+
+    filters = [
+        f"{column} : {phrase(value)}"
+        for column, value in (("kind", kind), ("course_id", course_id), ("creator_id", creator_id))
+        if value is not None
+    ]
+    conditions = ["material_fts MATCH :match"]
+    params = {
+        "match": " AND ".join([*filters, f"{{title body}} : ({terms})"]),
+        "open": HIGHLIGHT[0],
+        "close": HIGHLIGHT[1],
+        "tokens": SNIPPET_TOKENS,
+        "limit": limit + 1,
+    }
+    if cursor is not None:
+        after_score, after_rowid = decode_token(cursor, 2)
+        conditions.append(
+            f"({RANK} > :after_score OR ({RANK} = :after_score AND material_fts.rowid < :after_rowid))"
+        )
+        params.update(after_score=after_score, after_rowid=after_rowid)
+
+    # Rank every match but build snippets for the returned page only
+    rows = connection.execute(
+        text(
+            "WITH top AS ("
+            f"SELECT material_fts.rowid AS id, {RANK} AS score FROM material_fts "
+            f"WHERE {' AND '.join(conditions)} "
+            "ORDER BY score, id DESC LIMIT :limit"
+            ") "
+            "SELECT kind, source_id, title, course_id, creator_id, "
+            "snippet(material_fts, 1, :open, :close, '…', :tokens), top.score, top.id "
+            "FROM top CROSS JOIN material_fts "
+            "WHERE material_fts MATCH :match AND material_fts.rowid = top.id "
+            "ORDER BY top.score, top.id DESC"
+        ),
+        params
+    ).fetchall()
+
+    hits = [MaterialHit(*row[:-1]) for row in rows[:limit]]
+    if len(rows) <= limit:
+        return Page(hits)
+    last = rows[limit - 1]
+    return Page(hits, encode_token([last.score, last.id]))
+
+if __name__ == "__main__":
+    from app.db.session import engine
+
+    with engine.begin() as connection:
+        material_fts.ensure(connection)
+        rebuild(connection)
+    print("Rebuilt the course material search index")
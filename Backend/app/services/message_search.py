@@ -0,0 +1,162 @@
+"""Full-text search over chat messages.
+
+``messages_fts`` is an external-content FTS5 table over ``messages``: it
+stores only the index and reads message text from ``messages`` by rowid.
+Triggers on ``messages`` keep it in step with every insert, update and
+delete, including bulk and raw-SQL writes that bypass the ORM. ``group_id``
+is indexed as a token column so a group's messages are selected through the
+index, but only ``content`` contributes to the BM25 score. There is no
+stemmer: Porter would also stem prefix queries (``poly*`` becomes ``poli*``
+and misses "polymorphism"), so word variants are found with a prefix.
+
+Databases created before the index existed get the table and triggers, and a
+rebuild from ``messages``, on their first search (or run
+``python -m app.services.message_search``).
+"""
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import DateTime, bindparam, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from app.crud.pagination import Page, decode_token, encode_token
+from app.services.fts import HIGHLIGHT, LazyTable, match_expression, phrase
+
+logger = logging.getLogger(__name__)
+
+CREATE_STATEMENTS = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+        content,
+        group_id,
+        content = 'messages',
+        content_rowid = 'id',
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages BEGIN
+        INSERT INTO messages_fts (rowid, content, group_id) VALUES (new.id, new.content, new.group_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON messages BEGIN
+        INSERT INTO messages_fts (messages_fts, rowid, content, group_id)
+        VALUES ('delete', old.id, old.content, old.group_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS messages_fts_update AFTER UPDATE OF content, group_id ON messages BEGIN
+        INSERT INTO messages_fts (messages_fts, rowid, content, group_id)
+        VALUES ('delete', old.id, old.content, old.group_id);
+        INSERT INTO messages_fts (rowid, content, group_id) VALUES (new.id, new.content, new.group_id);
+    END
+    """,
+]
+
+RANK = "bm25(messages_fts, 1.0, 0.0)"
+SNIPPET_TOKENS = 12
+
+@dataclass
+class MessageHit:
+    id: int
+    group_id: int
+    sender_id: str
+    content: Optional[str]
+    file_url: Optional[str]
+    created_at: datetime
+    snippet: str
+    score: float
+
+def rebuild(connection: Connection) -> None:
+    """Re-read every message into the index."""
+    logger.info("Rebuilding the chat message search index")
+    connection.execute(text("INSERT INTO messages_fts (messages_fts) VALUES ('rebuild')"))
+
+messages_fts = LazyTable("messages_fts", CREATE_STATEMENTS, fill=rebuild)
+
+def search(
+    db: Session,
+    group_id: int,
+    query: str,
+    *,
+    sender_id: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = 50
+) -> Page[MessageHit]:
+    """Best-matching messages of a group first, with highlighted snippets.
+
+    ``since`` is inclusive and ``until`` exclusive. Pages continue from the
+    opaque ``next_cursor`` of the previous page (``InvalidCursor`` if it was
+    tampered with).
+    """
+    terms = match_expression(query)
+    if terms is None:
+        return Page([])
+    connection = db.connection()
+    messages_fts.ensure(connection)
+
+    conditions = ["messages_fts MATCH :match"]
+    params = {
+        "match": f"group_id : {phrase(group_id)} AND content : ({terms})",
+        "open": HIGHLIGHT[0],
+        "close": HIGHLIGHT[1],
+        "tokens": SNIPPET_TOKENS,
+        "limit": limit + 1,
+    }
+    if sender_id is not None:
+        conditions.append("m.sender_id = :sender_id")
+        params["sender_id"] = sender_id
+    if since is not None:
+        conditions.append("m.created_at >= :since")
+        params["since"] = since
+    if until is not None:
+        conditions.append("m.created_at < :until")
+        params["until"] = until
+    # Only read the message rows while ranking when a filter needs them
+    source = "messages_fts"
+    if len(conditions) > 1:
+        source += " JOIN messages AS m ON m.id = messages_fts.rowid"
+    if cursor is not None:
+        after_score, after_id = decode_token(cursor, 2)
+        conditions.append(
+            f"({RANK} > :after_score OR ({RANK} = :after_score AND messages_fts.rowid < :after_id))"
+        )
+        params.update(after_score=after_score, after_id=after_id)
+
+    # Rank every match but build snippets for the returned page only
+    statement = text(
+        "WITH top AS ("
+        f"SELECT messages_fts.rowid AS id, {RANK} AS score FROM {source} "
+        f"WHERE {' AND '.join(conditions)} "
+        "ORDER BY score, id DESC LIMIT :limit"
+        ") "
+        "SELECT m.id, m.group_id, m.sender_id, m.content, m.file_url, m.created_at, "
+        "snippet(messages_fts, 0, :open, :close, '…', :tokens), top.score "
+        # CROSS JOIN keeps the page as the outer loop, so each snippet is a rowid lookup
+        "FROM top CROSS JOIN messages_fts CROSS JOIN messages AS m "
+        "WHERE messages_fts MATCH :match AND messages_fts.rowid = top.id AND m.id = top.id "
+        "ORDER BY top.score, top.id DESC"
+    )
+    # Dates are compared as stored, so bind them through the DateTime type
+    statement = statement.bindparams(
+        *(bindparam(name, type_=DateTime) for name in ("since", "until") if name in params)
+    ).columns(created_at=DateTime)
+    hits = [MessageHit(*row) for row in connection.execute(statement, params)]
+
+    if len(hits) <= limit:
+        return Page(hits)
+    hits = hits[:limit]
+    return Page(hits, encode_token([hits[-1].score, hits[-1].id]))
+
+if __name__ == "__main__":
+    from app.db.session import engine
+
+    with engine.begin() as connection:
+        messages_fts.ensure(connection)
+        rebuild(connection)
+    print("Rebuilt the chat message search index")
@@ -0,0 +1,202 @@
+"""Latency- and failure-aware routing across AI providers.
+
+The router remembers how each provider has been doing:
+
+* an exponentially weighted moving average (EWMA) of latency and error rate,
+  plus a window of recent latencies for the p95;
+* a circuit breaker that stops sending traffic to a provider after
+  ``failure_threshold`` consecutive failures, and lets a single probe
+  through once ``cooldown_seconds`` have passed (half-open);
+* optional hedging: if the first provider has not answered within its p95
+  latency, the next provider is started as well and whichever answers first
+  wins. The loser is cancelled.
+"""
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, TypeVar
+from fastapi import HTTPException
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+@dataclass
+class ProviderStats:
+    ewma_latency: Optional[float] = None
+    ewma_error_rate: float = 0.0
+    successes: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    hedged: int = 0
+    state: str = CLOSED
+    opened_at: float = 0.0
+    probe_in_flight: bool = False
+    latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=200))
+
+    def p95(self) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, math.ceil(0.95 * len(ordered)) - 1)]
+
+class ProviderRouter:
+    def __init__(
+        self,
+        providers: Dict[str, Any],
+        alpha: float = 0.2,
+        failure_threshold: Optional[int] = None,
+        cooldown_seconds: Optional[float] = None,
+        hedge_delay: Optional[float] = None,
+        min_samples: int = 20,
+    ):
+        self.providers = providers
+        self.alpha = alpha
+        self.failure_threshold = failure_threshold or settings.AI_CIRCUIT_FAILURES
+        self.cooldown_seconds = settings.AI_CIRCUIT_COOLDOWN if cooldown_seconds is None else cooldown_seconds
+        self.default_hedge_delay = settings.AI_HEDGE_DELAY if hedge_delay is None else hedge_delay
+        self.min_samples = min_samples
+        self.stats_by_provider: Dict[str, ProviderStats] = {name: ProviderStats() for name in providers}
+
+    def _stats(self, name: str) -> ProviderStats:
+        return self.stats_by_provider.setdefault(name, ProviderStats())
+
+    def _available(self, name: str) -> bool:
+        stats = self._stats(name)
+        if stats.state == CLOSED:
+            return True
+        if stats.state == OPEN and time.monotonic() - stats.opened_at >= self.cooldown_seconds:
+            stats.state = HALF_OPEN
+        # Half-open lets exactly one probe request through at a time
+        return stats.state == HALF_OPEN and not stats.probe_in_flight
+
+    def order(self, preferred: Optional[str] = None) -> List[str]:
+        """Providers worth trying, preferred first, the rest healthiest first."""
+        names = [name for name in self.providers if self._available(name)]
+
+        def score(name: str):
+            stats = self._stats(name)
+            return (name != preferred, stats.ewma_error_rate, stats.ewma_latency or 0.0)
+
+        return sorted(names, key=score)
+
+    def hedge_delay(self, name: str) -> float:
+        stats = self._stats(name)
+        if len(stats.latencies) < self.min_samples:
+            return self.default_hedge_delay
+        return stats.p95()
+
+    def record_success(self, name: str, latency: Optional[float] = None) -> None:
+        """Record a successful call; streams pass no latency as theirs is not comparable."""
+        stats = self._stats(name)
+        stats.successes += 1
+        stats.consecutive_failures = 0
+        if latency is not None:
+            stats.latencies.append(latency)
+            stats.ewma_latency = latency if stats.ewma_latency is None else (
+                self.alpha * latency + (1 - self.alpha) * stats.ewma_latency
+            )
+        stats.ewma_error_rate = (1 - self.alpha) * stats.ewma_error_rate
+        stats.probe_in_flight = False
+        if stats.state != CLOSED:
+            logger.info(f"Circuit for {name} closed")
+        stats.state = CLOSED
+
+    def record_failure(self, name: str) -> None:
+        stats = self._stats(name)
+        stats.failures += 1
+        stats.consecutive_failures += 1
+        stats.ewma_error_rate = self.alpha + (1 - self.alpha) * stats.ewma_error_rate
+        stats.probe_in_flight = False
+        if stats.state == HALF_OPEN or stats.consecutive_failures >= self.failure_threshold:
+            if stats.state != OPEN:
+                logger.warning(f"Circuit for {name} opened after {stats.consecutive_failures} consecutive failures")
+            stats.state = OPEN
+            stats.opened_at = time.monotonic()
+
+    def release(self, name: str) -> None:
+        """Forget an unfinished call, e.g. one cancelled because another provider won."""
+        self._stats(name).probe_in_flight = False
+
+    def begin(self, name: str) -> float:
+        stats = self._stats(name)
+        if stats.state == HALF_OPEN:
+            stats.probe_in_flight = True
+        return time.perf_counter()
+
+    async def _attempt(self, name: str, fn: Callable[[Any], Awaitable[T]]) -> T:
+        start = self.begin(name)
+        try:
+            result = await fn(self.providers[name])
+        except asyncio.CancelledError:
+            self.release(name)
+            raise
+        except Exception as e:
+            logger.warning(f"{name} request failed: {str(e)}")
+            self.record_failure(name)
+            raise
+        self.record_success(name, time.perf_counter() - start)
+        return result
+
+    async def call(self, fn: Callable[[Any], Awaitable[T]], preferred: Optional[str] = None, hedge: bool = False) -> T:
+        """Run ``fn(provider)`` on the best available provider, falling back on errors.
+
+        With ``hedge=True`` the next provider is started when the current one
+        has not answered within its p95 latency.
+        """
+        if not self.providers:
+            raise HTTPException(status_code=500, detail="No AI provider configured")
+        queue = self.order(preferred)
+        if not queue:
+            raise HTTPException(status_code=503, detail="All AI providers are temporarily unavailable")
+
+        pending: Dict[asyncio.Task, str] = {}
+        last_error: Optional[BaseException] = None
+        try:
+            while queue or pending:
+                if not pending:
+                    name = queue.pop(0)
+                    pending[asyncio.ensure_future(self._attempt(name, fn))] = name
+                timeout = None
+                if hedge and queue and len(pending) == 1:
+                    timeout = self.hedge_delay(next(iter(pending.values())))
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    slow = next(iter(pending.values()))
+                    self._stats(slow).hedged += 1
+                    name = queue.pop(0)
+                    logger.info(f"Hedging slow {slow} request with {name}")
+                    pending[asyncio.ensure_future(self._attempt(name, fn))] = name
+                    continue
+                for task in done:
+                    pending.pop(task)
+                    if task.exception() is None:
+                        return task.result()
+                    last_error = task.exception()
+            raise last_error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {
+                "state": stats.state,
+                "ewma_latency": stats.ewma_latency,
+                "p95_latency": stats.p95(),
+                "ewma_error_rate": round(stats.ewma_error_rate, 4),
+                "successes": stats.successes,
+                "failures": stats.failures,
+                "consecutive_failures": stats.consecutive_failures,
+                "hedged": stats.hedged,
+            }
+            for name, stats in self.stats_by_provider.items()
+        }
@@ -0,0 +1,408 @@
+"""Tolerant parsing and validation of JSON produced by AI providers.
+
+Models often wrap JSON in code fences or prose, leave trailing commas, use
+single quotes or stop mid-array when they hit the token limit. Instead of
+re-asking the provider for the whole document on every ``json.loads``
+failure, the response is run through a forgiving parser:
+
+* code fences and text around the document are ignored;
+* trailing/doubled commas, single-quoted strings, bare keys, Python
+  literals and comments are accepted;
+* a truncated document is closed where it stops, dropping the incomplete
+  trailing item.
+
+The result is validated against the pydantic schema for its kind (see
+``app.schemas.generated``). Items of the schema's list field (quiz
+questions, outline chapters, chapter sections) are validated one by one, so
+a single bad item is dropped instead of failing the document. When fewer
+items than requested survive, the provider is asked only for the missing
+ones. A full re-ask happens only when nothing usable could be recovered.
+"""
+import json
+import logging
+import re
+import threading
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Type
+from pydantic import BaseModel, ValidationError
+from app.schemas.generated import (
+    GeneratedChapter, GeneratedChapters, GeneratedCourse, GeneratedQuiz, LearningPathOutline
+)
+
+logger = logging.getLogger(__name__)
+
+# kind -> (schema, name of the list field whose items are recovered one by one)
+SCHEMAS: Dict[str, Tuple[Type[BaseModel], Optional[str]]] = {
+    "quiz": (GeneratedQuiz, "questions"),
+    "outline": (LearningPathOutline, "chapters"),
+    "chapter": (GeneratedChapter, "sections"),
+    "chapters": (GeneratedChapters, "chapters"),
+    "course": (GeneratedCourse, None),
+}
+
+NUMBER = re.compile(r"-?(\d+(\.\d*)?|\.\d+)([eE][+-]?\d+)?")
+WORD = re.compile(r"[A-Za-z_$][\w$-]*")
+LITERALS = {"true": True, "false": False, "null": None, "True": True, "False": False, "None": None}
+ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f"}
+
+class StructuredOutputError(ValueError):
+    """The response could not be turned into a valid document."""
+
+class _Truncated(Exception):
+    """The input ended inside a value; ``partial`` holds what was complete."""
+
+    def __init__(self, partial: Any = None):
+        super().__init__()
+        self.partial = partial
+
+class _Parser:
+    def __init__(self, text: str, start: int):
+        self.text = text
+        self.i = start
+        self.repaired = False
+
+    def _skip(self) -> None:
+        text = self.text
+        while self.i < len(text):
+            if text[self.i].isspace():
+                self.i += 1
+            elif text.startswith("//", self.i):
+                end = text.find("\n", self.i)
+                self.i = len(text) if end < 0 else end
+                self.repaired = True
+            elif text.startswith("/*", self.i):
+                end = text.find("*/", self.i + 2)
+                self.i = len(text) if end < 0 else end + 2
+                self.repaired = True
+            else:
+                return
+
+    def _peek(self) -> Optional[str]:
+        self._skip()
+        return self.text[self.i] if self.i < len(self.text) else None
+
+    def value(self) -> Any:
+        char = self._peek()
+        if char is None:
+            raise _Truncated()
+        if char == "{":
+            return self._object()
+        if char == "[":
+            return self._array()
+        if char in "\"'":
+            return self._string()
+        match = NUMBER.match(self.text, self.i)
+        if match:
+            self.i = match.end()
+            if self.i >= len(self.text):
+                raise _Truncated()
+            number = match.group()
+            return float(number) if any(c in number for c in ".eE") else int(number)
+        match = WORD.match(self.text, self.i)
+        if match and match.group() in LITERALS:
+            self.i = match.end()
+            if self.i >= len(self.text):
+                raise _Truncated()
+            self.repaired |= match.group() not in ("true", "false", "null")
+            return LITERALS[match.group()]
+        raise StructuredOutputError(f"Unexpected {char!r} at position {self.i}")
+
+    def _string(self) -> str:
+        quote = self.text[self.i]
+        self.repaired |= quote == "'"
+        self.i += 1
+        chars = []
+        text = self.text
+        while self.i < len(text):
+            char = text[self.i]
+            self.i += 1
+            if char == quote:
+                return "".join(chars)
+            if char == "\\":
+                if self.i >= len(text):
+                    break
+                escaped = text[self.i]
+                self.i += 1
+                if escaped == "u" and re.fullmatch(r"[0-9a-fA-F]{4}", text[self.i:self.i + 4]):
+                    chars.append(chr(int(text[self.i:self.i + 4], 16)))
+                    self.i += 4
+                else:
+                    chars.append(ESCAPES.get(escaped, escaped))
+            else:
+                if char == "\n":
+                    self.repaired = True
+                chars.append(char)
+        raise _Truncated()
+
+    def _key(self) -> str:
+        if self.text[self.i] in "\"'":
+            return self._string()
+        match = WORD.match(self.text, self.i)
+        if not match:
+            raise StructuredOutputError(f"Expected a key at position {self.i}")
+        self.i = match.end()
+        self.repaired = True
+        return match.group()
+
+    def _separator(self, closing: str, has_items: bool) -> bool:
+        """Consume commas before the next item; True when the container closes."""
+        commas = 0
+        while self._peek() == ",":
+            self.i += 1
+            commas += 1
+        char = self._peek()
+        if char is None:
+            raise _Truncated()
+        if char == closing:
+            self.i += 1
+            self.repaired |= commas > 0
+            return True
+        # Doubled commas, a leading comma or a missing comma between items
+        self.repaired |= commas != (1 if has_items else 0)
+        return False
+
+    def _array(self) -> List[Any]:
+        self.i += 1
+        items: List[Any] = []
+        while True:
+            try:
+                if self._separator("]", bool(items)):
+                    return items
+                items.append(self.value())
+            except _Truncated:
+                # The incomplete trailing item is dropped
+                raise _Truncated(items)
+
+    def _object(self) -> Dict[str, Any]:
+        self.i += 1
+        result: Dict[str, Any] = {}
+        while True:
+            try:
+                if self._separator("}", bool(result)):
+                    return result
+                key = self._key()
+                if self._peek() is None:
+                    raise _Truncated()
+            except _Truncated:
+                raise _Truncated(result)
+            if self.text[self.i] != ":":
+                raise StructuredOutputError(f"Expected ':' after {key!r} at position {self.i}")
+            self.i += 1
+            try:
+                result[key] = self.value()
+            except _Truncated as truncated:
+                # Keep a cut-off list or object (its complete items are
+                # useful), but never a cut-off string or number
+                if isinstance(truncated.partial, (list, dict)):
+                    result[key] = truncated.partial
+                raise _Truncated(result)
+
+def _strip_fences(text: str) -> str:
+    text = text.strip()
+    fence = re.search(r"```[\w-]*\s*\n?(.*?)(```|$)", text, re.DOTALL)
+    return fence.group(1) if fence else text
+
+def repair_json(text: str) -> Tuple[Any, bool]:
+    """Parse a JSON object or array out of an AI response.
+
+    Returns ``(value, repaired)`` where ``repaired`` tells whether the
+    document itself was malformed; code fences and text around a valid
+    document do not count as a repair.
+    """
+    body = _strip_fences(text or "")
+    # Prose before the document may itself contain brackets ("see [1]: {...}"),
+    # so every opening bracket is tried in turn until one parses
+    starts = [match.start() for match in re.finditer(r"[{\[]", body)]
+    if not starts:
+        raise StructuredOutputError("Response contains no JSON object or array")
+    error = None
+    for start in starts:
+        try:
+            return json.JSONDecoder().raw_decode(body, start)[0], False
+        except json.JSONDecodeError:
+            pass
+
+        parser = _Parser(body, start)
+        try:
+            return parser.value(), True
+        except _Truncated as truncated:
+            if isinstance(truncated.partial, (list, dict)):
+                return truncated.partial, True
+            error = error or StructuredOutputError("Response ended before any complete value")
+        except StructuredOutputError as e:
+            error = error or e
+    raise error
+
+@dataclass
+class StructuredResult:
+    data: Dict[str, Any]
+    repaired: bool
+    dropped: int
+
+def _item_schema(schema: Type[BaseModel], items_field: str) -> Type[BaseModel]:
+    return schema.__fields__[items_field].type_
+
+def _valid_items(items: Any, item_schema: Type[BaseModel]) -> Tuple[List[Dict[str, Any]], int]:
+    if not isinstance(items, list):
+        return [], 0
+    valid, dropped = [], 0
+    for item in items:
+        try:
+            valid.append(item_schema.parse_obj(item).dict())
+        except ValidationError:
+            dropped += 1
+    return valid, dropped
+
+def parse_structured(text: str, kind: str, allow_empty: bool = False) -> StructuredResult:
+    """Repair, parse and validate a response against the schema for ``kind``.
+
+    Invalid items of the schema's list field are dropped and counted.
+    ``allow_empty`` accepts a document whose list ended up empty, so the
+    caller can ask for the missing items.
+    """
+    schema, items_field = SCHEMAS[kind]
+    value, repaired = repair_json(text)
+    if items_field and isinstance(value, list):
+        # A bare array of items instead of the wrapping object
+        value = {items_field: value}
+    if not isinstance(value, dict):
+        raise StructuredOutputError(f"Expected a JSON object for {kind}")
+
+    dropped = 0
+    if items_field:
+        items, dropped = _valid_items(value.get(items_field), _item_schema(schema, items_field))
+        if not items and not allow_empty:
+            raise StructuredOutputError(f"No valid {items_field} in {kind} response")
+        value = {**value, items_field: items}
+    try:
+        data = schema.parse_obj(value).dict()
+    except ValidationError as e:
+        raise StructuredOutputError(f"Invalid {kind} response: {str(e)}")
+    return StructuredResult(data, repaired, dropped)
+
+def _item_label(item: Dict[str, Any]) -> str:
+    for field in ("title", "question", "front"):
+        if item.get(field):
+            return str(item[field])
+    return json.dumps(item)[:80]
+
+class StructuredOutput:
+    """Request structured documents from a provider with as few re-asks as possible."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.parsed = 0
+        self.repaired = 0
+        self.partial = 0
+        self.failures = 0
+        self.retries = 0
+        self.top_up_requests = 0
+        self.retries_avoided = 0
+
+    def _count(self, **increments: int) -> None:
+        with self._lock:
+            for name, amount in increments.items():
+                setattr(self, name, getattr(self, name) + amount)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "parsed": self.parsed,
+                "repaired": self.repaired,
+                "repair_rate": round(self.repaired / self.parsed, 4) if self.parsed else 0.0,
+                "partial": self.partial,
+                "failures": self.failures,
+                "retries": self.retries,
+                "top_up_requests": self.top_up_requests,
+                "retries_avoided": self.retries_avoided,
+            }
+
+    def parse(self, text: str, kind: str, allow_empty: bool = False) -> StructuredResult:
+        """``parse_structured`` with the outcome recorded in the counters."""
+        try:
+            result = parse_structured(text, kind, allow_empty)
+        except StructuredOutputError:
+            self._count(failures=1)
+            raise
+        # Every repaired or partially valid response used to cost a full re-ask
+        salvaged = result.repaired or result.dropped > 0
+        self._count(
+            parsed=1,
+            repaired=int(result.repaired),
+            partial=int(result.dropped > 0),
+            retries_avoided=int(salvaged),
+        )
+        return result
+
+    async def generate(
+        self,
+        kind: str,
+        prompt: str,
+        call: Callable[[str], Awaitable[str]],
+        expected_items: Optional[int] = None,
+        max_retries: int = 2,
+    ) -> Dict[str, Any]:
+        """Ask ``call`` for a ``kind`` document and return it validated.
+
+        A response that cannot be salvaged at all is re-asked up to
+        ``max_retries`` times. If fewer than ``expected_items`` valid items
+        were recovered, only the missing items are requested.
+        """
+        _, items_field = SCHEMAS[kind]
+        attempt_prompt = prompt
+        for attempt in range(max_retries + 1):
+            response = await call(attempt_prompt)
+            try:
+                result = self.parse(response, kind, allow_empty=bool(expected_items))
+                break
+            except StructuredOutputError as e:
+                logger.warning(f"Unusable {kind} response on attempt {attempt + 1}: {str(e)}")
+                if attempt == max_retries:
+                    raise
+                self._count(retries=1)
+                attempt_prompt = (
+                    "IMPORTANT: Your previous response was not valid JSON. Return ONLY the JSON "
+                    f"document, with no text, markdown or code fences around it.\n\n{prompt}"
+                )
+
+        data = result.data
+        if items_field and expected_items:
+            items = data[items_field][:expected_items]
+            for _ in range(max_retries + 1):
+                missing = expected_items - len(items)
+                if missing <= 0:
+                    break
+                items.extend((await self._missing_items(kind, prompt, call, items, missing))[:missing])
+            if not items:
+                self._count(failures=1)
+                raise StructuredOutputError(f"No valid {items_field} in {kind} response")
+            data[items_field] = items
+        return data
+
+    async def _missing_items(
+        self,
+        kind: str,
+        prompt: str,
+        call: Callable[[str], Awaitable[str]],
+        items: List[Dict[str, Any]],
+        missing: int,
+    ) -> List[Dict[str, Any]]:
+        schema, items_field = SCHEMAS[kind]
+        self._count(top_up_requests=1)
+        existing = "; ".join(_item_label(item) for item in items) or "none"
+        response = await call(
+            f"{prompt}\n\nOnly {len(items)} valid {items_field} were received so far ({existing}). "
+            f"Return ONLY a JSON array with the {missing} missing {items_field}, in the same format, "
+            "without repeating the ones already received."
+        )
+        try:
+            value, _ = repair_json(response)
+        except StructuredOutputError as e:
+            logger.warning(f"Unusable follow-up {kind} response: {str(e)}")
+            return []
+        if isinstance(value, dict):
+            value = value.get(items_field, [value])
+        valid, _ = _valid_items(value, _item_schema(schema, items_field))
+        return valid
+
+structured_output = StructuredOutput()
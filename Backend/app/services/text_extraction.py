@@ -0,0 +1,203 @@
+"""Text extraction for uploaded files, so FILE content can ground the tutor.
+
+Uploads only store bytes (see ``blob_store``). Once an upload has committed,
+a ``content.extract_text`` job parses its files in a process pool (one
+process per CPU core unless ``EXTRACTION_WORKERS`` says otherwise), off the
+request path and outside the API process's GIL. The parsers are pure Python:
+pypdf for PDF, the DOCX XML read with zipfile and ElementTree, and a decoder
+for TXT.
+
+The normalized text is stored in ``extracted_texts`` under the file's
+SHA-256, so a file uploaded many times is parsed once. The course chunk
+index and the course context snapshots then use it like a TEXT body.
+
+Files uploaded before the pipeline existed can be backfilled with
+``python -m app.services.text_extraction``.
+"""
+import asyncio
+import logging
+import os
+import re
+import unicodedata
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from xml.etree import ElementTree
+from pypdf import PdfReader
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.db.writer import call_with_session, db_writer
+from app.models.content import Content
+from app.models.extracted_text import ExtractedText
+from app.models.job import Job
+from app.services import course_index
+from app.services.blob_store import blob_store
+from app.services.course_context import course_contexts
+from app.services.jobs import JobContext, job_handler, job_pool
+
+logger = logging.getLogger(__name__)
+
+JOB_TYPE = "content.extract_text"
+WORD = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+# Decompressed size of word/document.xml we are willing to parse
+MAX_DOCX_XML_BYTES = 64 * 1024 * 1024
+CONTROL_CHARS = re.compile(r"[\x00-\x08\x0b-\x1f\x7f]")
+
+def _txt(path: str) -> str:
+    with open(path, "rb") as file:
+        data = file.read()
+    if data.startswith((b"\xff\xfe", b"\xfe\xff")):
+        return data.decode("utf-16")
+    try:
+        return data.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        return data.decode("cp1252", errors="replace")
+
+def _pdf(path: str) -> str:
+    return "\n\n".join(page.extract_text() or "" for page in PdfReader(path).pages)
+
+def _docx(path: str) -> str:
+    with zipfile.ZipFile(path) as archive:
+        if archive.getinfo("word/document.xml").file_size > MAX_DOCX_XML_BYTES:
+            raise ValueError("word/document.xml is too large")
+        root = ElementTree.fromstring(archive.read("word/document.xml"))
+    paragraphs = []
+    for paragraph in root.iter(f"{WORD}p"):
+        parts = []
+        for node in paragraph.iter():
+            if node.tag == f"{WORD}t":
+                parts.append(node.text or "")
+            elif node.tag == f"{WORD}tab":
+                parts.append("\t")
+            elif node.tag in (f"{WORD}br", f"{WORD}cr"):
+                parts.append("\n")
+        paragraphs.append("".join(parts))
+    return "\n".join(paragraphs)
+
+# Extension -> parser; other uploads (images, legacy .doc) have no text to offer
+EXTRACTORS = {".txt": _txt, ".pdf": _pdf, ".docx": _docx}
+
+def normalize(text: str) -> str:
+    """Unicode-normalize, rejoin hyphenated line breaks and collapse whitespace."""
+    text = unicodedata.normalize("NFKC", text)
+    text = re.sub(r"(\w)-\n(\w)", r"\1\2", text)
+    text = CONTROL_CHARS.sub(" ", text)
+    text = re.sub(r"[ \t]+", " ", text)
+    text = re.sub(r" ?\n ?", "\n", text)
+    text = re.sub(r"\n{3,}", "\n\n", text)
+    return text.strip()
+
+def extract_file(path: str, extension: str, max_chars: int) -> Tuple[str, Optional[str]]:
+    """Parse one file; runs in a pool process. Returns (text, error)."""
+    extractor = EXTRACTORS.get(extension.lower())
+    if extractor is None:
+        return "", f"No text extractor for {extension!r} files"
+    try:
+        return normalize(extractor(path))[:max_chars], None
+    except Exception as e:
+        return "", f"{type(e).__name__}: {e}"
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+def _executor() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=settings.EXTRACTION_WORKERS or os.cpu_count())
+    return _pool
+
+def shutdown() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+
+async def extract_many(files: Iterable[Tuple[str, str]]) -> List[Tuple[str, Optional[str]]]:
+    """Parse (path, extension) pairs concurrently, one pool process each."""
+    loop = asyncio.get_running_loop()
+    return await asyncio.gather(*(
+        loop.run_in_executor(_executor(), extract_file, path, extension, settings.EXTRACTION_MAX_CHARS)
+        for path, extension in files
+    ))
+
+def file_extension(content: Any) -> str:
+    name = (content.meta or {}).get("filename") or content.title or ""
+    return os.path.splitext(name)[1].lower()
+
+def submit_extraction(
+    db: Session, contents: Iterable[Any], user_id: Optional[str], commit: bool = True
+) -> Optional[Job]:
+    """Queue text extraction for the uploaded files among ``contents``."""
+    files = {
+        content.blob_sha256: file_extension(content)
+        for content in contents
+        if content.blob_sha256 and file_extension(content) in EXTRACTORS
+    }
+    if not files:
+        return None
+    payload = {"files": [{"sha256": sha256, "extension": extension} for sha256, extension in files.items()]}
+    return job_pool.submit(db, JOB_TYPE, payload, user_id, commit=commit)
+
+def known_hashes(db: Session, hashes: List[str]) -> Set[str]:
+    rows = db.query(ExtractedText.sha256).filter(ExtractedText.sha256.in_(hashes)).all()
+    return {sha256 for sha256, in rows}
+
+def store_extractions(db: Session, extracted: Dict[str, Tuple[str, Optional[str]]], hashes: List[str]) -> Set[str]:
+    """Save new texts and re-chunk every course row using ``hashes``.
+
+    Returns the ids of the courses whose context changed.
+    """
+    for sha256, (text, error) in extracted.items():
+        db.merge(ExtractedText(sha256=sha256, text=text, error=error))
+    db.flush()
+    connection = db.connection()
+    course_ids = set()
+    for content in db.query(Content).filter(Content.blob_sha256.in_(hashes), Content.course_id.isnot(None)):
+        course_index.index_content(connection, content)
+        course_ids.add(content.course_id)
+    db.commit()
+    return course_ids
+
+@job_handler(JOB_TYPE)
+async def run_extraction_job(payload: Dict[str, Any], context: JobContext) -> Dict[str, Any]:
+    files = {item["sha256"]: item["extension"] for item in payload.get("files", [])}
+    hashes = list(files)
+    done = await asyncio.to_thread(call_with_session, SessionLocal, known_hashes, hashes)
+    pending = [sha256 for sha256 in hashes if sha256 not in done and blob_store.exists(sha256)]
+
+    results = await extract_many((blob_store.path(sha256), files[sha256]) for sha256 in pending)
+    extracted = dict(zip(pending, results))
+    for sha256, (_, error) in extracted.items():
+        if error:
+            logger.warning(f"No text extracted from blob {sha256}: {error}")
+
+    # Rows uploaded while another job extracted the same file are re-chunked too
+    course_ids = await db_writer.run(store_extractions, extracted, hashes)
+    for course_id in course_ids:
+        course_contexts.invalidate(course_id)
+    return {"extracted": len(extracted), "already_extracted": len(done), "courses": sorted(course_ids)}
+
+def backfill(db: Session) -> int:
+    """Extract every uploaded file that has no text yet. Returns the number parsed."""
+    rows = db.query(Content.blob_sha256, Content.title, Content.meta).filter(Content.blob_sha256.isnot(None)).all()
+    files = {row.blob_sha256: file_extension(row) for row in rows if file_extension(row) in EXTRACTORS}
+    done = known_hashes(db, list(files))
+    pending = [sha256 for sha256 in files if sha256 not in done and blob_store.exists(sha256)]
+
+    async def extract():
+        try:
+            return await extract_many((blob_store.path(sha256), files[sha256]) for sha256 in pending)
+        finally:
+            shutdown()
+
+    results = asyncio.run(extract())
+    for course_id in store_extractions(db, dict(zip(pending, results)), list(files)):
+        course_contexts.invalidate(course_id)
+    return len(pending)
+
+if __name__ == "__main__":
+    session = SessionLocal()
+    try:
+        print(f"Extracted text from {backfill(session)} files")
+    finally:
+        session.close()
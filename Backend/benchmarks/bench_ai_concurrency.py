@@ -0,0 +1,65 @@
+"""Concurrency benchmark for the ContentGenerator provider layer.
+
+Runs N concurrent ``generate_content`` calls against two local fake providers
+with the same simulated latency:
+
+* ``blocking`` sleeps with ``time.sleep``, which is what the synchronous
+  OpenAI/Gemini SDK calls did on the event loop.
+* ``async`` sleeps with ``asyncio.sleep``, like the async provider clients.
+
+Usage (from the Backend directory):
+    python -m benchmarks.bench_ai_concurrency --requests 20 --latency 0.25
+"""
+import argparse
+import asyncio
+import time
+
+from app.services.content_generator import AIProvider, ContentGenerator
+from app.services.generation_cache import GenerationCache
+
+class BlockingFakeProvider(AIProvider):
+    name = "blocking"
+
+    def __init__(self, latency: float, max_concurrency: int):
+        super().__init__(max_concurrency)
+        self.latency = latency
+
+    async def _chat(self, messages, **options):
+        time.sleep(self.latency)
+        return "summary"
+
+class AsyncFakeProvider(AIProvider):
+    name = "async"
+
+    def __init__(self, latency: float, max_concurrency: int):
+        super().__init__(max_concurrency)
+        self.latency = latency
+
+    async def _chat(self, messages, **options):
+        await asyncio.sleep(self.latency)
+        return "summary"
+
+async def run_batch(provider: AIProvider, requests: int) -> float:
+    # A fresh in-memory cache so every run measures provider calls
+    generator = ContentGenerator(providers={"openai": provider}, cache=GenerationCache(":memory:"))
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        generator.generate_content("summary", {"text": f"document {i}"}) for i in range(requests)
+    ))
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.25, help="Simulated provider latency in seconds")
+    parser.add_argument("--concurrency", type=int, default=8, help="Provider concurrency limit")
+    args = parser.parse_args()
+
+    print(f"{'provider':<10} {'requests':>8} {'wall (s)':>10} {'req/s':>8}")
+    for provider_cls in (BlockingFakeProvider, AsyncFakeProvider):
+        provider = provider_cls(args.latency, args.concurrency)
+        elapsed = asyncio.run(run_batch(provider, args.requests))
+        print(f"{provider.name:<10} {args.requests:>8} {elapsed:>10.2f} {args.requests / elapsed:>8.1f}")
+
+if __name__ == "__main__":
+    main()
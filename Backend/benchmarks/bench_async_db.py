@@ -0,0 +1,153 @@
+"""Async vs. sync sessions in async handlers under mixed read/write load.
+
+Simulates ``async def`` endpoints hitting a file-backed SQLite database with
+a mix of reads (a course and its content) and writes (inserting content).
+Requests arrive at ``--rate`` per second (Poisson arrivals) and latency is
+measured from the scheduled arrival, so time spent waiting for a blocked
+event loop counts. Compares:
+
+* ``sync``: a blocking ``Session`` used directly on the event loop, as the
+  async endpoints used to do.
+* ``async``: an ``AsyncSession`` on the aiosqlite engine.
+
+Besides request latency, a ticker task measures how long the event loop is
+stalled: with blocking sessions every commit (and its fsync) freezes all
+other in-flight requests, including ones that don't touch the database.
+
+Usage (from the Backend directory):
+    python -m benchmarks.bench_async_db --requests 2000 --rate 200 --write-ratio 0.2
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.models.content import Content
+from app.models.course import Course
+from app.models.enums import ContentType
+from app.models.user import User
+
+COURSES = 20
+
+def setup_database(path: str) -> list:
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    user = User(email="bench@example.com", username="bench", hashed_password="-")
+    db.add(user)
+    db.flush()
+    courses = [Course(title=f"Course {i}", description="Benchmark course", creator_id=user.id) for i in range(COURSES)]
+    db.add_all(courses)
+    db.flush()
+    for course in courses:
+        for i in range(20):
+            db.add(Content(title=f"Lesson {i}", content="word " * 200, content_type=ContentType.TEXT, course_id=course.id))
+    db.commit()
+    course_ids = [course.id for course in courses]
+    db.close()
+    engine.dispose()
+    return course_ids
+
+def sync_handler(factory):
+    async def handle(course_id: str, write: bool) -> None:
+        db = factory()
+        try:
+            if write:
+                db.add(Content(title="New", content="word " * 200, content_type=ContentType.TEXT, course_id=course_id))
+                db.commit()
+            else:
+                db.get(Course, course_id)
+                db.execute(select(Content).filter(Content.course_id == course_id)).scalars().all()
+        finally:
+            db.close()
+    return handle
+
+def async_handler(factory):
+    async def handle(course_id: str, write: bool) -> None:
+        async with factory() as db:
+            if write:
+                db.add(Content(title="New", content="word " * 200, content_type=ContentType.TEXT, course_id=course_id))
+                await db.commit()
+            else:
+                await db.get(Course, course_id)
+                (await db.execute(select(Content).filter(Content.course_id == course_id))).scalars().all()
+    return handle
+
+async def run_load(handle, course_ids, args) -> dict:
+    rng = random.Random(42)
+    work = []
+    arrival = 0.0
+    for _ in range(args.requests):
+        arrival += rng.expovariate(args.rate)
+        work.append((arrival, rng.choice(course_ids), rng.random() < args.write_ratio))
+    latencies = []
+    stalls = []
+    done = asyncio.Event()
+
+    async def ticker():
+        # Sleeps 1ms at a time; anything beyond that is time the loop was blocked
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            stalls.append(time.perf_counter() - start - 0.001)
+
+    async def request(arrival, course_id, write):
+        await asyncio.sleep(max(start + arrival - time.perf_counter(), 0))
+        await handle(course_id, write)
+        latencies.append(time.perf_counter() - start - arrival)
+
+    tick = asyncio.create_task(ticker())
+    start = time.perf_counter()
+    await asyncio.gather(*(request(*item) for item in work))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await tick
+
+    latencies.sort()
+    return {
+        "throughput": len(latencies) / elapsed,
+        "p50": statistics.median(latencies),
+        "p95": latencies[int(len(latencies) * 0.95) - 1],
+        "stall": max(stalls, default=0.0),
+    }
+
+async def main_async(args):
+    with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+        path = os.path.join(directory, "bench.db")
+        course_ids = setup_database(path)
+
+        engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+        sync_stats = await run_load(sync_handler(sessionmaker(bind=engine)), course_ids, args)
+        engine.dispose()
+
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        factory = sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+        async_stats = await run_load(async_handler(factory), course_ids, args)
+        await async_engine.dispose()
+
+    print(f"{'mode':>6} {'req/s':>8} {'p50 (ms)':>9} {'p95 (ms)':>9} {'max loop stall (ms)':>20}")
+    for mode, stats in (("sync", sync_stats), ("async", async_stats)):
+        print(
+            f"{mode:>6} {stats['throughput']:>8.0f} {stats['p50'] * 1000:>9.2f} "
+            f"{stats['p95'] * 1000:>9.2f} {stats['stall'] * 1000:>20.2f}"
+        )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--rate", type=float, default=200, help="Request arrivals per second")
+    parser.add_argument("--dir", default=None, help="Where to create the database (default: system temp dir)")
+    parser.add_argument("--write-ratio", type=float, default=0.2, help="Fraction of requests that write")
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+if __name__ == "__main__":
+    main()
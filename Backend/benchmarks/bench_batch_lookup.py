@@ -0,0 +1,93 @@
+"""Batch listing benchmark: ``meta.batch_id`` JSON filter versus the indexed ``batch_id``.
+
+Fills a fresh file database with ``--rows`` FILE content rows in batches of
+``--batch-size``, each row carrying its batch both ways (``meta.batch_id``,
+as before the ``content_batches`` table, and the ``batch_id`` column), then
+lists one batch:
+
+* ``meta json``: ``meta['batch_id'] == :id``; SQLite reads and parses the
+  JSON of every content row.
+* ``batch_id``: ``crud_content_async.get_by_batch``'s filter on the indexed
+  foreign key; reads only the batch's rows.
+
+Reports the median time per listing for each table size.
+
+Usage (from the Backend directory):
+    python -m benchmarks.bench_batch_lookup --rows 1000 10000 100000 --batch-size 20
+"""
+import argparse
+import datetime
+import os
+import statistics
+import tempfile
+import time
+import uuid
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.models.content import Content
+from app.models.content_batch import ContentBatch
+from app.models.enums import ContentType
+
+def by_meta(db, batch_id):
+    return db.execute(select(Content).filter(Content.meta["batch_id"].as_string() == batch_id)).scalars().all()
+
+def by_column(db, batch_id):
+    return db.execute(select(Content).filter(Content.batch_id == batch_id)).scalars().all()
+
+def fill(db, rows: int, batch_size: int) -> str:
+    now = datetime.datetime.utcnow()
+    batch_ids = [str(uuid.uuid4()) for _ in range(max(rows // batch_size, 1))]
+    db.bulk_insert_mappings(ContentBatch, [{"id": batch_id, "created_by": "bench"} for batch_id in batch_ids])
+    db.bulk_insert_mappings(Content, [
+        {
+            "id": str(uuid.uuid4()),
+            "title": f"upload-{i}.pdf",
+            "content": f"upload-{i}.pdf",
+            "content_type": ContentType.FILE.value,
+            "meta": {"filename": f"upload-{i}.pdf", "size": 1024, "batch_id": batch_ids[i // batch_size % len(batch_ids)]},
+            "batch_id": batch_ids[i // batch_size % len(batch_ids)],
+            "created_by": "bench",
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(rows)
+    ])
+    db.commit()
+    return batch_ids[len(batch_ids) // 2]
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000], help="Content rows in the table")
+    parser.add_argument("--batch-size", type=int, default=20, help="Files per batch")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed listings per case (median is reported)")
+    parser.add_argument("--dir", default=None, help="Where to create the databases (default: system temp dir)")
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'lookup':>10} {'time (ms)':>10} {'files':>6}")
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+            engine = create_engine(f"sqlite:///{os.path.join(directory, 'batches.db')}")
+            Base.metadata.create_all(bind=engine)
+            db = sessionmaker(bind=engine)()
+            batch_id = fill(db, rows, args.batch_size)
+            for name, fn in (("meta json", by_meta), ("batch_id", by_column)):
+                db.expunge_all()
+                files = len(fn(db, batch_id))
+                seconds = timed(lambda: (db.expunge_all(), fn(db, batch_id)), args.repeat)
+                print(f"{rows:>8} {name:>10} {seconds * 1000:>10.2f} {files:>6}")
+            db.close()
+            engine.dispose()
+
+if __name__ == "__main__":
+    main()
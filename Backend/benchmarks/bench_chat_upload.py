@@ -0,0 +1,116 @@
+"""Chat attachment benchmark: two-pass upload versus the single-pass pipeline.
+
+Runs ``--concurrency`` uploads of ``--size-kb`` each at once, every upload a
+distinct PDF named ``notes.pdf`` and spooled the way Starlette hands it to
+the endpoint (``UploadFile`` over a ``SpooledTemporaryFile``):
+
+* ``two-pass``: the previous ``chat.upload_file`` body: read everything to
+  check the size, seek back, read again while writing to
+  ``<timestamp>_<filename>``.
+* ``two-pass+hash``: the same, hashing during the second read to name the
+  file by content, i.e. what the two-pass flow costs with collision-proof
+  names.
+* ``single-pass``: ``BlobStore.put`` with the magic-byte check, which
+  checks, limits, hashes and writes in one loop under the content hash.
+
+Reports the median wall time per round, throughput, and how many distinct
+files survived (uploads with the same name in the same second overwrite each
+other under timestamped names).
+
+Usage (from the Backend directory):
+    python -m benchmarks.bench_chat_upload --concurrency 1 8 32 --size-kb 1024 8192
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+import aiofiles
+from starlette.datastructures import UploadFile
+
+from app.services.blob_store import BlobStore
+from app.services.file_signatures import check_signature
+
+MAX_FILE_SIZE = 10 * 1024 * 1024
+SPOOL_SIZE = 1024 * 1024  # Starlette keeps multipart files up to 1 MB in memory
+
+def make_upload(size: int) -> UploadFile:
+    spooled = tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE)
+    spooled.write(b"%PDF-1.7\n" + os.urandom(size - 9))
+    spooled.seek(0)
+    return UploadFile(spooled, filename="notes.pdf")
+
+async def two_pass(file: UploadFile, directory: str) -> None:
+    file_size = 0
+    chunk_size = 1024 * 1024
+    while chunk := await file.read(chunk_size):
+        file_size += len(chunk)
+        if file_size > MAX_FILE_SIZE:
+            raise ValueError("File too large")
+    await file.seek(0)
+    timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+    async with aiofiles.open(os.path.join(directory, f"{timestamp}_{file.filename}"), "wb") as out_file:
+        while chunk := await file.read(chunk_size):
+            await out_file.write(chunk)
+
+async def two_pass_hashed(file: UploadFile, directory: str) -> None:
+    file_size = 0
+    chunk_size = 1024 * 1024
+    while chunk := await file.read(chunk_size):
+        file_size += len(chunk)
+        if file_size > MAX_FILE_SIZE:
+            raise ValueError("File too large")
+    await file.seek(0)
+    digest = hashlib.sha256()
+    path = os.path.join(directory, uuid.uuid4().hex)
+    async with aiofiles.open(path, "wb") as out_file:
+        while chunk := await file.read(chunk_size):
+            digest.update(chunk)
+            await out_file.write(chunk)
+    os.replace(path, os.path.join(directory, digest.hexdigest()))
+
+async def single_pass(file: UploadFile, directory: str) -> None:
+    await BlobStore(directory, MAX_FILE_SIZE).put(file, check=lambda head: check_signature(".pdf", head))
+
+def stored_files(directory: str) -> int:
+    return sum(len(files) for root, _, files in os.walk(directory) if os.path.basename(root) != "tmp")
+
+def timed(handler, concurrency: int, size: int, repeat: int, parent: str):
+    samples, kept = [], []
+    for _ in range(repeat):
+        uploads = [make_upload(size) for _ in range(concurrency)]
+        with tempfile.TemporaryDirectory(dir=parent) as directory:
+            async def round_trip():
+                await asyncio.gather(*(handler(upload, directory) for upload in uploads))
+
+            start = time.perf_counter()
+            asyncio.run(round_trip())
+            samples.append(time.perf_counter() - start)
+            kept.append(stored_files(directory))
+        for upload in uploads:
+            upload.file.close()
+    return statistics.median(samples), min(kept)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32], help="Uploads in flight at once")
+    parser.add_argument("--size-kb", type=int, nargs="+", default=[1024, 8192], help="Upload sizes to time")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed rounds per case (median is reported)")
+    parser.add_argument("--dir", default=None, help="Where to write the files (default: system temp dir)")
+    args = parser.parse_args()
+
+    print(f"{'uploads':>7} {'size (KB)':>9} {'approach':>13} {'time (ms)':>10} {'MB/s':>8} {'files kept':>10}")
+    for size_kb in args.size_kb:
+        for concurrency in args.concurrency:
+            for name, handler in (("two-pass", two_pass), ("two-pass+hash", two_pass_hashed), ("single-pass", single_pass)):
+                seconds, kept = timed(handler, concurrency, size_kb * 1024, args.repeat, args.dir)
+                throughput = concurrency * size_kb / 1024 / seconds
+                print(f"{concurrency:>7} {size_kb:>9} {name:>13} {seconds * 1000:>10.1f} {throughput:>8.1f} {kept:>10}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Course context benchmark: whole-course prompt vs. retrieved top-k chunks.
+
+Builds synthetic courses of increasing size in an in-memory SQLite database,
+then for each course compares:
+
+* ``full``: concatenating every TEXT body, as chat prompts used to do.
+* ``top-k``: BM25 search over the ``content_chunks`` index.
+
+Reports the context size in characters (roughly 4 characters per prompt token)
+and the median time to assemble it, plus the time spent indexing.
+
+Usage (from the Backend directory):
+    python -m benchmarks.bench_course_context --sizes 10 100 1000 --words 400
+"""
+import argparse
+import random
+import statistics
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.base import Base
+from app.models.content import Content
+from app.models.enums import ContentType
+from app.services import course_index
+
+VOCABULARY = [f"term{i}" for i in range(5000)]
+
+def make_session():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+def populate(db, course_id: str, documents: int, words: int, rng: random.Random) -> float:
+    start = time.perf_counter()
+    for i in range(documents):
+        body = " ".join(rng.choices(VOCABULARY, k=words))
+        db.add(Content(title=f"Lesson {i}", content=body, content_type=ContentType.TEXT, course_id=course_id))
+    db.commit()
+    return time.perf_counter() - start
+
+def full_context(db, course_id: str) -> str:
+    contents = db.query(Content).filter(Content.course_id == course_id).all()
+    return "\n\n".join(f"Title: {c.title}\nContent: {c.content}" for c in contents)
+
+def median_time(fn, repeats: int):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return result, statistics.median(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000], help="Documents per course")
+    parser.add_argument("--words", type=int, default=400, help="Words per document")
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    db = make_session()
+    print(f"{'docs':>6} {'index (s)':>10} {'full chars':>12} {'full (ms)':>10} {'top-k chars':>12} {'top-k (ms)':>11}")
+    for size in args.sizes:
+        course_id = f"course-{size}"
+        indexing = populate(db, course_id, size, args.words, rng)
+        question = " ".join(rng.choices(VOCABULARY, k=8))
+
+        full, full_time = median_time(lambda: full_context(db, course_id), args.repeats)
+        db.expire_all()
+        top_k, top_k_time = median_time(
+            lambda: course_index.format_chunks(course_index.search(db, course_id, question)),
+            args.repeats
+        )
+        print(
+            f"{size:>6} {indexing:>10.2f} {len(full):>12,} {full_time * 1000:>10.2f} "
+            f"{len(top_k):>12,} {top_k_time * 1000:>11.2f}"
+        )
+    db.close()
+
+if __name__ == "__main__":
+    main()
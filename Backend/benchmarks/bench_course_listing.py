@@ -0,0 +1,86 @@
+"""Course content listing benchmark: with and without the content bodies.
+
+Fills a fresh file database with one course of ``--files`` uploads of
+``--size-kb`` each (stored base64 in ``content.content``, as uploads are),
+then lists it the way ``GET /courses/{id}/contents`` does:
+
+* ``bodies``: ``crud_content.get_by_course(include_body=True)`` and one
+  ``ContentListItem`` per row (the default ``include_body=true``).
+* ``metadata``: ``crud_content.get_summaries_by_course``, which never selects
+  the body column (``include_body=false``).
+
+Reports the median time and the peak Python allocation (tracemalloc) per
+listing.
+
+Usage (from the Backend directory):
+    python -m benchmarks.bench_course_listing --files 200 --size-kb 1024
+"""
+import argparse
+import base64
+import datetime
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.crud.crud_content import crud_content
+from app.db.base import Base
+from app.models.content import Content
+from app.models.course import Course
+from app.models.enums import ContentType
+from app.schemas.content import ContentListItem
+
+def with_bodies(db, course_id):
+    return [ContentListItem.from_orm(c) for c in crud_content.get_by_course(db, course_id, include_body=True)]
+
+def metadata_only(db, course_id):
+    return [ContentListItem.from_orm(c) for c in crud_content.get_summaries_by_course(db, course_id)]
+
+def timed(fn, repeat: int):
+    samples, peaks = [], []
+    for _ in range(repeat):
+        tracemalloc.start()
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return statistics.median(samples), max(peaks)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=200, help="Uploads in the course")
+    parser.add_argument("--size-kb", type=int, default=1024, help="Size of each upload before base64")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per listing (median is reported)")
+    parser.add_argument("--dir", default=None, help="Where to create the database (default: system temp dir)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'listing.db')}")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        course = Course(title="Bench course", creator_id="bench")
+        db.add(course)
+        db.flush()
+        body = base64.b64encode(os.urandom(args.size_kb * 1024)).decode()
+        for i in range(args.files):
+            db.add(Content(title=f"upload-{i}.bin", content=body, content_type=ContentType.FILE,
+                           meta={"size": args.size_kb * 1024}, course_id=course.id, created_by="bench",
+                           updated_at=datetime.datetime.utcnow()))
+        db.commit()
+        course_id = course.id
+
+        print(f"{'listing':>9} {'time (ms)':>10} {'peak (MB)':>10}")
+        for name, fn in (("bodies", with_bodies), ("metadata", metadata_only)):
+            db.expunge_all()
+            seconds, peak = timed(lambda: fn(db, course_id), args.repeat)
+            print(f"{name:>9} {seconds * 1000:>10.1f} {peak / 2**20:>10.1f}")
+        db.close()
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
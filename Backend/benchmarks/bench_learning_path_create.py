@@ -0,0 +1,83 @@
+"""Learning path creation benchmark: per-step commits versus one bulk insert.
+
+Creates a learning path with ``--steps`` step counts in a fresh file
+database, once per approach:
+
+* ``per-step``: the path, then ``crud_learning_path_step.create`` for each
+  step (add, commit and refresh per row).
+* ``bulk``: ``crud_learning_path.create``, which inserts the steps with
+  ``create_many`` (one executemany) in the path's transaction.
+
+Usage (from the Backend directory):
+    python -m benchmarks.bench_learning_path_create --steps 10 30 100 300 1000
+"""
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.crud.crud_learning_path import crud_learning_path, crud_learning_path_step
+from app.db.base import Base
+from app.models.enums import ContentType
+from app.models.user import User
+from app.schemas.learning_path import LearningPathCreate, LearningPathStepCreate
+
+def path_in(steps: int, with_steps: bool) -> LearningPathCreate:
+    return LearningPathCreate(
+        title="Bench path",
+        difficulty_level="beginner",
+        estimated_duration=60,
+        steps=[
+            LearningPathStepCreate(title=f"Chapter {i}", description="d", content_type=ContentType.TEXT, content="c", order=i + 1)
+            for i in range(steps)
+        ] if with_steps else None
+    )
+
+def per_step(db, steps: int) -> None:
+    path = crud_learning_path.create(db, obj_in=path_in(0, False), created_by="bench")
+    for step in path_in(steps, True).steps:
+        crud_learning_path_step.create(db, obj_in=step, learning_path_id=path.id)
+
+def bulk(db, steps: int) -> None:
+    crud_learning_path.create(db, obj_in=path_in(steps, True), created_by="bench")
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        # crud_learning_path.create prints debug lines; keep them out of the table
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steps", type=int, nargs="+", default=[10, 30, 100, 300, 1000], help="Step counts to time")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per step count (median is reported)")
+    parser.add_argument("--dir", default=None, help="Where to create the database (default: system temp dir)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'paths.db')}")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        db.add(User(id="bench", email="bench@example.com", username="bench", hashed_password="x"))
+        db.commit()
+
+        print(f"{'steps':>6} {'per-step (ms)':>14} {'bulk (ms)':>10} {'speedup':>8}")
+        for steps in args.steps:
+            slow = timed(lambda: per_step(db, steps), args.repeat)
+            fast = timed(lambda: bulk(db, steps), args.repeat)
+            print(f"{steps:>6} {slow * 1000:>14.1f} {fast * 1000:>10.1f} {slow / fast:>7.1f}x")
+        db.close()
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Chat search benchmark: ILIKE scan versus the FTS5 message index.
+
+Seeds ``--messages`` messages spread over ``--groups`` chat groups in a fresh
+file database (the FTS index is filled by its triggers as rows are inserted),
+then times each query against one group with:
+
+* ``ilike``: the old ``content ILIKE '%word%'`` filter, newest first.
+* ``fts``: ``message_search.search``, BM25-ranked with snippets.
+
+Words are drawn from a Zipf-like vocabulary, so the queries cover a common
+word, a rare word, two words together and a prefix.
+
+Usage (from the Backend directory):
+    python -m benchmarks.bench_message_search --messages 1000000 --groups 20
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.models.chat import Message
+from app.services import message_search
+
+VOCABULARY = [f"w{i:04d}" for i in range(5000)]
+WEIGHTS = [1 / (rank + 1) for rank in range(len(VOCABULARY))]
+QUERIES = {
+    "common word": ("w0001", "w0001"),
+    "rare word": ("w3999", "w3999"),
+    "two words": ("w0002 w0010", "w0002"),
+    "prefix": ("w04*", "w04"),
+}
+
+def seed(engine, messages: int, groups: int, batch: int = 50000) -> None:
+    rng = random.Random(7)
+    start = datetime(2024, 1, 1)
+    with engine.begin() as connection:
+        connection.exec_driver_sql(
+            "INSERT INTO users (id, email, username, hashed_password) VALUES ('bench', 'bench@example.com', 'bench', 'x')"
+        )
+        for group in range(1, groups + 1):
+            connection.exec_driver_sql(
+                "INSERT INTO chat_groups (id, name, created_by) VALUES (?, ?, 'bench@example.com')", (group, f"group {group}")
+            )
+    done = 0
+    while done < messages:
+        rows = []
+        for i in range(done, min(done + batch, messages)):
+            words = rng.choices(VOCABULARY, WEIGHTS, k=rng.randint(6, 20))
+            created = (start + timedelta(seconds=i)).strftime("%Y-%m-%d %H:%M:%S.%f")
+            rows.append((i % groups + 1, "bench@example.com", " ".join(words), created))
+        with engine.begin() as connection:
+            connection.exec_driver_sql(
+                "INSERT INTO messages (group_id, sender_id, content, created_at) VALUES (?, ?, ?, ?)", rows
+            )
+        done += len(rows)
+
+def timed(fn, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=1000000, help="Messages to seed")
+    parser.add_argument("--groups", type=int, default=20, help="Chat groups the messages are spread over")
+    parser.add_argument("--limit", type=int, default=50, help="Results per search")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per query (median is reported)")
+    parser.add_argument("--dir", default=None, help="Where to create the database (default: system temp dir)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'search.db')}")
+        Base.metadata.create_all(bind=engine)
+        started = time.perf_counter()
+        seed(engine, args.messages, args.groups)
+        print(f"Seeded {args.messages} messages in {time.perf_counter() - started:.1f}s")
+        db = sessionmaker(bind=engine)()
+
+        print(f"{'query':>12} {'ilike (ms)':>11} {'fts (ms)':>9} {'speedup':>8}")
+        for name, (fts_query, like_word) in QUERIES.items():
+            def by_ilike():
+                return db.query(Message).filter(
+                    Message.group_id == 1,
+                    Message.content.ilike(f"%{like_word}%")
+                ).order_by(Message.created_at.desc()).limit(args.limit).all()
+
+            def by_fts():
+                return message_search.search(db, 1, fts_query, limit=args.limit)
+
+            like_time, _ = timed(by_ilike, args.repeat)
+            fts_time, _ = timed(by_fts, args.repeat)
+            print(f"{name:>12} {like_time * 1000:>11.1f} {fts_time * 1000:>9.1f} {like_time / fts_time:>7.1f}x")
+        db.close()
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
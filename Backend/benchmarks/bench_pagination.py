@@ -0,0 +1,86 @@
+"""Deep-page benchmark: OFFSET versus cursor pagination for group messages.
+
+Seeds one chat group with ``--messages`` messages in a fresh file database,
+then times fetching a ``--limit``-row page at several depths, once with the
+old ``ORDER BY created_at DESC OFFSET n`` query and once with
+``chat.get_group_messages`` following a cursor taken at that depth. The OFFSET
+query reads and throws away every row before the page; the cursor query seeks
+to it through the (group_id, created_at) index.
+
+Usage (from the Backend directory):
+    python -m benchmarks.bench_pagination --messages 200000 --limit 50
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.crud import chat as chat_crud
+from app.crud.pagination import decode_cursor, encode_cursor
+from app.db.base import Base
+from app.models.chat import ChatGroup, Message
+from app.models.user import User
+
+def seed(db, messages: int) -> int:
+    db.add(User(id="bench", email="bench@example.com", username="bench", hashed_password="x"))
+    group = ChatGroup(name="bench", created_by="bench@example.com")
+    db.add(group)
+    db.flush()
+    start = datetime(2024, 1, 1)
+    db.bulk_insert_mappings(Message, [
+        {"group_id": group.id, "sender_id": "bench@example.com", "content": f"message {i}",
+         "created_at": start + timedelta(milliseconds=i)}
+        for i in range(messages)
+    ])
+    db.commit()
+    return group.id
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=200000, help="Messages in the group")
+    parser.add_argument("--limit", type=int, default=50, help="Rows per page")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per depth (median is reported)")
+    parser.add_argument("--dir", default=None, help="Where to create the database (default: system temp dir)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'pagination.db')}")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        group_id = seed(db, args.messages)
+
+        print(f"{'depth':>9} {'offset (ms)':>12} {'cursor (ms)':>12}")
+        for depth in (0, args.messages // 100, args.messages // 10, args.messages // 2, args.messages - args.limit):
+            def by_offset():
+                db.query(Message).filter(Message.group_id == group_id)\
+                    .order_by(Message.created_at.desc()).offset(depth).limit(args.limit).all()
+
+            cursor = None
+            if depth:
+                # The cursor a client would hold after reading `depth` rows
+                row = db.query(Message).filter(Message.group_id == group_id)\
+                    .order_by(Message.created_at.desc(), Message.id.desc()).offset(depth - 1).first()
+                cursor = decode_cursor(encode_cursor(row))
+
+            def by_cursor():
+                chat_crud.get_group_messages(db, group_id, cursor, args.limit)
+
+            print(f"{depth:>9} {timed(by_offset, args.repeat) * 1000:>12.2f} {timed(by_cursor, args.repeat) * 1000:>12.2f}")
+        db.close()
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Write-heavy SQLite benchmark: chat messages and progress rows.
+
+``--writers`` threads each store ``--writes`` rows, alternating chat messages
+and learning path progress the way the chat and progress endpoints do (one
+session and one commit per request), while ``--readers`` threads keep
+loading a group's latest messages. Runs the same load against a fresh file
+database for each setup:
+
+* ``default``: SQLite's defaults (rollback journal, full fsync per commit),
+  i.e. the engine before the production profile.
+* ``production``: the ``SQLITE_PROFILE=production`` pragmas (WAL,
+  synchronous=NORMAL, page cache, mmap, busy_timeout).
+* ``production+writer``: the same pragmas with writes going through the
+  single-writer queue (``SQLITE_SINGLE_WRITER=true``).
+
+Reports write throughput, "database is locked" failures and read latency.
+
+Usage (from the Backend directory):
+    python -m benchmarks.bench_sqlite_writes --writers 8 --writes 200 --readers 2
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.crud import chat as chat_crud
+from app.crud.crud_progress import crud_progress
+from app.db.base import Base
+from app.db.sqlite import production_pragmas, tune
+from app.db.writer import SingleWriter, call_with_session
+from app.schemas.chat import MessageCreate
+from app.schemas.progress import ProgressCreate
+
+SETUPS = [
+    ("default", False, False),
+    ("production", True, False),
+    ("production+writer", True, True),
+]
+
+def write(run, worker: int, i: int) -> None:
+    if i % 2:
+        run(chat_crud.create_message, MessageCreate(group_id=1, content=f"message {worker}-{i}"), f"user{worker}@example.com")
+    else:
+        progress = ProgressCreate(learning_path_id="path", step_id=f"step-{i}", completed=True)
+        run(crud_progress.create, obj_in=progress, user_id=f"user-{worker}")
+
+def run_setup(directory: str, name: str, tuned: bool, single_writer: bool, args) -> dict:
+    path = os.path.join(directory, f"{name}.db")
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    if tuned:
+        tune(engine, production_pragmas())
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+    writer = SingleWriter(factory, enabled=single_writer)
+
+    locked = []
+    read_latencies = []
+    done = threading.Event()
+
+    def writer_thread(worker: int):
+        for i in range(args.writes):
+            try:
+                write(writer.run_sync, worker, i)
+            except OperationalError as e:
+                if "locked" not in str(e):
+                    raise
+                locked.append(1)
+
+    def reader_thread():
+        while not done.is_set():
+            start = time.perf_counter()
+            call_with_session(factory, chat_crud.get_group_messages, 1)
+            read_latencies.append(time.perf_counter() - start)
+
+    readers = [threading.Thread(target=reader_thread) for _ in range(args.readers)]
+    writers = [threading.Thread(target=writer_thread, args=(w,)) for w in range(args.writers)]
+    for thread in readers:
+        thread.start()
+    start = time.perf_counter()
+    for thread in writers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    done.set()
+    for thread in readers:
+        thread.join()
+    writer.stop()
+    engine.dispose()
+
+    read_latencies.sort()
+    attempted = args.writers * args.writes
+    return {
+        "writes_per_s": (attempted - len(locked)) / elapsed,
+        "locked": len(locked),
+        "read_p50": statistics.median(read_latencies) if read_latencies else 0.0,
+        "read_p95": read_latencies[int(len(read_latencies) * 0.95) - 1] if read_latencies else 0.0,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, default=8, help="Concurrent writing threads")
+    parser.add_argument("--writes", type=int, default=200, help="Writes per thread")
+    parser.add_argument("--readers", type=int, default=2, help="Concurrent reading threads")
+    parser.add_argument("--dir", default=None, help="Where to create the databases (default: system temp dir)")
+    args = parser.parse_args()
+
+    print(f"{'setup':>18} {'writes/s':>9} {'locked':>7} {'read p50 (ms)':>14} {'read p95 (ms)':>14}")
+    with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+        for name, tuned, single_writer in SETUPS:
+            stats = run_setup(directory, name, tuned, single_writer, args)
+            print(
+                f"{name:>18} {stats['writes_per_s']:>9.0f} {stats['locked']:>7} "
+                f"{stats['read_p50'] * 1000:>14.2f} {stats['read_p95'] * 1000:>14.2f}"
+            )
+
+if __name__ == "__main__":
+    main()
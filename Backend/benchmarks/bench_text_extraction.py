@@ -0,0 +1,96 @@
+"""Text extraction benchmark: files parsed per second against pool size.
+
+Writes ``--files`` distinct PDFs of ``--pages`` pages each and parses them
+all with ``text_extraction.extract_many`` (the path the extraction job uses)
+for every ``--workers`` pool size. ``inline`` parses them one after another in
+the calling process, i.e. what extracting inside the request handler would
+cost. Parsing is CPU-bound pure Python, so throughput grows with the pool
+only up to the number of cores (``os.cpu_count()`` is printed for reference).
+
+Usage (from the Backend directory):
+    python -m benchmarks.bench_text_extraction --files 32 --pages 20 --workers 1 2 4
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from app.core.config import settings
+from app.services import text_extraction
+
+def make_pdf(pages: int, seed: int) -> bytes:
+    line = f"File {seed} explains photosynthesis, respiration and the Krebs cycle in detail."
+    streams = [
+        "BT /F1 10 Tf 50 780 Td 12 TL " + " ".join(f"({line} {page}.{row}) '" for row in range(60)) + " ET"
+        for page in range(pages)
+    ]
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for stream in streams:
+        data = stream.encode()
+        objects.append(b"<< /Length %d >>\nstream\n" % len(data) + data + b"\nendstream")
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (len(objects))
+        )
+        kids.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [" + b" ".join(kids) + b"] /Count %d >>" % pages
+    out, offsets = b"%PDF-1.4\n", []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return out
+
+def timed(run, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=32, help="Distinct PDFs to parse per round")
+    parser.add_argument("--pages", type=int, default=20, help="Pages per PDF")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="Pool sizes to time")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed rounds per case (median is reported)")
+    parser.add_argument("--dir", default=None, help="Where to write the PDFs (default: system temp dir)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+        paths = []
+        for seed in range(args.files):
+            path = os.path.join(directory, f"{seed}.pdf")
+            with open(path, "wb") as file:
+                file.write(make_pdf(args.pages, seed))
+            paths.append(path)
+        files = [(path, ".pdf") for path in paths]
+
+        print(f"{os.cpu_count()} CPU cores, {args.files} files x {args.pages} pages")
+        print(f"{'workers':>8} {'time (ms)':>10} {'files/s':>8}")
+
+        def inline():
+            for path in paths:
+                text_extraction.extract_file(path, ".pdf", settings.EXTRACTION_MAX_CHARS)
+
+        seconds = timed(inline, args.repeat)
+        print(f"{'inline':>8} {seconds * 1000:>10.1f} {args.files / seconds:>8.1f}")
+
+        for workers in args.workers:
+            settings.EXTRACTION_WORKERS = workers
+            text_extraction.shutdown()
+            # Start the processes before timing
+            asyncio.run(text_extraction.extract_many(files[:workers]))
+            seconds = timed(lambda: asyncio.run(text_extraction.extract_many(files)), args.repeat)
+            print(f"{workers:>8} {seconds * 1000:>10.1f} {args.files / seconds:>8.1f}")
+        text_extraction.shutdown()
+
+if __name__ == "__main__":
+    main()
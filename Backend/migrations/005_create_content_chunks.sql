@@ -0,0 +1,10 @@
+-- Migration: Full-text chunk index used for course context retrieval
+-- Ranked with bm25(); only the body column carries weight.
+-- Backfill existing content afterwards with: python -m app.services.course_index
+CREATE VIRTUAL TABLE IF NOT EXISTS content_chunks USING fts5(
+    body,
+    title UNINDEXED,
+    course_id,
+    content_id,
+    tokenize = 'porter unicode61'
+);
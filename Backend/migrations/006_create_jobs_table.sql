@@ -0,0 +1,23 @@
+-- Migration: Durable background jobs (course/learning path generation, outline content, video downloads)
+-- Jobs left 'running' by a stopped process are re-queued when the worker pool starts.
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    job_type TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    payload JSON,
+    result JSON,
+    error TEXT,
+    progress FLOAT DEFAULT 0,
+    progress_message TEXT,
+    attempts INTEGER DEFAULT 0,
+    max_attempts INTEGER DEFAULT 1,
+    run_after DATETIME,
+    created_by TEXT REFERENCES users(id),
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME,
+    started_at DATETIME,
+    finished_at DATETIME
+);
+CREATE INDEX IF NOT EXISTS ix_jobs_id ON jobs (id);
+CREATE INDEX IF NOT EXISTS ix_jobs_status ON jobs (status);
+CREATE INDEX IF NOT EXISTS ix_jobs_created_by ON jobs (created_by);
@@ -0,0 +1,18 @@
+-- Migration: Indexes for the hot filters (chat, progress, course content, quiz attempts, YouTube list)
+-- tests/crud/test_query_plans.py fails when one of these queries falls back to a full table scan.
+CREATE INDEX IF NOT EXISTS ix_content_course_id_content_type ON content (course_id, content_type);
+CREATE INDEX IF NOT EXISTS ix_learning_paths_course_id ON learning_paths (course_id);
+CREATE INDEX IF NOT EXISTS ix_learning_path_steps_path_id_order ON learning_path_steps (learning_path_id, "order");
+CREATE INDEX IF NOT EXISTS ix_user_progress_user_path_step ON user_progress (user_id, learning_path_id, step_id);
+CREATE INDEX IF NOT EXISTS ix_messages_group_id_created_at ON messages (group_id, created_at);
+CREATE INDEX IF NOT EXISTS ix_group_members_user_id ON group_members (user_id);
+CREATE INDEX IF NOT EXISTS ix_group_members_group_id_user_id ON group_members (group_id, user_id);
+CREATE INDEX IF NOT EXISTS ix_message_reads_message_id ON message_reads (message_id);
+CREATE INDEX IF NOT EXISTS ix_quiz_attempts_user_id_quiz_id ON quiz_attempts (user_id, quiz_id);
+
+-- Partial index: only transcribed videos, in list order
+CREATE INDEX IF NOT EXISTS ix_youtube_content_transcribed_created_at ON youtube_content (created_at)
+    WHERE transcript IS NOT NULL;
+
+-- Refresh the planner statistics
+ANALYZE;
@@ -0,0 +1,11 @@
+-- Migration: Indexes in (created_at, id) order for cursor-paginated lists
+-- Messages need none: (group_id, created_at) already ends in the integer rowid id.
+CREATE INDEX IF NOT EXISTS ix_courses_created_at_id ON courses (created_at, id);
+CREATE INDEX IF NOT EXISTS ix_quizzes_created_at_id ON quizzes (created_at, id);
+CREATE INDEX IF NOT EXISTS ix_flashcards_created_at_id ON flashcards (created_at, id);
+CREATE INDEX IF NOT EXISTS ix_exams_created_at_id ON exams (created_at, id);
+
+-- The transcribed-videos index gains id as the tie-breaker
+DROP INDEX IF EXISTS ix_youtube_content_transcribed_created_at;
+CREATE INDEX IF NOT EXISTS ix_youtube_content_transcribed_created_at_id ON youtube_content (created_at, id)
+    WHERE transcript IS NOT NULL;
@@ -0,0 +1,28 @@
+-- Migration: Full-text search over chat messages
+-- External-content FTS5 table kept in sync with messages by triggers; only content is ranked by bm25().
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+    content,
+    group_id,
+    content = 'messages',
+    content_rowid = 'id',
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+
+CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages BEGIN
+    INSERT INTO messages_fts (rowid, content, group_id) VALUES (new.id, new.content, new.group_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON messages BEGIN
+    INSERT INTO messages_fts (messages_fts, rowid, content, group_id)
+    VALUES ('delete', old.id, old.content, old.group_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS messages_fts_update AFTER UPDATE OF content, group_id ON messages BEGIN
+    INSERT INTO messages_fts (messages_fts, rowid, content, group_id)
+    VALUES ('delete', old.id, old.content, old.group_id);
+    INSERT INTO messages_fts (rowid, content, group_id) VALUES (new.id, new.content, new.group_id);
+END;
+
+-- Index the existing messages
+INSERT INTO messages_fts (messages_fts) VALUES ('rebuild');
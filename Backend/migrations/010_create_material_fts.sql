@@ -0,0 +1,33 @@
+-- Migration: Full-text search over course material
+-- One FTS5 document per course, TEXT content body, VIDEO content transcript and transcribed YouTube video.
+-- bm25() weighs title and body only; kind, source_id, course_id and creator_id are filter columns.
+-- Kept up to date by the mapper events in app.services.material_search.
+CREATE VIRTUAL TABLE IF NOT EXISTS material_fts USING fts5(
+    title,
+    body,
+    kind,
+    source_id,
+    course_id,
+    creator_id,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+
+-- Index the existing rows
+DELETE FROM material_fts;
+
+INSERT INTO material_fts (title, body, kind, source_id, course_id, creator_id)
+SELECT title, trim(coalesce(sub_title, '') || char(10) || coalesce(description, ''), char(10)),
+       'course', id, id, creator_id
+FROM courses;
+
+INSERT INTO material_fts (title, body, kind, source_id, course_id, creator_id)
+SELECT title, body, kind, id, course_id, created_by FROM (
+    SELECT title, lower(content_type) AS kind, id, course_id, created_by,
+           CASE lower(content_type) WHEN 'text' THEN content ELSE json_extract(meta, '$.transcript') END AS body
+    FROM content WHERE lower(content_type) IN ('text', 'video')
+) WHERE body != '';
+
+INSERT INTO material_fts (title, body, kind, source_id, course_id, creator_id)
+SELECT title, transcript, 'youtube', id, NULL, created_by
+FROM youtube_content WHERE transcript != '';
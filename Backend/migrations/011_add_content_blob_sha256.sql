@@ -0,0 +1,3 @@
+-- Migration: Uploaded files live in the content-addressed blob store; content rows reference them by hash
+ALTER TABLE content ADD COLUMN blob_sha256 VARCHAR(64);
+CREATE INDEX IF NOT EXISTS ix_content_blob_sha256 ON content (blob_sha256);
@@ -0,0 +1,7 @@
+-- Migration: Text extracted from uploaded files, keyed by the blob hash so identical files are extracted once
+CREATE TABLE IF NOT EXISTS extracted_texts (
+    sha256 VARCHAR(64) PRIMARY KEY,
+    text TEXT NOT NULL DEFAULT '',
+    error TEXT,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
@@ -0,0 +1,25 @@
+-- Migration: Upload batches get their own table; content rows reference them through an indexed batch_id
+-- instead of meta.batch_id, so listing a batch no longer reads and parses every content row.
+CREATE TABLE IF NOT EXISTS content_batches (
+    id TEXT PRIMARY KEY,
+    name TEXT,
+    description TEXT,
+    created_by TEXT REFERENCES users(id),
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME
+);
+CREATE INDEX IF NOT EXISTS ix_content_batches_id ON content_batches (id);
+CREATE INDEX IF NOT EXISTS ix_content_batches_created_by ON content_batches (created_by);
+
+ALTER TABLE content ADD COLUMN batch_id TEXT REFERENCES content_batches(id);
+CREATE INDEX IF NOT EXISTS ix_content_batch_id ON content (batch_id);
+
+-- Batches recorded only in meta.batch_id before this migration
+INSERT OR IGNORE INTO content_batches (id, created_by, created_at)
+SELECT json_extract(meta, '$.batch_id'), MIN(created_by), MIN(created_at)
+FROM content
+WHERE json_extract(meta, '$.batch_id') IS NOT NULL
+GROUP BY json_extract(meta, '$.batch_id');
+
+UPDATE content SET batch_id = json_extract(meta, '$.batch_id')
+WHERE batch_id IS NULL AND json_extract(meta, '$.batch_id') IS NOT NULL;
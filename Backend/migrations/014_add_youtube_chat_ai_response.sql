@@ -0,0 +1,2 @@
+-- Migration: Store the assistant's answer next to the user's question in YouTube video chats
+ALTER TABLE youtube_chat_messages ADD COLUMN ai_response TEXT;
@@ -8,7 +8,7 @@ import json
 
 @pytest.fixture(autouse=True)
 def mock_content_generator(monkeypatch):
-    async def mock_generate_content(self, content_type, parameters, provider="openai"):
+    async def mock_generate_content(self, content_type, parameters, provider="openai", use_cache=True):
         if content_type == "quiz":
             return {"title": "Quiz Title", "content": json.dumps({"questions": [{"question": "Q1", "options": ["A", "B", "C"], "correct_answer": "A"}]}), "meta": {}}
         elif content_type == "summary":
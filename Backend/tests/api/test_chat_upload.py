@@ -0,0 +1,45 @@
+import hashlib
+import pytest
+from app.api.v1.endpoints import chat
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 100
+
+@pytest.fixture
+def group_id(client, test_headers, tmp_path, monkeypatch):
+    monkeypatch.setattr(chat.chat_files, "root", str(tmp_path / "uploads"))
+    response = client.post("/api/v1/chat/groups", json={"name": "Study group"}, headers=test_headers)
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+def upload(client, headers, group_id, name, data):
+    return client.post(f"/api/v1/chat/groups/{group_id}/files", files={"file": (name, data)}, headers=headers)
+
+def test_shared_files_are_named_by_content_hash(client, test_headers, group_id, tmp_path):
+    first = upload(client, test_headers, group_id, "diagram.png", PNG)
+    again = upload(client, test_headers, group_id, "copy.png", PNG)
+
+    assert first.status_code == 200, first.text
+    digest = hashlib.sha256(PNG).hexdigest()
+    assert first.json()["file_url"] == f"/uploads/{digest[:2]}/{digest[2:4]}/{digest}"
+    assert again.json()["file_url"] == first.json()["file_url"]
+    assert (tmp_path / "uploads" / digest[:2] / digest[2:4] / digest).read_bytes() == PNG
+
+@pytest.mark.parametrize("name, data, detail", [
+    ("script.exe", b"MZ", "File type not allowed"),
+    ("photo.png", b"%PDF-1.7 not a png", "does not look like a .png file"),
+    ("notes.txt", b"text\x00with a NUL", "NUL"),
+])
+def test_rejected_files(client, test_headers, group_id, name, data, detail):
+    response = upload(client, test_headers, group_id, name, data)
+
+    assert response.status_code == 400
+    assert detail in response.json()["detail"]
+
+def test_oversize_files_are_rejected(client, test_headers, group_id, monkeypatch, tmp_path):
+    monkeypatch.setattr(chat.chat_files, "max_size", 1000)
+
+    response = upload(client, test_headers, group_id, "big.txt", b"x" * 5000)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "File too large"
+    assert list((tmp_path / "uploads" / "tmp").iterdir()) == []
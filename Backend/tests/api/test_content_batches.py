@@ -0,0 +1,52 @@
+import asyncio
+from app.services import content_service
+
+def upload_batch(client, headers, names, **form):
+    files = [("files", (name, f"body of {name}".encode(), "text/plain")) for name in names]
+    return client.post("/api/v1/content/batch", files=files, data=form, headers=headers)
+
+def test_batch_is_created_listed_and_extended(client, test_headers):
+    created = upload_batch(client, test_headers, ["a.txt", "b.txt"], name="Week 1")
+    assert created.status_code == 200, created.text
+    batch_id = created.json()["batch_id"]
+    assert created.json()["name"] == "Week 1"
+    assert [f["title"] for f in created.json()["files"]] == ["a.txt", "b.txt"]
+    assert all(f["batch_id"] == batch_id for f in created.json()["files"])
+
+    added = client.post(
+        f"/api/v1/content/batch/{batch_id}/files",
+        files=[("files", ("c.txt", b"c", "text/plain"))],
+        headers=test_headers
+    )
+    assert added.status_code == 200, added.text
+    assert [f["title"] for f in added.json()["added_files"]] == ["c.txt"]
+
+    listed = client.get(f"/api/v1/content/batch/{batch_id}", headers=test_headers)
+    assert listed.status_code == 200
+    assert sorted(f["title"] for f in listed.json()["files"]) == ["a.txt", "b.txt", "c.txt"]
+
+def test_unknown_batches_are_not_found(client, test_headers):
+    assert client.get("/api/v1/content/batch/missing", headers=test_headers).status_code == 404
+    response = client.post(
+        "/api/v1/content/batch/missing/files", files=[("files", ("c.txt", b"c", "text/plain"))], headers=test_headers
+    )
+    assert response.status_code == 404
+
+def test_files_of_a_batch_are_stored_concurrently(monkeypatch):
+    in_flight, peak = 0, 0
+
+    async def slow_store(file, **fields):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return file
+
+    monkeypatch.setattr(content_service, "store_file", slow_store)
+    files = [type("Upload", (), {"filename": f"{i}.txt"})() for i in range(20)]
+
+    stored = asyncio.run(content_service.store_files(files))
+
+    assert stored == files
+    assert peak == content_service.UPLOAD_CONCURRENCY
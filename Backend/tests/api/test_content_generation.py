@@ -0,0 +1,155 @@
+import asyncio
+import json
+import pytest
+from app.api.v1.endpoints import content as content_endpoint
+from app.crud.crud_job import crud_job
+from app.db.writer import db_writer
+from app.services.content_generator import AIProvider
+from app.services.generation_cache import GenerationCache
+from app.services.jobs import job_pool
+from app.services.provider_router import ProviderRouter
+from app.services.single_flight import SingleFlight
+from tests.services.test_content_generator import OUTLINE, ChapterProvider
+
+class CountingProvider(AIProvider):
+    name = "openai"
+
+    def __init__(self, response):
+        super().__init__()
+        self.response = response
+        self.calls = 0
+
+    async def _chat(self, messages, **options):
+        self.calls += 1
+        return self.response
+
+@pytest.fixture
+def counting_provider(monkeypatch):
+    quiz = {
+        "title": "Python Quiz",
+        "description": "Basics",
+        "questions": [{"question": "Q1", "options": ["A", "B"], "correct_answer": 0}]
+    }
+    provider = CountingProvider(json.dumps(quiz))
+    generator = content_endpoint.content_generator
+    monkeypatch.setattr(generator, "providers", {"openai": provider})
+    monkeypatch.setattr(generator, "router", ProviderRouter(generator.providers))
+    monkeypatch.setattr(generator, "cache", GenerationCache(":memory:"))
+    monkeypatch.setattr(generator, "single_flight", SingleFlight())
+    return provider
+
+@pytest.mark.usefixtures("client", "test_headers")
+def test_generate_calls_provider_once_per_request(client, test_headers, counting_provider):
+    for attempt in range(2):
+        response = client.post(
+            "/api/v1/content/generate",
+            json={
+                "content_type": "quiz",
+                "parameters": {"topic": "Python", "num_questions": 1},
+                "bypass_cache": True
+            },
+            headers=test_headers
+        )
+        assert response.status_code == 200
+        assert counting_provider.calls == attempt + 1
+
+    data = response.json()
+    assert data["content_type"] == "quiz"
+    assert json.loads(data["content"])["questions"][0]["question"] == "Q1"
+    assert data["meta"]["parameters"]["topic"] == "Python"
+
+class StreamingProvider(CountingProvider):
+    async def _stream_chat(self, messages, **options):
+        self.calls += 1
+        for chunk in ("Loops ", "repeat ", "code."):
+            yield chunk
+
+@pytest.mark.usefixtures("client", "test_headers")
+def test_chat_stream_sends_tokens_then_done(client, test_headers, monkeypatch):
+    provider = StreamingProvider("")
+    generator = content_endpoint.content_generator
+    monkeypatch.setattr(generator, "providers", {"openai": provider})
+    monkeypatch.setattr(generator, "router", ProviderRouter(generator.providers))
+
+    async def course_content(course_id, query=None):
+        return "Course material"
+
+    monkeypatch.setattr(generator, "_get_course_content", course_content)
+
+    response = client.post(
+        "/api/v1/content/chat/stream",
+        json={"course_id": "course-1", "prompt": "What is a loop?"},
+        headers=test_headers
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [block.split("\n") for block in response.text.strip().split("\n\n")]
+    assert [lines[0] for lines in events] == ["event: token"] * 3 + ["event: done"]
+    done = json.loads(events[-1][1][len("data: "):])
+    assert done["response"] == "Loops repeat code."
+    assert done["history"][-1] == {"role": "assistant", "content": "Loops repeat code."}
+    assert provider.calls == 1
+
+def run_next_job():
+    """Claim and run one queued job, as a worker would (tests start none)."""
+    async def claim_and_run():
+        job = await db_writer.run(crud_job.claim_next)
+        await job_pool.run(job)
+
+    asyncio.run(claim_and_run())
+
+@pytest.mark.usefixtures("client", "test_headers")
+def test_outline_job_returns_202_and_result_when_done(client, test_headers, monkeypatch):
+    provider = ChapterProvider()
+    generator = content_endpoint.content_generator
+    monkeypatch.setattr(generator, "providers", {"gemini": provider})
+    monkeypatch.setattr(generator, "router", ProviderRouter(generator.providers))
+
+    response = client.post(
+        "/api/v1/content/generate-from-outline?mode=job",
+        json={"outline": OUTLINE},
+        headers=test_headers
+    )
+    assert response.status_code == 202
+    job = response.json()
+    assert response.headers["location"] == f"/api/v1/jobs/{job['id']}"
+    assert job["status"] == "queued"
+    assert client.get(f"/api/v1/jobs/{job['id']}/result", headers=test_headers).status_code == 202
+
+    run_next_job()
+    result = client.get(f"/api/v1/jobs/{job['id']}/result", headers=test_headers)
+    assert result.status_code == 200
+    chapters = result.json()["result"]["chapters"]
+    assert [chapter["title"] for chapter in chapters] == [
+        "Chapter 1: Basics", "Chapter 2: Loops", "Chapter 3: Functions"
+    ]
+    progress = client.get(f"/api/v1/jobs/{job['id']}/progress", headers=test_headers).json()
+    assert progress["progress"] == 1.0
+    assert progress["progress_message"] == "3/3 chapters generated"
+
+class FailingProvider(CountingProvider):
+    name = "gemini"
+
+    async def _chat(self, messages, **options):
+        self.calls += 1
+        raise RuntimeError("gemini is down")
+
+@pytest.mark.usefixtures("client", "test_headers")
+def test_single_mode_outline_goes_through_the_provider_router(client, test_headers, monkeypatch):
+    chapters = {"chapters": [{"title": "Chapter 1: Basics", "sections": []}]}
+    failing, fallback = FailingProvider(None), CountingProvider(json.dumps(chapters))
+    generator = content_endpoint.content_generator
+    monkeypatch.setattr(generator, "providers", {"gemini": failing, "openai": fallback})
+    monkeypatch.setattr(generator, "router", ProviderRouter(generator.providers))
+
+    response = client.post(
+        "/api/v1/content/generate-from-outline",
+        json={"outline": OUTLINE, "mode": "single", "provider": "gemini"},
+        headers=test_headers
+    )
+
+    assert response.status_code == 200, response.text
+    assert [chapter["title"] for chapter in response.json()["chapters"]] == ["Chapter 1: Basics"]
+    assert failing.calls >= 1 and fallback.calls == 1
+    metrics = generator.router.metrics()
+    assert metrics["gemini"]["failures"] >= 1 and metrics["openai"]["successes"] == 1
@@ -0,0 +1,71 @@
+import hashlib
+import os
+import pytest
+from app.services.blob_store import blob_store
+
+DATA = os.urandom(200_000)
+
+@pytest.fixture
+def uploaded(client, test_headers):
+    response = client.post(
+        "/api/v1/content/upload",
+        files={"file": ("notes.bin", DATA, "application/octet-stream")},
+        data={"title": "Notes"},
+        headers=test_headers
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def test_upload_is_stored_by_hash(uploaded):
+    assert uploaded["blob_sha256"] == hashlib.sha256(DATA).hexdigest()
+    assert uploaded["content"] == "notes.bin"
+    assert uploaded["meta"]["size"] == len(DATA)
+    assert blob_store.exists(uploaded["blob_sha256"])
+
+def test_download_whole_file_with_etag(client, test_headers, uploaded):
+    url = f"/api/v1/content/{uploaded['id']}/file"
+
+    response = client.get(url, headers=test_headers)
+    assert response.status_code == 200
+    assert response.content == DATA
+    assert response.headers["etag"] == f'"{uploaded["blob_sha256"]}"'
+    assert response.headers["accept-ranges"] == "bytes"
+
+    cached = client.get(url, headers={**test_headers, "If-None-Match": response.headers["etag"]})
+    assert cached.status_code == 304 and cached.content == b""
+
+@pytest.mark.parametrize("header, first, last", [
+    ("bytes=0-99", 0, 99),
+    ("bytes=150000-", 150000, len(DATA) - 1),
+    ("bytes=-500", len(DATA) - 500, len(DATA) - 1),
+    ("bytes=199990-999999", 199990, len(DATA) - 1),
+])
+def test_download_ranges(client, test_headers, uploaded, header, first, last):
+    response = client.get(f"/api/v1/content/{uploaded['id']}/file", headers={**test_headers, "Range": header})
+
+    assert response.status_code == 206
+    assert response.content == DATA[first:last + 1]
+    assert response.headers["content-range"] == f"bytes {first}-{last}/{len(DATA)}"
+    assert response.headers["content-length"] == str(last - first + 1)
+
+def test_range_past_the_end_and_stale_if_range(client, test_headers, uploaded):
+    url = f"/api/v1/content/{uploaded['id']}/file"
+
+    past = client.get(url, headers={**test_headers, "Range": "bytes=999999-"})
+    assert past.status_code == 416
+    assert past.headers["content-range"] == f"bytes */{len(DATA)}"
+
+    stale = client.get(url, headers={**test_headers, "Range": "bytes=0-9", "If-Range": '"other"'})
+    assert stale.status_code == 200 and stale.content == DATA
+
+def test_oversize_upload_is_rejected(client, test_headers, monkeypatch):
+    monkeypatch.setattr(blob_store, "max_size", 1000)
+
+    response = client.post(
+        "/api/v1/content/upload",
+        files={"file": ("big.bin", b"x" * 5000, "application/octet-stream")},
+        data={"title": "Big"},
+        headers=test_headers
+    )
+
+    assert response.status_code == 413
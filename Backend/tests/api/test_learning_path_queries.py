@@ -0,0 +1,45 @@
+import pytest
+from app.models.course import Course
+from app.models.enums import ContentType
+from app.models.learning_path import LearningPath
+from app.models.learning_path_step import LearningPathStep
+
+# Endpoint -> statements per request: the user lookup, the course check where
+# the endpoint has one, the paths, and one SELECT ... IN for all their steps
+ENDPOINTS = {
+    "/api/v1/courses/{course_id}/learning-paths": 4,
+    "/api/v1/learning-paths/course/{course_id}": 4,
+    "/api/v1/learning-paths/course/{course_id}/outline": 4,
+    "/api/v1/learning-paths/course/{course_id}/steps": 3,
+}
+
+def add_course(db, user, paths, steps):
+    course = Course(title="Course", creator_id=user.id)
+    db.add(course)
+    db.flush()
+    for p in range(paths):
+        path = LearningPath(title=f"Path {p}", difficulty_level="beginner", estimated_duration=60, created_by=user.id, course_id=course.id)
+        path.steps = [
+            LearningPathStep(title=f"Step {s}", content_type=ContentType.TEXT, order=s)
+            for s in range(steps)
+        ]
+        db.add(path)
+    db.commit()
+    return course.id
+
+@pytest.mark.parametrize("endpoint", ENDPOINTS)
+def test_query_count_does_not_grow_with_paths_or_steps(client, db, test_user, test_headers, assert_num_queries, endpoint):
+    small = add_course(db, test_user, paths=1, steps=1)
+    large = add_course(db, test_user, paths=3, steps=20)
+
+    for course_id in (small, large):
+        with assert_num_queries(ENDPOINTS[endpoint]):
+            response = client.get(endpoint.format(course_id=course_id), headers=test_headers)
+        assert response.status_code == 200, response.text
+
+def test_steps_come_back_in_order(client, db, test_user, test_headers):
+    course_id = add_course(db, test_user, paths=1, steps=12)
+
+    response = client.get(f"/api/v1/learning-paths/course/{course_id}/steps", headers=test_headers)
+
+    assert [step["order"] for step in response.json()] == list(range(12))
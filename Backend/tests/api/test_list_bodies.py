@@ -0,0 +1,60 @@
+from datetime import datetime
+import pytest
+from app.api.v1.endpoints.youtube import TRANSCRIBED_VIDEOS
+from app.crud.pagination import total_counts
+from app.models.content import Content
+from app.models.course import Course
+from app.models.enums import ContentType
+from app.models.youtube_content import YouTubeContent
+
+CONTENT_BODY = "content.content AS content_content"
+TRANSCRIPT = "youtube_content.transcript AS youtube_content_transcript"
+
+@pytest.fixture
+def course_id(db, test_user):
+    course = Course(title="Course", creator_id=test_user.id)
+    db.add(course)
+    db.flush()
+    db.add_all([
+        Content(title=f"File {i}", content="x" * 1000, content_type=ContentType.FILE,
+                course_id=course.id, created_by=test_user.id, updated_at=datetime.utcnow())
+        for i in range(3)
+    ])
+    db.commit()
+    return course.id
+
+@pytest.fixture
+def videos(db, test_user):
+    db.add_all([
+        YouTubeContent(video_id=f"v{i}", title=f"Video {i}", transcript="words " * 100, video_url="u", created_by=test_user.id)
+        for i in range(3)
+    ])
+    db.commit()
+    total_counts.invalidate(TRANSCRIBED_VIDEOS)
+
+def test_course_contents_without_bodies_do_not_read_them(client, course_id, test_headers, assert_num_queries):
+    with assert_num_queries(3) as statements:
+        response = client.get(f"/api/v1/courses/{course_id}/contents?include_body=false", headers=test_headers)
+
+    assert response.status_code == 200, response.text
+    assert [item["content"] for item in response.json()] == [None] * 3
+    assert {item["title"] for item in response.json()} == {"File 0", "File 1", "File 2"}
+    assert not any(CONTENT_BODY in statement for statement in statements)
+
+def test_course_contents_load_bodies_in_the_list_query(client, course_id, test_headers, assert_num_queries):
+    with assert_num_queries(3) as statements:
+        response = client.get(f"/api/v1/courses/{course_id}/contents", headers=test_headers)
+
+    assert [item["content"] for item in response.json()] == ["x" * 1000] * 3
+    assert sum(CONTENT_BODY in statement for statement in statements) == 1
+
+def test_video_list_without_transcripts(client, videos, test_headers, assert_num_queries):
+    with assert_num_queries(3) as statements:
+        response = client.get("/api/v1/youtube/videos?include_body=false", headers=test_headers)
+
+    assert response.status_code == 200, response.text
+    assert [video["transcript"] for video in response.json()["videos"]] == [None] * 3
+    assert not any(TRANSCRIPT in statement for statement in statements)
+
+    full = client.get("/api/v1/youtube/videos", headers=test_headers).json()
+    assert all(video["transcript"].startswith("words") for video in full["videos"])
@@ -0,0 +1,24 @@
+import json
+from app.api.v1.endpoints import youtube
+from app.models.youtube_content import YouTubeChatMessage, YouTubeContent
+
+def test_streamed_answer_is_stored_with_the_question(client, test_headers, test_user, db, monkeypatch):
+    video = YouTubeContent(video_id="v1", title="Loops", transcript="A loop repeats.", video_url="u", created_by=test_user.id)
+    db.add(video)
+    db.commit()
+
+    async def answer(context):
+        for chunk in ("Loops ", "repeat ", "code."):
+            yield chunk
+
+    monkeypatch.setattr(youtube, "stream_ai_response", answer)
+
+    response = client.post(
+        "/api/v1/youtube/chat/stream", json={"video_id": "v1", "message": "What is a loop?"}, headers=test_headers
+    )
+
+    assert response.status_code == 200, response.text
+    done = json.loads(response.text.strip().split("\n\n")[-1].split("\n")[1][len("data: "):])
+    db.expire_all()
+    stored = db.get(YouTubeChatMessage, done["id"])
+    assert (stored.message, stored.ai_response) == ("What is a loop?", "Loops repeat code.")
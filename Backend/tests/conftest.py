@@ -1,5 +1,11 @@
 import pytest
 import os
+
+# Read when the app is imported, so the test client's lifespan starts no job
+# workers polling the database behind the tests (they run jobs themselves)
+os.environ["JOB_WORKERS"] = "0"
+
+from contextlib import contextmanager
 from fastapi.testclient import TestClient
 from app.main import app
 from app.core.config import settings
@@ -14,9 +20,11 @@ from app.models.learning_path import (
 )
 from app.schemas.content import ContentCreate
 from app.models.enums import ContentType
-from app.db.session import SessionLocal, engine
+from app.db.session import SessionLocal, async_engine, engine
 from app.crud.crud_user import crud_user
+from app.services.blob_store import blob_store
 from app.schemas.user import UserCreate
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 
 # Set test environment variables
@@ -26,6 +34,12 @@ os.environ["SECRET_KEY"] = "test-secret-key"
 os.environ["OPENAI_API_KEY"] = "test-openai-key"
 os.environ["GEMINI_API_KEY"] = "test-gemini-key"
 
+@pytest.fixture(autouse=True)
+def blob_root(tmp_path, monkeypatch):
+    """Keep uploaded files in the test's temporary directory."""
+    monkeypatch.setattr(blob_store, "root", str(tmp_path / "blobs"))
+    return blob_store.root
+
 @pytest.fixture(scope="session", autouse=True)
 def setup_test_database():
     # Create test database tables
@@ -184,4 +198,41 @@ def test_api_user(db):
 
 @pytest.fixture
 def auth_token(test_token):
-    return test_token
\ No newline at end of file
+    return test_token
+
+@contextmanager
+def _recording():
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    engines = [engine, async_engine.sync_engine]
+    for e in engines:
+        event.listen(e, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        for e in engines:
+            event.remove(e, "before_cursor_execute", record)
+
+@pytest.fixture
+def recorded_statements():
+    """``with recorded_statements() as statements: ...`` collects the
+    (statement, parameters) pairs sent to the database (sync and async
+    engines) inside the block."""
+    return _recording
+
+@pytest.fixture
+def assert_num_queries(recorded_statements):
+    """``with assert_num_queries(3): ...`` fails unless exactly 3 statements
+    are sent to the database (sync and async engines) inside the block."""
+    @contextmanager
+    def check(expected: int):
+        statements = []
+        with recorded_statements() as recorded:
+            yield statements
+        statements.extend(statement for statement, _ in recorded)
+        assert len(statements) == expected, f"expected {expected} queries, got {len(statements)}:\n" + "\n".join(statements)
+
+    return check
@@ -0,0 +1,60 @@
+import asyncio
+from app.crud.crud_content import crud_content_async
+from app.crud.crud_course import crud_course_async
+from app.crud.crud_learning_path import crud_learning_path_async
+from app.db.session import AsyncSessionLocal
+from app.models.enums import ContentType
+from app.schemas.content import ContentCreate
+from app.schemas.course import CourseCreate
+from app.schemas.learning_path import LearningPathCreate, LearningPathStepCreate
+
+def run(coro_fn):
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            return await coro_fn(db)
+    return asyncio.run(scenario())
+
+def test_course_and_content_round_trip(test_user):
+    async def scenario(db):
+        course = await crud_course_async.create(
+            db, obj_in=CourseCreate(title="Async", description="Async course", prompt="async"), creator_id=test_user.id
+        )
+        content = await crud_content_async.create_typed(
+            db,
+            obj_in=ContentCreate(title="Lesson", content="Body", content_type=ContentType.TEXT, course_id=course.id),
+            user_id=test_user.id
+        )
+        return course, await crud_content_async.get_by_course(db, course_id=course.id), content
+
+    course, contents, content = run(scenario)
+
+    assert course.creator_id == test_user.id
+    assert course.created_at is not None
+    assert [c.id for c in contents] == [content.id]
+
+def test_learning_path_is_created_with_steps_and_course(db, test_user):
+    async def scenario(db):
+        course = await crud_course_async.create(
+            db, obj_in=CourseCreate(title="Paths", description="d", prompt="p"), creator_id=test_user.id
+        )
+        path_in = LearningPathCreate(
+            title="Path",
+            difficulty_level="beginner",
+            estimated_duration=60,
+            steps=[
+                LearningPathStepCreate(title=f"Step {i}", order=i, content_type=ContentType.TEXT)
+                for i in (1, 2)
+            ]
+        )
+        await crud_learning_path_async.create(db, obj_in=path_in, created_by=test_user.id, course_id=course.id)
+        return course.id
+
+    course_id = run(scenario)
+    path = run(lambda db: crud_learning_path_async.get_by_course(db, course_id, with_steps=True))
+
+    assert path.created_by == test_user.id
+    # Steps are loaded up front, so they are readable outside the session
+    assert sorted(step.title for step in path.steps) == ["Step 1", "Step 2"]
+
+def test_missing_learning_path_is_none():
+    assert run(lambda db: crud_learning_path_async.get_by_course(db, "missing")) is None
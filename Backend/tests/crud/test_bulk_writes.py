@@ -0,0 +1,86 @@
+from contextlib import contextmanager
+import pytest
+from sqlalchemy import event
+from app.crud.crud_assessment import crud_flashcard
+from app.crud.crud_learning_path import crud_learning_path, crud_learning_path_step
+from app.db.session import engine
+from app.models.course import Course
+from app.models.enums import ContentType
+from app.schemas.assessment import FlashcardCreate
+from app.schemas.learning_path import LearningPathCreate, LearningPathStepCreate
+
+@contextmanager
+def recorded_writes():
+    writes = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("INSERT", "UPDATE")):
+            writes.append((statement.split("(")[0].strip(), executemany))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield writes
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+@pytest.fixture
+def course(db, test_user):
+    course = Course(title="Course", creator_id=test_user.id)
+    db.add(course)
+    db.commit()
+    return course
+
+def steps(count):
+    return [
+        LearningPathStepCreate(title=f"Chapter {i}", content_type=ContentType.TEXT, content="c", order=i)
+        for i in range(count)
+    ]
+
+def test_learning_path_steps_are_inserted_with_one_executemany(db, test_user):
+    path_in = LearningPathCreate(
+        title="Path", difficulty_level="beginner", estimated_duration=60, steps=steps(30)
+    )
+
+    with recorded_writes() as writes:
+        path = crud_learning_path.create(db, obj_in=path_in, created_by=test_user.id)
+
+    assert writes == [("INSERT INTO learning_paths", False), ("INSERT INTO learning_path_steps", True)]
+    assert len(crud_learning_path_step.get_by_learning_path(db, path.id)) == 30
+
+def test_create_many_returns_rows_in_order_with_server_defaults(db, test_user):
+    path = crud_learning_path.create(
+        db, obj_in=LearningPathCreate(title="Path", difficulty_level="beginner", estimated_duration=60), created_by=test_user.id
+    )
+
+    created = crud_learning_path_step.create_many(db, objs_in=steps(5), learning_path_id=path.id)
+
+    assert [step.title for step in created] == [f"Chapter {i}" for i in range(5)]
+    assert all(step.created_at is not None and step.learning_path_id == path.id for step in created)
+
+def test_update_many_skips_unknown_ids(db, test_user, course):
+    cards = crud_flashcard.create_many(
+        db, objs_in=[FlashcardCreate(front=f"Q{i}", back="A") for i in range(3)], creator_id=test_user.id, course_id=course.id
+    )
+
+    updated = crud_flashcard.update_many(
+        db, updates={cards[0].id: {"back": "first"}, cards[2].id: {"back": "third"}, "missing": {"back": "x"}}
+    )
+
+    assert [(card.front, card.back) for card in updated] == [("Q0", "first"), ("Q2", "third")]
+    assert crud_flashcard.get(db, cards[1].id).back == "A"
+
+def test_upsert_many_inserts_and_updates(db, test_user, course):
+    card = {"front": "Q", "creator_id": test_user.id, "course_id": course.id}
+    existing = crud_flashcard.upsert_many(db, rows=[{**card, "back": "old"}])[0]
+    first_update = existing.updated_at
+
+    with recorded_writes() as writes:
+        cards = crud_flashcard.upsert_many(db, rows=[
+            {**card, "id": existing.id, "back": "new"},
+            {**card, "back": "another"},
+        ])
+
+    assert len(writes) == 1
+    assert [c.back for c in cards] == ["new", "another"]
+    assert cards[0].id == existing.id and cards[0].updated_at >= first_update
+    assert crud_flashcard.upsert_many(db, rows=[]) == []
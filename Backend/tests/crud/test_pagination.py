@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import select
+from app.crud import chat as chat_crud
+from app.crud.crud_course import crud_course
+from app.crud.pagination import CountCache, InvalidCursor, decode_cursor, keyset, page_of
+from app.models.chat import ChatGroup, Message
+from app.models.course import Course
+from app.models.youtube_content import YouTubeContent
+
+def walk(get_page):
+    """Follow the cursors to the end and return every row seen, in order."""
+    rows, cursor = [], None
+    for _ in range(20):
+        page = get_page(cursor)
+        rows.extend(page.items)
+        if page.next_cursor is None:
+            return rows
+        cursor = decode_cursor(page.next_cursor)
+    pytest.fail("pagination did not terminate")
+
+def test_message_pages_cover_every_message_once(db, test_user):
+    group = ChatGroup(name="Group", created_by=test_user.email)
+    db.add(group)
+    db.flush()
+    start = datetime(2024, 1, 1)
+    # Pairs of messages share a timestamp so pages split inside a tie
+    for i in range(7):
+        db.add(Message(group_id=group.id, sender_id=test_user.email, content=f"m{i}", created_at=start + timedelta(seconds=i // 2)))
+    db.commit()
+
+    messages = walk(lambda cursor: chat_crud.get_group_messages(db, group.id, cursor, limit=3))
+
+    assert len(messages) == 7
+    assert [(m.created_at, m.id) for m in messages] == sorted(((m.created_at, m.id) for m in messages), reverse=True)
+
+def test_server_default_timestamps_page_correctly(db, test_user):
+    # created_at comes from CURRENT_TIMESTAMP, so all rows share one second
+    for i in range(5):
+        db.add(YouTubeContent(video_id=f"v{i}", title=f"Video {i}", transcript="t", video_url="u", created_by=test_user.id))
+    db.commit()
+    transcribed = select(YouTubeContent).filter(YouTubeContent.transcript.isnot(None))
+
+    videos = walk(lambda cursor: page_of(db.execute(keyset(transcribed, YouTubeContent, cursor, 2)).scalars().all(), 2))
+
+    assert sorted(v.video_id for v in videos) == [f"v{i}" for i in range(5)]
+
+def test_course_page_is_empty_without_rows(db):
+    page = crud_course.get_page(db, limit=10)
+
+    assert page.items == [] and page.next_cursor is None
+
+def test_course_last_page_has_no_cursor(db, test_user):
+    for i in range(3):
+        db.add(Course(title=f"Course {i}", creator_id=test_user.id))
+    db.commit()
+
+    page = crud_course.get_page(db, limit=3)
+
+    assert len(page.items) == 3
+    assert page.next_cursor is None
+
+@pytest.mark.parametrize("value", ["", "not-a-cursor", "WyJ4Il0"])
+def test_malformed_cursor_is_rejected(value):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(value)
+
+def test_count_cache_expires_and_invalidates():
+    counts = CountCache(ttl_seconds=60)
+    counts.set("videos", 3)
+    assert counts.get("videos") == 3
+    counts.invalidate("videos")
+    assert counts.get("videos") is None
+
+    assert CountCache(ttl_seconds=0).get("videos") is None
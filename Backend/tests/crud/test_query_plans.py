@@ -0,0 +1,115 @@
+"""EXPLAIN QUERY PLAN checks for the hot queries.
+
+Each case runs the real CRUD call (or the endpoint's statement) against the
+test database, records the SQL it sends, and fails when SQLite plans a full
+table scan for any of it, i.e. when a supporting index is missing.
+"""
+import asyncio
+import re
+from datetime import datetime
+import pytest
+from sqlalchemy import func, select
+from app.crud import chat as chat_crud
+from app.crud.crud_assessment import crud_assessment, crud_exam, crud_flashcard
+from app.crud.crud_course import crud_course
+from app.crud.crud_content import crud_content, crud_content_async
+from app.crud.crud_learning_path import crud_learning_path_async, crud_learning_path_step
+from app.crud.crud_progress import crud_progress
+from app.crud.pagination import Cursor, keyset
+from app.db.session import AsyncSessionLocal
+from app.models.progress import UserProgress
+from app.models.youtube_content import YouTubeContent
+from app.services import material_search, message_search
+from app.services.course_context import build_course_context
+
+FULL_SCAN = re.compile(r"^SCAN (TABLE )?(\w+)( AS \w+)?$")
+# Two cursors: one with microseconds, one on a whole second (server-default timestamps)
+CURSORS = [Cursor(datetime(2024, 5, 1, 12, 0, 0, 250000), "id"), Cursor(datetime(2024, 5, 1, 12, 0, 0), "id")]
+
+def queries(statements):
+    # Schema lookups (sqlite_master) are one-off, not hot queries
+    return [
+        (statement, parameters) for statement, parameters in statements
+        if statement.lstrip().upper().startswith(("SELECT", "WITH", "UPDATE", "DELETE")) and "sqlite_master" not in statement
+    ]
+
+def query_plan(db, statement, parameters):
+    rows = db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", tuple(parameters))
+    return [row[-1] for row in rows]
+
+def run_async(fn):
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            return await fn(db)
+    return asyncio.run(scenario())
+
+def transcribed_videos(db):
+    # Same statements as GET /youtube/videos
+    db.scalar(select(func.count()).select_from(YouTubeContent).filter(YouTubeContent.transcript.isnot(None)))
+    transcribed = select(YouTubeContent).filter(YouTubeContent.transcript.isnot(None))
+    for cursor in [None, *CURSORS]:
+        db.execute(keyset(transcribed, YouTubeContent, cursor, 10)).all()
+
+def pages(get_page):
+    def run(db):
+        for cursor in [None, *CURSORS]:
+            get_page(db, cursor)
+    return run
+
+def step_progress(db):
+    # Same filter as the learning path step progress endpoints
+    db.query(UserProgress).filter(
+        UserProgress.user_id == "user",
+        UserProgress.learning_path_id == "path",
+        UserProgress.step_id == "step"
+    ).first()
+
+HOT_QUERIES = {
+    "user_groups": lambda db: chat_crud.get_user_groups(db, "user@example.com"),
+    "remove_group_member": lambda db: chat_crud.remove_group_member(db, 1, "user@example.com"),
+    "group_messages": pages(lambda db, cursor: chat_crud.get_group_messages(db, 1, cursor)),
+    "search_messages": lambda db: message_search.search(db, 1, "hello*", sender_id="user@example.com"),
+    "search_material": lambda db: material_search.search(db, "loop*", course_id="course", kind="text"),
+    "message_reads": lambda db: chat_crud.get_message_reads(db, 1),
+    "progress_by_user": lambda db: crud_progress.get_by_user(db, user_id="user"),
+    "progress_by_learning_path": lambda db: crud_progress.get_by_learning_path(db, user_id="user", learning_path_id="path"),
+    "step_progress": step_progress,
+    "content_by_course": lambda db: crud_content.get_by_course(db, "course"),
+    "content_by_course_async": lambda db: run_async(lambda adb: crud_content_async.get_by_course(adb, "course")),
+    "content_by_batch": lambda db: run_async(lambda adb: crud_content_async.get_by_batch(adb, "batch")),
+    "course_context": lambda db: build_course_context(db, "course"),
+    "learning_path_by_course": lambda db: run_async(
+        lambda adb: crud_learning_path_async.get_by_course(adb, "course", with_steps=True)
+    ),
+    "learning_path_steps": lambda db: crud_learning_path_step.get_by_learning_path(db, "path"),
+    "quiz_attempts": lambda db: crud_assessment.get_quiz_attempts(db, quiz_id="quiz", user_id="user"),
+    "transcribed_videos": transcribed_videos,
+    "courses": pages(lambda db, cursor: crud_course.get_page(db, cursor=cursor)),
+    "quizzes": pages(lambda db, cursor: crud_assessment.get_quizzes(db, cursor=cursor)),
+    "flashcards": pages(lambda db, cursor: crud_flashcard.get_flashcards(db, cursor=cursor)),
+    "exams": pages(lambda db, cursor: crud_exam.get_exams(db, cursor=cursor)),
+}
+
+@pytest.mark.parametrize("name", HOT_QUERIES)
+def test_hot_query_uses_an_index(db, recorded_statements, name):
+    with recorded_statements() as statements:
+        HOT_QUERIES[name](db)
+    assert queries(statements)
+
+    for statement, parameters in queries(statements):
+        plan = query_plan(db, statement, parameters)
+        # Scanning a CTE (`WITH top AS (...)`) reads its few rows, not a table
+        ctes = set(re.findall(r"(\w+) AS \(", statement))
+        scans = [step for step in plan if FULL_SCAN.match(step) and FULL_SCAN.match(step).group(2) not in ctes]
+        assert not scans, f"{name} scans a whole table: {statement}\n{plan}"
+
+@pytest.mark.parametrize("name", ["group_messages", "transcribed_videos", "courses", "quizzes", "flashcards", "exams"])
+def test_paginated_lists_are_read_in_index_order(db, recorded_statements, name):
+    with recorded_statements() as statements:
+        HOT_QUERIES[name](db)
+
+    ordered = [s for s in queries(statements) if "ORDER BY" in s[0]]
+    assert ordered
+    for statement, parameters in ordered:
+        plan = query_plan(db, statement, parameters)
+        assert not any("TEMP B-TREE" in step for step in plan), plan
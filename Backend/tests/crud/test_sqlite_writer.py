@@ -0,0 +1,75 @@
+import asyncio
+import threading
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from app.core.config import settings
+from app.db.sqlite import pragmas_for, production_pragmas, tune
+from app.db.writer import SingleWriter
+
+@pytest.fixture
+def factory(tmp_path):
+    engine = tune(create_engine(f"sqlite:///{tmp_path / 'tuned.db'}", connect_args={"check_same_thread": False}), production_pragmas())
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+def pragma(db, name):
+    return db.execute(text(f"PRAGMA {name}")).scalar()
+
+def test_production_pragmas_are_applied_on_connect(factory):
+    db = factory()
+    try:
+        assert pragma(db, "journal_mode") == "wal"
+        assert pragma(db, "synchronous") == 1  # NORMAL
+        assert pragma(db, "busy_timeout") == settings.SQLITE_BUSY_TIMEOUT
+        assert pragma(db, "cache_size") == -settings.SQLITE_CACHE_SIZE_MB * 1024
+    finally:
+        db.close()
+
+def test_default_profile_keeps_sqlite_defaults():
+    assert pragmas_for("default") == {}
+    with pytest.raises(ValueError):
+        pragmas_for("fast")
+
+def test_writes_run_one_at_a_time_on_the_writer_thread(factory):
+    writer = SingleWriter(factory, enabled=True)
+    active = []
+    threads = set()
+
+    def write(db, value):
+        active.append(1)
+        assert len(active) == 1
+        threads.add(threading.current_thread().name)
+        db.execute(text("SELECT 1"))
+        active.pop()
+        return value
+
+    async def scenario():
+        return await asyncio.gather(*(writer.run(write, i) for i in range(20)))
+
+    try:
+        assert asyncio.run(scenario()) == list(range(20))
+        assert writer.run_sync(write, "sync") == "sync"
+    finally:
+        writer.stop()
+    assert threads == {"sqlite-writer"}
+
+def test_write_errors_reach_the_caller(factory):
+    writer = SingleWriter(factory, enabled=True)
+
+    def fail(db):
+        raise RuntimeError("constraint")
+
+    try:
+        with pytest.raises(RuntimeError):
+            writer.run_sync(fail)
+        # The writer keeps going after a failed write
+        assert writer.run_sync(lambda db: "ok") == "ok"
+    finally:
+        writer.stop()
+
+def test_disabled_writer_runs_in_the_caller(factory):
+    writer = SingleWriter(factory, enabled=False)
+
+    assert writer.run_sync(lambda db: threading.current_thread()) is threading.current_thread()
+    assert writer._thread is None
@@ -0,0 +1,71 @@
+import asyncio
+import hashlib
+import io
+import os
+import pytest
+from app.services.blob_store import BlobStore, BlobTooLarge
+
+class Source:
+    """Counts the bytes handed out, like a client still sending an upload."""
+
+    def __init__(self, data: bytes):
+        self._data = io.BytesIO(data)
+        self.read_bytes = 0
+
+    async def read(self, size: int = -1) -> bytes:
+        chunk = self._data.read(size)
+        self.read_bytes += len(chunk)
+        return chunk
+
+def put(store, data):
+    return asyncio.run(store.put(Source(data)))
+
+def test_blobs_are_stored_under_their_hash(tmp_path):
+    store = BlobStore(str(tmp_path), max_size=10_000_000)
+    data = os.urandom(3 * 1024 * 1024 + 7)
+
+    blob = put(store, data)
+
+    assert blob.sha256 == hashlib.sha256(data).hexdigest()
+    assert blob.size == len(data) and blob.created
+    assert blob.path == store.path(blob.sha256)
+    with open(blob.path, "rb") as stored:
+        assert stored.read() == data
+
+def test_identical_uploads_are_stored_once(tmp_path):
+    store = BlobStore(str(tmp_path), max_size=1000)
+
+    first = put(store, b"same bytes")
+    second = put(store, b"same bytes")
+
+    assert second.sha256 == first.sha256 and not second.created
+    assert os.listdir(tmp_path / "tmp") == []
+
+def test_oversize_uploads_stop_early_and_leave_nothing(tmp_path):
+    store = BlobStore(str(tmp_path), max_size=1024 * 1024)
+    source = Source(b"x" * 10 * 1024 * 1024)
+
+    with pytest.raises(BlobTooLarge):
+        asyncio.run(store.put(source))
+
+    assert source.read_bytes <= 2 * 1024 * 1024
+    assert os.listdir(tmp_path) == ["tmp"] and os.listdir(tmp_path / "tmp") == []
+
+def test_paths_only_accept_hashes(tmp_path):
+    store = BlobStore(str(tmp_path), max_size=1000)
+
+    with pytest.raises(ValueError):
+        store.path("../../etc/passwd")
+
+def test_check_sees_the_first_chunk_before_anything_else_is_read(tmp_path):
+    store = BlobStore(str(tmp_path), max_size=10_000_000)
+    source = Source(b"MZ" + b"\x00" * 5 * 1024 * 1024)
+
+    def check(head):
+        raise ValueError(f"rejected {head[:2]!r}")
+
+    with pytest.raises(ValueError, match="rejected b'MZ'"):
+        asyncio.run(store.put(source, check=check))
+
+    assert source.read_bytes == 1024 * 1024
+    assert os.listdir(tmp_path / "tmp") == []
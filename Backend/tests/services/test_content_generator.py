@@ -0,0 +1,241 @@
+import asyncio
+import json
+import time
+import pytest
+from app.services.content_generator import AIProvider, ContentGenerator
+from app.services.generation_cache import CachePolicy, GenerationCache
+from app.services.single_flight import SingleFlight
+
+class FakeProvider(AIProvider):
+    """Provider that answers after a fixed delay without blocking the loop."""
+
+    def __init__(self, name="fake", latency=0.0, fail=False, max_concurrency=None):
+        super().__init__(max_concurrency)
+        self.name = name
+        self.latency = latency
+        self.fail = fail
+        self.calls = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    async def _chat(self, messages, **options):
+        self.calls += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+            if self.fail:
+                raise RuntimeError(f"{self.name} is down")
+            return f"{self.name} answer"
+        finally:
+            self.in_flight -= 1
+
+def make_generator(providers):
+    return ContentGenerator(
+        providers=providers,
+        cache=GenerationCache(":memory:"),
+        single_flight=SingleFlight(),
+    )
+
+def test_concurrent_generations_overlap():
+    provider = FakeProvider(latency=0.2)
+    generator = make_generator({"openai": provider})
+
+    async def run():
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            generator.generate_content("summary", {"text": f"text {i}"}) for i in range(10)
+        ))
+        return time.perf_counter() - start
+
+    elapsed = asyncio.run(run())
+    assert provider.calls == 10
+    # Sequential execution would take 2 seconds
+    assert elapsed < 1.0
+
+def test_provider_concurrency_is_bounded():
+    provider = FakeProvider(latency=0.05, max_concurrency=2)
+    generator = make_generator({"openai": provider})
+
+    async def run():
+        await asyncio.gather(*(
+            generator.generate_content("summary", {"text": f"text {i}"}) for i in range(6)
+        ))
+
+    asyncio.run(run())
+    assert provider.calls == 6
+    assert provider.peak_in_flight == 2
+
+def test_falls_back_to_next_provider():
+    gemini = FakeProvider(name="gemini", fail=True)
+    openai = FakeProvider(name="openai")
+    generator = make_generator({"openai": openai, "gemini": gemini})
+
+    result = asyncio.run(generator.generate_content("summary", {"text": "text"}, provider="gemini"))
+
+    assert result == {"content": "openai answer"}
+    assert gemini.calls == 1
+    assert openai.calls == 1
+
+def test_no_provider_configured():
+    generator = make_generator({})
+    with pytest.raises(Exception) as exc_info:
+        asyncio.run(generator.generate_content("summary", {"text": "text"}))
+    assert "No AI provider configured" in str(exc_info.value.detail)
+
+def test_identical_requests_hit_the_cache():
+    provider = FakeProvider()
+    generator = make_generator({"openai": provider})
+
+    async def run():
+        first = await generator.generate_content("summary", {"text": "same text"})
+        second = await generator.generate_content("summary", {"text": "same text"})
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first == second
+    assert provider.calls == 1
+    stats = generator.cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["by_content_type"]["summary"]["entries"] == 1
+
+def test_bypass_refreshes_cached_entry():
+    provider = FakeProvider()
+    generator = make_generator({"openai": provider})
+
+    async def run():
+        await generator.generate_content("summary", {"text": "same text"})
+        await generator.generate_content("summary", {"text": "same text"}, use_cache=False)
+        await generator.generate_content("summary", {"text": "same text"})
+
+    asyncio.run(run())
+    assert provider.calls == 2
+    assert generator.cache.stats()["hits"] == 1
+
+def test_cache_applies_ttl_and_lru_limits():
+    cache = GenerationCache(":memory:", policies={"summary": CachePolicy(ttl_seconds=60, max_entries=2)})
+    for i in range(3):
+        cache.set(f"key-{i}", "summary", {"content": str(i)})
+        cache.get(f"key-{i}", "summary")
+
+    # The least recently used entry is evicted once the limit is exceeded
+    assert cache.get("key-0", "summary") is None
+    assert cache.get("key-2", "summary") == {"content": "2"}
+
+    expired = GenerationCache(":memory:", policies={"summary": CachePolicy(ttl_seconds=0, max_entries=10)})
+    expired.set("key", "summary", {"content": "stale"})
+    assert expired.get("key", "summary") is None
+
+def test_identical_concurrent_generations_share_one_call():
+    provider = FakeProvider(latency=0.1)
+    generator = make_generator({"openai": provider})
+
+    async def run():
+        return await asyncio.gather(*(
+            generator.generate_content("summary", {"text": "same text"}) for _ in range(20)
+        ))
+
+    results = asyncio.run(run())
+    assert provider.calls == 1
+    assert all(result == {"content": "fake answer"} for result in results)
+    assert generator.single_flight.coalesced == 19
+
+def test_concurrent_chat_requests_share_one_call():
+    provider = FakeProvider(latency=0.1)
+    generator = make_generator({"openai": provider})
+
+    async def course_content(course_id, query=None):
+        return "Course material"
+
+    generator._get_course_content = course_content
+
+    async def run():
+        return await asyncio.gather(*(
+            generator.generate_chat_response("course-1", "What is a loop?") for _ in range(5)
+        ))
+
+    results = asyncio.run(run())
+    assert provider.calls == 1
+    assert all(result["response"] == "fake answer" for result in results)
+
+class StreamingProvider(FakeProvider):
+    async def _stream_chat(self, messages, **options):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError(f"{self.name} is down")
+        for word in ("streamed ", "from ", self.name):
+            await asyncio.sleep(self.latency)
+            yield word
+
+def test_stream_chat_falls_back_before_first_chunk():
+    primary = StreamingProvider(name="openai", fail=True)
+    backup = StreamingProvider(name="gemini")
+    generator = make_generator({"openai": primary, "gemini": backup})
+
+    async def course_content(course_id, query=None):
+        return "Course material"
+
+    generator._get_course_content = course_content
+
+    async def run():
+        return [chunk async for chunk in generator.stream_chat_response("course-1", "Hi")]
+
+    assert asyncio.run(run()) == ["streamed ", "from ", "gemini"]
+    assert primary.calls == 1
+
+class ChapterProvider(FakeProvider):
+    """Answers chapter prompts with chapter JSON, failing chosen chapters once."""
+
+    def __init__(self, latency=0.0, flaky=(), broken=()):
+        super().__init__(latency=latency)
+        self.flaky = set(flaky)
+        self.broken = set(broken)
+        self.prompts = []
+
+    async def _chat(self, messages, **options):
+        prompt = messages[-1]["content"]
+        self.prompts.append(prompt)
+        await asyncio.sleep(self.latency)
+        title = prompt.split("Chapter: ", 1)[1].splitlines()[0]
+        if title in self.broken:
+            return "not json"
+        if title in self.flaky:
+            self.flaky.discard(title)
+            return '{"title": "truncated", "sections": ['
+        return json.dumps({"title": title, "sections": [{"title": "Intro", "content": "..."}]})
+
+OUTLINE = """Chapter 1: Basics
+- Variables
+Chapter 2: Loops
+- for
+Chapter 3: Functions
+- def"""
+
+def test_outline_chapters_are_generated_concurrently():
+    provider = ChapterProvider(latency=0.2)
+    generator = make_generator({"gemini": provider})
+
+    start = time.perf_counter()
+    result = asyncio.run(generator.generate_from_outline(OUTLINE))
+    elapsed = time.perf_counter() - start
+
+    assert [chapter["title"] for chapter in result["chapters"]] == [
+        "Chapter 1: Basics", "Chapter 2: Loops", "Chapter 3: Functions"
+    ]
+    assert result["failed_chapters"] == []
+    # Sequential generation would take 0.6 seconds
+    assert elapsed < 0.45
+
+def test_only_failed_chapters_are_retried():
+    provider = ChapterProvider(flaky={"Chapter 2: Loops"}, broken={"Chapter 3: Functions"})
+    generator = make_generator({"gemini": provider})
+
+    result = asyncio.run(generator.generate_from_outline(OUTLINE))
+
+    chapter_requests = [prompt.split("Chapter: ", 1)[1].splitlines()[0] for prompt in provider.prompts]
+    assert chapter_requests.count("Chapter 1: Basics") == 1
+    assert chapter_requests.count("Chapter 2: Loops") == 2
+    assert result["chapters"][1]["sections"]
+    assert result["failed_chapters"] == ["Chapter 3: Functions"]
+    assert "error" in result["chapters"][2]
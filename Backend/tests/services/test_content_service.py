@@ -0,0 +1,82 @@
+import asyncio
+import io
+from sqlalchemy import event
+from app.crud.crud_course import crud_course
+from app.db.session import AsyncSessionLocal
+from app.schemas.content import ContentBatchCreate, ContentCreate, ContentUpdate
+from app.schemas.course import CourseCreate
+from app.services.content_service import ContentService
+
+class Upload:
+    def __init__(self, filename: str, data: bytes):
+        self.filename = filename
+        self.content_type = "text/plain"
+        self._data = io.BytesIO(data)
+
+    async def read(self, size: int = -1) -> bytes:
+        return self._data.read(size)
+
+def run(scenario):
+    """Run ``scenario(db, commits)`` on one session, counting its commits."""
+    async def main():
+        async with AsyncSessionLocal() as db:
+            commits = []
+            event.listen(db.sync_session, "after_commit", lambda session: commits.append(1))
+            return await scenario(db, commits)
+    return asyncio.run(main())
+
+def test_create_and_update_share_the_request_session(db, test_user):
+    course = crud_course.create(db, obj_in=CourseCreate(title="C", description="d", prompt="p"), creator_id=test_user.id)
+    service = ContentService(generator=object())
+
+    async def scenario(db, commits):
+        created = await service.create_content(
+            db, ContentCreate(title="Notes", content="Body", content_type="TEXT", course_id=course.id), test_user.id
+        )
+        updated = await service.update_content(db, created.id, ContentUpdate(title="Renamed"))
+        return created, updated, len(commits)
+
+    created, updated, commits = run(scenario)
+
+    assert created.content_type == "text"
+    assert created.course_id == course.id
+    assert updated.id == created.id
+    assert updated.title == "Renamed"
+    assert commits == 2
+
+def test_batches_are_created_and_extended_in_one_commit_each(test_user):
+    service = ContentService(generator=object())
+
+    async def scenario(db, commits):
+        created = await service.create_batch(
+            db, [Upload("a.txt", b"a")], test_user.id, ContentBatchCreate(name="Week 1")
+        )
+        after_create = len(commits)
+        result = await service.add_files_to_batch(
+            db, created["batch_id"], [Upload("b.txt", b"b"), Upload("c.txt", b"c")], test_user.id
+        )
+        batch = await service.get_batch(db, created["batch_id"], test_user.id)
+        return result, batch, after_create, len(commits) - after_create
+
+    result, batch, create_commits, add_commits = run(scenario)
+
+    assert [f.title for f in result["added_files"]] == ["b.txt", "c.txt"]
+    assert all(f.blob_sha256 and f.batch_id == batch["batch_id"] for f in result["added_files"])
+    assert batch["name"] == "Week 1"
+    assert sorted(f.title for f in batch["files"]) == ["a.txt", "b.txt", "c.txt"]
+    assert create_commits == 1 and add_commits == 1
+
+def test_delete_content(test_user):
+    service = ContentService(generator=object())
+
+    async def scenario(db, commits):
+        created = await service.create_content(
+            db, ContentCreate(title="Gone", content="x", content_type="TEXT"), test_user.id
+        )
+        await service.delete_content(db, created.id)
+        try:
+            await service.get_content(db, created.id)
+        except Exception as e:
+            return e.status_code
+
+    assert run(scenario) == 404
@@ -0,0 +1,54 @@
+import uuid
+import pytest
+from app.models.content import Content
+from app.models.enums import ContentType
+from app.services.course_context import course_contexts
+
+@pytest.fixture
+def course_id():
+    return str(uuid.uuid4())
+
+def add(db, course_id, title, body, content_type=ContentType.TEXT, commit=True):
+    content = Content(title=title, content=body, content_type=content_type, course_id=course_id)
+    db.add(content)
+    if commit:
+        db.commit()
+    return content
+
+def test_snapshot_is_reused_until_the_course_changes(session, course_id):
+    add(session, course_id, "Loops", "A loop repeats code.")
+    first = course_contexts.get(session, course_id)
+    assert course_contexts.get(session, course_id) is first
+
+    add(session, course_id, "Functions", "A function names a block of code.")
+    second = course_contexts.get(session, course_id)
+    assert second is not first
+    assert "Functions" in second.text and "Loops" in second.text
+
+def test_uncommitted_changes_do_not_invalidate(session, course_id):
+    add(session, course_id, "Loops", "A loop repeats code.")
+    first = course_contexts.get(session, course_id)
+
+    add(session, course_id, "Draft", "Not committed yet.", commit=False)
+    session.flush()
+    assert course_contexts.version(course_id) == first.version
+    session.rollback()
+    assert course_contexts.get(session, course_id) is first
+
+def test_moving_content_invalidates_both_courses(session, course_id):
+    other_course_id = str(uuid.uuid4())
+    content = add(session, course_id, "Loops", "A loop repeats code.")
+    add(session, other_course_id, "Classes", "A class bundles data.")
+    course_contexts.get(session, course_id)
+    course_contexts.get(session, other_course_id)
+
+    content.course_id = other_course_id
+    session.commit()
+    assert "Loops" not in course_contexts.get(session, course_id).text
+    assert "Loops" in course_contexts.get(session, other_course_id).text
+
+def test_files_are_left_out(session, course_id):
+    add(session, course_id, "Loops", "A loop repeats code.")
+    add(session, course_id, "Upload", "aGVsbG8=", content_type=ContentType.FILE)
+    snapshot = course_contexts.get(session, course_id)
+    assert "Upload" not in snapshot.text
@@ -0,0 +1,52 @@
+from app.models.content import Content
+from app.models.enums import ContentType
+from app.services import course_index
+
+def add_text(db, title, body, course_id="course-1"):
+    content = Content(title=title, content=body, content_type=ContentType.TEXT, course_id=course_id)
+    db.add(content)
+    db.commit()
+    return content
+
+def test_chunk_text_overlaps_windows():
+    words = " ".join(f"w{i}" for i in range(25))
+    chunks = course_index.chunk_text(words, size=10, overlap=2)
+    assert chunks[0].split()[-2:] == chunks[1].split()[:2]
+    assert chunks[-1].split()[-1] == "w24"
+    assert course_index.chunk_text("   ") == []
+
+def test_search_returns_relevant_chunks_for_the_course(session):
+    add_text(session, "Loops", "A for loop repeats a block of code for each item.")
+    add_text(session, "Classes", "A class bundles data and the methods that use it.")
+    add_text(session, "Other course", "Loops in another course.", course_id="course-2")
+
+    chunks = course_index.search(session, "course-1", "How does a for loop work?", k=1)
+    assert [chunk.title for chunk in chunks] == ["Loops"]
+
+def test_unmatched_query_falls_back_to_course_chunks(session):
+    add_text(session, "Loops", "A for loop repeats a block of code.")
+    chunks = course_index.search(session, "course-1", "zebra")
+    assert [chunk.title for chunk in chunks] == ["Loops"]
+    assert course_index.search(session, "missing-course", "loops") == []
+
+def test_index_follows_updates_and_deletes(session):
+    content = add_text(session, "Loops", "A for loop repeats a block of code.")
+
+    content.content = "Recursion means a function calls itself."
+    session.commit()
+    assert "Recursion" in course_index.search(session, "course-1", "recursion")[0].text
+
+    content.course_id = None
+    session.commit()
+    assert course_index.search(session, "course-1", "recursion") == []
+
+    content.course_id = "course-1"
+    session.commit()
+    session.delete(content)
+    session.commit()
+    assert course_index.search(session, "course-1", "recursion") == []
+
+def test_files_are_not_indexed(session):
+    session.add(Content(title="Upload", content="cmVjdXJzaW9u", content_type=ContentType.FILE, course_id="course-1"))
+    session.commit()
+    assert course_index.search(session, "course-1", "upload") == []
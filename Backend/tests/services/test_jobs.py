@@ -0,0 +1,113 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from app.core.config import settings
+from app.crud.crud_job import crud_job
+from app.models.enums import JobStatus
+from app.services import jobs
+from app.services.jobs import JobWorkerPool, job_handler
+
+@pytest.fixture(autouse=True)
+def handlers(monkeypatch):
+    registry = {}
+    monkeypatch.setattr(jobs, "_handlers", registry)
+    monkeypatch.setattr(settings, "JOB_RETRY_BACKOFF", 0.01)
+    return registry
+
+async def wait_for_finish(db, job_id, timeout=5.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while loop.time() < deadline:
+        db.expire_all()
+        job = crud_job.get(db, job_id)
+        if job.status in (JobStatus.SUCCEEDED.value, JobStatus.FAILED.value):
+            return job
+        await asyncio.sleep(0.02)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+def run_job(db, job_type, payload=None, before_start=None):
+    async def scenario():
+        pool = JobWorkerPool(workers=2, poll_interval=0.05)
+        job = pool.submit(db, job_type, payload or {})
+        if before_start:
+            before_start(job)
+        await pool.start()
+        try:
+            return await wait_for_finish(db, job.id)
+        finally:
+            await pool.stop()
+
+    return asyncio.run(scenario())
+
+def test_job_result_and_progress_are_stored(db):
+    @job_handler("echo")
+    async def echo(payload, context):
+        await context.progress(0.5, "halfway")
+        return {"echo": payload["value"]}
+
+    job = run_job(db, "echo", {"value": 42})
+
+    assert job.status == JobStatus.SUCCEEDED.value
+    assert job.result == {"echo": 42}
+    assert job.progress == 1.0
+    assert job.progress_message == "halfway"
+    assert job.attempts == 1
+
+def test_failed_job_is_retried(db):
+    calls = []
+
+    @job_handler("flaky")
+    async def flaky(payload, context):
+        calls.append(context.attempt)
+        if len(calls) == 1:
+            raise RuntimeError("provider timeout")
+        return "ok"
+
+    job = run_job(db, "flaky")
+
+    assert job.status == JobStatus.SUCCEEDED.value
+    assert calls == [1, 2]
+    assert job.result == "ok"
+
+def test_client_errors_are_not_retried(db):
+    calls = []
+
+    @job_handler("missing")
+    async def missing(payload, context):
+        calls.append(1)
+        raise HTTPException(status_code=404, detail="Course not found")
+
+    job = run_job(db, "missing")
+
+    assert job.status == JobStatus.FAILED.value
+    assert job.error == "Course not found"
+    assert len(calls) == 1
+
+def test_job_gives_up_after_max_attempts(db):
+    @job_handler("broken")
+    async def broken(payload, context):
+        raise RuntimeError("still broken")
+
+    job = run_job(db, "broken")
+
+    assert job.status == JobStatus.FAILED.value
+    assert job.attempts == settings.JOB_MAX_ATTEMPTS
+    assert job.error == "still broken"
+
+def test_interrupted_job_is_resumed_on_start(db):
+    @job_handler("resumable")
+    async def resumable(payload, context):
+        return context.attempt
+
+    def interrupt(job):
+        # A worker of a previous process claimed the job and died
+        assert crud_job.claim_next(db).id == job.id
+
+    job = run_job(db, "resumable", before_start=interrupt)
+
+    assert job.status == JobStatus.SUCCEEDED.value
+    assert job.result == 1
+
+def test_unknown_job_type_is_rejected(db):
+    with pytest.raises(ValueError):
+        JobWorkerPool(workers=0).submit(db, "nope", {})
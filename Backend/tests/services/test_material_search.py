@@ -0,0 +1,116 @@
+import pytest
+from sqlalchemy import text
+from app.crud.pagination import InvalidCursor
+from app.models.content import Content
+from app.models.course import Course
+from app.models.enums import ContentType
+from app.models.youtube_content import YouTubeContent
+from app.services import material_search
+
+def add(db, row):
+    db.add(row)
+    db.commit()
+    return row
+
+def hits(page):
+    return [(hit.type, hit.title) for hit in page.items]
+
+def test_courses_content_and_videos_are_searchable(session):
+    course = add(session, Course(title="Python basics", description="Loops and functions", creator_id="ann"))
+    add(session, Content(title="Loops", content="A for loop repeats code", content_type=ContentType.TEXT, course_id=course.id, created_by="ann"))
+    add(session, Content(title="Intro video", content_type=ContentType.VIDEO, meta={"transcript": "today we write a loop"}, course_id=course.id, created_by="ann"))
+    add(session, Content(title="Loop slides", content="%PDF", content_type=ContentType.FILE, course_id=course.id, created_by="ann"))
+    add(session, YouTubeContent(video_id="v1", title="Loop tutorial", transcript="every loop needs an exit", video_url="u", created_by="bob"))
+
+    page = material_search.search(session, "loop*")
+
+    assert sorted(hits(page)) == [
+        ("course", "Python basics"), ("text", "Loops"), ("video", "Intro video"), ("youtube", "Loop tutorial")
+    ]
+    text_hit = next(hit for hit in page.items if hit.type == "text")
+    assert "<mark>loop</mark>" in text_hit.snippet
+
+def test_title_matches_rank_first(session):
+    add(session, Course(title="Databases", description="SQL and indexes", creator_id="ann"))
+    add(session, Course(title="Algorithms", description="Sorting, graphs and some databases", creator_id="ann"))
+
+    assert hits(material_search.search(session, "databases"))[0] == ("course", "Databases")
+
+def test_filters(session):
+    course = add(session, Course(title="Recursion", creator_id="ann"))
+    other = add(session, Course(title="Recursion again", creator_id="bob"))
+    add(session, Content(title="Base cases", content="recursion needs a base case", content_type="TEXT", course_id=course.id, created_by="ann"))
+    add(session, Content(title="Call stacks", content="deep recursion", content_type="TEXT", course_id=other.id, created_by="bob"))
+
+    assert sorted(hits(material_search.search(session, "recursion", course_id=course.id))) == [
+        ("course", "Recursion"), ("text", "Base cases")
+    ]
+    assert hits(material_search.search(session, "recursion", kind="text", creator_id="bob")) == [("text", "Call stacks")]
+    # Filter values are not matched as query words
+    assert material_search.search(session, "course").items == []
+
+def test_index_follows_crud_writes(session):
+    course = add(session, Course(title="Networks", creator_id="ann"))
+    video = add(session, YouTubeContent(video_id="v1", title="Untranscribed", video_url="u", created_by="ann"))
+    assert material_search.search(session, "routing").items == []
+
+    course.description = "Routing and switching"
+    video.transcript = "routing tables explained"
+    session.commit()
+    assert sorted(hits(material_search.search(session, "routing"))) == [("course", "Networks"), ("youtube", "Untranscribed")]
+
+    session.delete(course)
+    session.delete(video)
+    session.commit()
+    assert material_search.search(session, "routing").items == []
+
+def test_pages_follow_the_cursor(session):
+    for i in range(5):
+        add(session, Course(title=f"Statistics {i}", creator_id="ann"))
+
+    first = material_search.search(session, "statistics", limit=2)
+    seen = hits(first)
+    cursor = first.next_cursor
+    while cursor:
+        page = material_search.search(session, "statistics", cursor=cursor, limit=2)
+        seen += hits(page)
+        cursor = page.next_cursor
+
+    assert sorted(seen) == [("course", f"Statistics {i}") for i in range(5)]
+    with pytest.raises(InvalidCursor):
+        material_search.search(session, "statistics", cursor="bogus")
+
+def test_existing_rows_are_indexed_on_first_search(session):
+    add(session, Course(title="Written before the index", creator_id="ann"))
+    session.execute(text("DROP TABLE material_fts"))
+    session.commit()
+    material_search.material_fts._ready_engines.discard(session.get_bind())
+
+    assert hits(material_search.search(session, "index")) == [("course", "Written before the index")]
+
+def drop_index(db):
+    db.execute(text("DROP TABLE material_fts"))
+    db.commit()
+    material_search.material_fts._ready_engines.discard(db.get_bind())
+
+def test_index_created_during_a_read_survives_the_rollback(session):
+    add(session, Course(title="Written before the index", creator_id="ann"))
+    drop_index(session)
+
+    # Request sessions only read, so they end with a rollback
+    for _ in range(2):
+        assert hits(material_search.search(session, "index")) == [("course", "Written before the index")]
+        session.rollback()
+
+def test_index_created_by_a_rolled_back_write_is_created_again(session):
+    add(session, Course(title="Written before the index", creator_id="ann"))
+    drop_index(session)
+
+    session.add(Course(title="Rolled back index", creator_id="ann"))
+    session.flush()
+    session.rollback()
+    add(session, Course(title="Kept index", creator_id="ann"))
+
+    assert sorted(hits(material_search.search(session, "index"))) == [
+        ("course", "Kept index"), ("course", "Written before the index")
+    ]
@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import text
+from app.crud.pagination import InvalidCursor
+from app.models.chat import Message
+from app.services import message_search
+
+START = datetime(2024, 3, 1, 9, 0)
+
+def add(db, content, group_id=1, sender_id="ann@example.com", minutes=0):
+    message = Message(group_id=group_id, sender_id=sender_id, content=content, created_at=START + timedelta(minutes=minutes))
+    db.add(message)
+    db.commit()
+    return message
+
+def contents(page):
+    return [hit.content for hit in page.items]
+
+def test_results_are_ranked_and_highlighted(session):
+    add(session, "Has anyone finished the homework?")
+    add(session, "Recursion homework: the recursion exercise needs a base case")
+    add(session, "Recursion homework in another group", group_id=2)
+
+    page = message_search.search(session, 1, "recursion homework")
+
+    assert contents(page) == ["Recursion homework: the recursion exercise needs a base case"]
+    assert "<mark>Recursion</mark> <mark>homework</mark>" in page.items[0].snippet
+
+def test_prefix_queries(session):
+    add(session, "The loops lecture was great")
+    add(session, "Polymorphism is next week")
+
+    assert message_search.search(session, 1, "loop").items == []
+    assert contents(message_search.search(session, 1, "loop*")) == ["The loops lecture was great"]
+    assert contents(message_search.search(session, 1, "poly*")) == ["Polymorphism is next week"]
+    assert message_search.search(session, 1, "poly").items == []
+    assert message_search.search(session, 1, "  ?! ").items == []
+
+def test_sender_and_date_filters(session):
+    add(session, "exam tips", sender_id="ann@example.com", minutes=0)
+    add(session, "more exam tips", sender_id="bob@example.com", minutes=30)
+    add(session, "last exam tips", sender_id="ann@example.com", minutes=60)
+
+    by_ann = message_search.search(session, 1, "exam", sender_id="ann@example.com")
+    assert sorted(contents(by_ann)) == ["exam tips", "last exam tips"]
+
+    window = message_search.search(
+        session, 1, "exam", since=START + timedelta(minutes=30), until=START + timedelta(minutes=60)
+    )
+    assert contents(window) == ["more exam tips"]
+
+def test_index_follows_updates_and_deletes(session):
+    message = add(session, "see you at the library")
+
+    message.content = "see you at the cafeteria"
+    session.commit()
+    assert message_search.search(session, 1, "library").items == []
+    assert len(message_search.search(session, 1, "cafeteria").items) == 1
+
+    session.delete(message)
+    session.commit()
+    assert message_search.search(session, 1, "cafeteria").items == []
+
+def test_pages_follow_the_cursor(session):
+    for i in range(5):
+        add(session, f"question {i}", minutes=i)
+
+    first = message_search.search(session, 1, "question", limit=2)
+    seen = contents(first)
+    cursor = first.next_cursor
+    while cursor:
+        page = message_search.search(session, 1, "question", cursor=cursor, limit=2)
+        seen += contents(page)
+        cursor = page.next_cursor
+
+    assert sorted(seen) == [f"question {i}" for i in range(5)]
+    with pytest.raises(InvalidCursor):
+        message_search.search(session, 1, "question", cursor="bogus")
+
+def test_existing_messages_are_indexed_on_first_search(session):
+    add(session, "written before the index existed")
+    session.execute(text("DROP TABLE messages_fts"))
+    for trigger in ("insert", "delete", "update"):
+        session.execute(text(f"DROP TRIGGER messages_fts_{trigger}"))
+    session.commit()
+    message_search.messages_fts._ready_engines.discard(session.get_bind())
+
+    assert len(message_search.search(session, 1, "index").items) == 1
+    add(session, "and this one after the index")
+    assert len(message_search.search(session, 1, "index").items) == 2
+
+def test_index_created_during_a_read_survives_the_rollback(session):
+    add(session, "written before the index existed")
+    session.execute(text("DROP TABLE messages_fts"))
+    for trigger in ("insert", "delete", "update"):
+        session.execute(text(f"DROP TRIGGER messages_fts_{trigger}"))
+    session.commit()
+    message_search.messages_fts._ready_engines.discard(session.get_bind())
+
+    # Request sessions only read, so they end with a rollback
+    for _ in range(2):
+        assert contents(message_search.search(session, 1, "index")) == ["written before the index existed"]
+        session.rollback()
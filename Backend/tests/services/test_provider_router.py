@@ -0,0 +1,71 @@
+import asyncio
+import time
+import pytest
+from fastapi import HTTPException
+from app.services.provider_router import ProviderRouter, OPEN, CLOSED
+from tests.services.test_content_generator import FakeProvider
+
+async def chat(provider):
+    return await provider.chat([{"role": "user", "content": "hi"}])
+
+def test_circuit_opens_after_consecutive_failures():
+    flaky = FakeProvider(name="gemini", fail=True)
+    backup = FakeProvider(name="openai")
+    router = ProviderRouter({"gemini": flaky, "openai": backup}, failure_threshold=2, cooldown_seconds=60)
+
+    async def run():
+        return [await router.call(chat, preferred="gemini") for _ in range(4)]
+
+    assert asyncio.run(run()) == ["openai answer"] * 4
+    # After two failures the broken provider is no longer tried at all
+    assert flaky.calls == 2
+    assert router.metrics()["gemini"]["state"] == OPEN
+    assert router.order("gemini") == ["openai"]
+
+def test_half_open_probe_closes_circuit_on_success():
+    provider = FakeProvider(name="gemini", fail=True)
+    router = ProviderRouter({"gemini": provider}, failure_threshold=1, cooldown_seconds=0.05)
+
+    async def run():
+        with pytest.raises(RuntimeError):
+            await router.call(chat)
+        with pytest.raises(HTTPException) as unavailable:
+            await router.call(chat)
+        assert unavailable.value.status_code == 503
+
+        await asyncio.sleep(0.06)
+        provider.fail = False
+        return await router.call(chat)
+
+    assert asyncio.run(run()) == "gemini answer"
+    assert router.metrics()["gemini"]["state"] == CLOSED
+
+def test_hedge_starts_second_provider_when_first_is_slow():
+    slow = FakeProvider(name="gemini", latency=1.0)
+    fast = FakeProvider(name="openai", latency=0.01)
+    router = ProviderRouter({"gemini": slow, "openai": fast}, hedge_delay=0.05)
+
+    async def run():
+        start = time.perf_counter()
+        result = await router.call(chat, preferred="gemini", hedge=True)
+        return result, time.perf_counter() - start
+
+    result, elapsed = asyncio.run(run())
+    assert result == "openai answer"
+    assert elapsed < 0.5
+    assert router.metrics()["gemini"]["hedged"] == 1
+    # The cancelled request is neither a success nor a failure
+    assert router.metrics()["gemini"]["failures"] == 0
+
+def test_latency_stats_drive_ordering():
+    router = ProviderRouter({"gemini": FakeProvider(name="gemini"), "openai": FakeProvider(name="openai")})
+    for _ in range(5):
+        router.record_success("gemini", 3.0)
+        router.record_success("openai", 0.5)
+    router.record_failure("gemini")
+
+    assert router.order() == ["openai", "gemini"]
+    assert router.order("gemini") == ["gemini", "openai"]
+    metrics = router.metrics()
+    assert metrics["openai"]["p95_latency"] == 0.5
+    assert 0 < metrics["gemini"]["ewma_error_rate"] < 1
@@ -0,0 +1,70 @@
+import asyncio
+import pytest
+from app.services.single_flight import SingleFlight
+
+def test_waiters_receive_independent_copies():
+    flights = SingleFlight()
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"items": [1, 2]}
+
+    async def run():
+        return await asyncio.gather(*(flights.do("key", work) for _ in range(3)))
+
+    first, second, third = asyncio.run(run())
+    assert calls == 1
+    first["items"].append(3)
+    assert second == third == {"items": [1, 2]}
+    assert flights.in_flight() == 0
+
+def test_errors_propagate_to_every_waiter():
+    flights = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.05)
+        raise RuntimeError("provider down")
+
+    async def run():
+        return await asyncio.gather(
+            *(flights.do("key", work) for _ in range(3)), return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert flights.executions == 1
+
+def test_cancelled_caller_does_not_cancel_shared_work():
+    flights = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.1)
+        return "done"
+
+    async def run():
+        first = asyncio.create_task(flights.do("key", work))
+        second = asyncio.create_task(flights.do("key", work))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(run()) == "done"
+
+def test_completed_key_runs_again():
+    flights = SingleFlight()
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        return calls
+
+    async def run():
+        return [await flights.do("key", work), await flights.do("key", work)]
+
+    assert asyncio.run(run()) == [1, 2]
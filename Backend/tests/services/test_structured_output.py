@@ -0,0 +1,93 @@
+import asyncio
+import json
+import pytest
+from app.services.structured_output import (
+    StructuredOutput, StructuredOutputError, parse_structured, repair_json
+)
+
+def question(n, **overrides):
+    return {"question": f"Q{n}", "options": ["A", "B"], "correct_answer": 0, **overrides}
+
+class ScriptedCall:
+    """Returns the scripted responses in order and records the prompts."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.prompts = []
+
+    async def __call__(self, prompt):
+        self.prompts.append(prompt)
+        return self.responses.pop(0)
+
+def test_valid_json_in_fences_is_not_a_repair():
+    value, repaired = repair_json('Here it is:\n```json\n{"a": [1, 2]}\n```\nEnjoy!')
+    assert value == {"a": [1, 2]}
+    assert not repaired
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"a": [1, 2,],}', {"a": [1, 2]}),
+    ("{'a': 'it', 'b': True, 'c': None}", {"a": "it", "b": True, "c": None}),
+    ('{a: 1, // comment\n "b": 2}', {"a": 1, "b": 2}),
+    ('{"a": [1, 2, {"b": 3}, {"c": "cut', {"a": [1, 2, {"b": 3}]}),
+    ('{"a": 1, "b": "cut', {"a": 1}),
+])
+def test_repair_json_fixes_common_mistakes(text, expected):
+    value, repaired = repair_json(text)
+    assert value == expected
+    assert repaired
+
+@pytest.mark.parametrize("text, expected", [
+    ('Note [see below]: {"a": 1}', {"a": 1}),
+    ('Use {curly} braces: [{"a": 1}]', [{"a": 1}]),
+])
+def test_brackets_in_prose_before_the_document_are_skipped(text, expected):
+    assert repair_json(text) == (expected, False)
+
+def test_repair_json_rejects_responses_without_json():
+    with pytest.raises(StructuredOutputError):
+        repair_json("Sorry, I cannot help with that.")
+
+def test_truncated_quiz_keeps_complete_questions():
+    text = json.dumps({"title": "Quiz", "questions": [question(1), question(2)]})[:-30]
+    result = parse_structured(text, "quiz")
+    assert [q["question"] for q in result.data["questions"]] == ["Q1"]
+    assert result.repaired
+
+def test_invalid_items_are_dropped_and_counted():
+    text = json.dumps({"questions": [question(1), {"question": "no options"}, question(3)]})
+    result = parse_structured(text, "quiz")
+    assert [q["question"] for q in result.data["questions"]] == ["Q1", "Q3"]
+    assert result.dropped == 1
+
+def test_only_missing_items_are_requested():
+    call = ScriptedCall(
+        json.dumps({"title": "Quiz", "questions": [question(1), question(2)]})[:-30],
+        json.dumps([question(2), question(3)]),
+    )
+    structured = StructuredOutput()
+
+    quiz = asyncio.run(structured.generate("quiz", "make a quiz", call, expected_items=3))
+
+    assert [q["question"] for q in quiz["questions"]] == ["Q1", "Q2", "Q3"]
+    assert "2 missing questions" in call.prompts[1]
+    stats = structured.stats()
+    assert stats["top_up_requests"] == 1
+    assert stats["retries"] == 0
+    assert stats["retries_avoided"] == 1
+    assert stats["repair_rate"] == 1.0
+
+def test_unusable_response_is_asked_again():
+    call = ScriptedCall("no json here", json.dumps({"title": "T", "sub_title": "S", "description": "D"}))
+    structured = StructuredOutput()
+
+    course = asyncio.run(structured.generate("course", "make a course", call))
+
+    assert course["title"] == "T"
+    assert structured.stats()["retries"] == 1
+    assert structured.stats()["failures"] == 1
+
+def test_gives_up_after_max_retries():
+    call = ScriptedCall("nope", "still nope")
+    with pytest.raises(StructuredOutputError):
+        asyncio.run(StructuredOutput().generate("chapter", "write", call, max_retries=1))
+    assert len(call.prompts) == 2
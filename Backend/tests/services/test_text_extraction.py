@@ -0,0 +1,139 @@
+import asyncio
+import io
+import uuid
+import zipfile
+import pytest
+from app.models.content import Content
+from app.models.enums import ContentType
+from app.models.extracted_text import ExtractedText
+from app.models.job import Job
+from app.services import course_index, text_extraction
+from app.services.blob_store import blob_store
+from app.services.course_context import course_contexts
+
+class Upload:
+    def __init__(self, data: bytes):
+        self._data = io.BytesIO(data)
+
+    async def read(self, size: int = -1) -> bytes:
+        return self._data.read(size)
+
+def make_pdf(text: str) -> bytes:
+    stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode()
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+        b"/Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream",
+    ]
+    data = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(data))
+        data += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(data)
+    data += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    data += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    data += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return data
+
+def make_docx(*paragraphs: str) -> bytes:
+    body = "".join(f"<w:p><w:r><w:t>{paragraph}</w:t></w:r></w:p>" for paragraph in paragraphs)
+    document = (
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f"<w:body>{body}</w:body></w:document>"
+    )
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("word/document.xml", document)
+    return buffer.getvalue()
+
+@pytest.fixture(autouse=True)
+def pool():
+    yield
+    text_extraction.shutdown()
+
+def store(data: bytes) -> str:
+    return asyncio.run(blob_store.put(Upload(data))).sha256
+
+def add_file(db, course_id, filename, sha256):
+    content = Content(
+        title=filename, content=filename, content_type=ContentType.FILE, course_id=course_id,
+        blob_sha256=sha256, meta={"filename": filename},
+    )
+    db.add(content)
+    db.commit()
+    return content
+
+def run(contents):
+    files = [{"sha256": c.blob_sha256, "extension": text_extraction.file_extension(c)} for c in contents]
+    return asyncio.run(text_extraction.run_extraction_job({"files": files}, None))
+
+def test_normalize_joins_hyphenated_lines_and_collapses_whitespace():
+    text = "Photo-\nsynthesis  uses   light.\r\n\n\n\nﬁnally\x00 done "
+
+    assert text_extraction.normalize(text) == "Photosynthesis uses light.\n\nfinally done"
+
+@pytest.mark.parametrize("extension, data, expected", [
+    (".txt", "Café notes".encode("utf-8"), "Café notes"),
+    (".txt", "Café notes".encode("cp1252"), "Café notes"),
+    (".pdf", make_pdf("Mitochondria make ATP"), "Mitochondria make ATP"),
+    (".docx", make_docx("Cells divide.", "DNA replicates."), "Cells divide.\nDNA replicates."),
+])
+def test_extract_file(tmp_path, extension, data, expected):
+    path = tmp_path / f"upload{extension}"
+    path.write_bytes(data)
+
+    assert text_extraction.extract_file(str(path), extension, 1000) == (expected, None)
+
+def test_unreadable_files_record_an_error_instead_of_raising(tmp_path):
+    path = tmp_path / "broken.pdf"
+    path.write_bytes(b"%PDF-1.4 truncated")
+
+    text, error = text_extraction.extract_file(str(path), ".pdf", 1000)
+
+    assert text == "" and error
+
+def test_extracted_file_text_reaches_course_context_and_search(db):
+    course_id = str(uuid.uuid4())
+    content = add_file(db, course_id, "notes.pdf", store(make_pdf("Mitochondria produce cellular energy")))
+    assert "Mitochondria" not in course_contexts.get(db, course_id).text
+
+    result = run([content])
+
+    assert result["extracted"] == 1 and result["courses"] == [course_id]
+    assert "Title: notes.pdf\nContent: Mitochondria produce cellular energy" in course_contexts.get(db, course_id).text
+    chunks = course_index.search(db, course_id, "mitochondria")
+    assert [chunk.content_id for chunk in chunks] == [content.id]
+
+def test_identical_files_are_extracted_once(db):
+    sha256 = store(make_docx("Already parsed."))
+    db.add(ExtractedText(sha256=sha256, text="Stored earlier"))
+    db.commit()
+    course_id = str(uuid.uuid4())
+    content = add_file(db, course_id, "copy.docx", sha256)
+
+    result = run([content])
+
+    assert result["extracted"] == 0 and result["already_extracted"] == 1
+    # The new row is still indexed with the stored text
+    assert [chunk.content_id for chunk in course_index.search(db, course_id, "stored")] == [content.id]
+
+def test_only_parseable_uploads_are_submitted(db):
+    image = add_file(db, None, "diagram.png", store(b"\x89PNG\r\n\x1a\n"))
+
+    assert text_extraction.submit_extraction(db, [image], None) is None
+
+def test_uploads_queue_an_extraction_job(client, test_headers, db):
+    response = client.post(
+        "/api/v1/content/upload",
+        files={"file": ("notes.txt", b"Osmosis moves water.", "text/plain")},
+        data={"title": "Notes"},
+        headers=test_headers
+    )
+
+    assert response.status_code == 200, response.text
+    job = db.query(Job).filter(Job.job_type == text_extraction.JOB_TYPE).one()
+    assert job.payload == {"files": [{"sha256": response.json()["blob_sha256"], "extension": ".txt"}]}